@@ -0,0 +1,216 @@
+"""
+Benchmark scrapyd-client against a fake Scrapyd server, and print the results as JSON.
+
+Usage::
+
+   python -m benchmarks > baseline.json
+   python -m benchmarks --compare baseline.json client schedule
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from argparse import ArgumentParser
+from importlib.metadata import version
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.egg import build_egg, egg_filename
+from scrapyd_client.pyclient import ScrapydClient, create_session
+from scrapyd_client.utils import _run_concurrently
+
+_MIB = 1024 * 1024
+BENCHMARKS = {}
+
+
+def benchmark(func):
+    BENCHMARKS[func.__name__] = func
+    return func
+
+
+def _rate(count, seconds):
+    return {"count": count, "seconds": round(seconds, 6), "per_second": round(count / max(seconds, 1e-9), 2)}
+
+
+def _latencies(results):
+    elapsed = sorted(result.elapsed for result in results)
+    return {
+        "min": round(elapsed[0], 6),
+        "median": round(statistics.median(elapsed), 6),
+        "p95": round(elapsed[int(len(elapsed) * 0.95)], 6),
+        "max": round(elapsed[-1], 6),
+    }
+
+
+@benchmark
+def client(opts):
+    """Measure requests per second, with small and large responses, sequentially and with concurrency."""
+    results = {}
+    with FakeScrapyd(latency=opts.latency, jobs=opts.jobs) as server:
+        session = create_session(pool_maxsize=opts.concurrency)
+        with ScrapydClient(server.url, session=session) as scrapyd:
+            for name, func in (("daemonstatus", scrapyd.daemonstatus), ("listjobs", lambda: scrapyd.jobs("project0"))):
+                func()  # warm up the connection
+                start = time.perf_counter()
+                for _ in range(opts.requests):
+                    func()
+                results[name] = _rate(opts.requests, time.perf_counter() - start)
+
+                start = time.perf_counter()
+                for result in _run_concurrently(lambda _, func=func: func(), range(opts.requests), opts.concurrency):
+                    if result.error:
+                        raise result.error
+                results[f"{name}_concurrent"] = _rate(opts.requests, time.perf_counter() - start)
+        session.close()
+    return results
+
+
+@benchmark
+def schedule(opts):
+    """Measure jobs scheduled per second by ``schedule_many``, and the latency of each request."""
+    jobs = ({"project": "project0", "spider": "spider0", "args": {"n": str(i)}} for i in range(opts.requests))
+    with FakeScrapyd(latency=opts.latency) as server:
+        session = create_session(pool_maxsize=opts.concurrency)
+        with ScrapydClient(server.url, session=session) as scrapyd:
+            start = time.perf_counter()
+            results = list(scrapyd.schedule_many(jobs, concurrency=opts.concurrency))
+            seconds = time.perf_counter() - start
+        session.close()
+    if errors := [result.error for result in results if result.error]:
+        raise errors[0]
+    return {"jobs": _rate(len(results), seconds), "latency": _latencies(results)}
+
+
+@benchmark
+def startup(opts):
+    """Measure the seconds for ``scrapyd-client targets`` to run, as a subprocess."""
+    with tempfile.TemporaryDirectory() as directory:
+        with open(os.path.join(directory, "scrapy.cfg"), "w") as f:
+            f.write("[deploy]\nurl = http://localhost:6800/\n")
+        times = []
+        for _ in range(opts.repeat):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "scrapyd_client", "targets"], cwd=directory, check=True, capture_output=True
+            )
+            times.append(time.perf_counter() - start)
+    return {"min": round(min(times), 6), "median": round(statistics.median(times), 6)}
+
+
+@benchmark
+def build(opts):
+    """Measure the seconds to build the egg of a generated project, with the native builder and with setuptools."""
+    with tempfile.TemporaryDirectory() as directory:
+        _write_project(directory, opts.modules)
+        results = {}
+
+        times = []
+        for _ in range(opts.repeat):
+            start = time.perf_counter()
+            build_egg(directory, "benchproject.settings", os.path.join(directory, egg_filename()))
+            times.append(time.perf_counter() - start)
+        results["native"] = {"min": round(min(times), 6), "median": round(statistics.median(times), 6)}
+
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, "-m", "scrapyd_client.deploy", "--build-egg", "out.egg", "--no-cache"],
+            cwd=directory,
+            check=True,
+            capture_output=True,
+        )
+        results["setuptools"] = {"seconds": round(time.perf_counter() - start, 6)}
+    return results
+
+
+@benchmark
+def upload(opts):
+    """Measure the megabytes per second uploaded by ``addversion``."""
+    with tempfile.TemporaryDirectory() as directory, FakeScrapyd() as server:
+        eggpath = os.path.join(directory, "project.egg")
+        with open(eggpath, "wb") as f:
+            for _ in range(opts.upload_size):
+                f.write(os.urandom(_MIB))
+        with ScrapydClient(server.url) as scrapyd:
+            start = time.perf_counter()
+            scrapyd.addversion("project0", "1", eggpath)
+            seconds = time.perf_counter() - start
+    return {"megabytes": _rate(opts.upload_size, seconds)}
+
+
+def _write_project(directory, modules):
+    package = os.path.join(directory, "benchproject")
+    os.makedirs(os.path.join(package, "spiders"))
+    with open(os.path.join(directory, "scrapy.cfg"), "w") as f:
+        f.write("[settings]\ndefault = benchproject.settings\n")
+    for path in ("__init__.py", "settings.py", os.path.join("spiders", "__init__.py")):
+        with open(os.path.join(package, path), "w") as f:
+            f.write("BOT_NAME = 'benchproject'\n" if path == "settings.py" else "")
+    for i in range(modules):
+        with open(os.path.join(package, "spiders", f"spider{i}.py"), "w") as f:
+            f.write(f"# Spider {i}\n" + "x = 1\n" * 500)
+
+
+def _leaves(data, prefix=""):
+    for key, value in data.items():
+        if isinstance(value, dict):
+            yield from _leaves(value, f"{prefix}{key}.")
+        elif isinstance(value, (int, float)):
+            yield f"{prefix}{key}", value
+
+
+def _compare(baseline, current):
+    previous = dict(_leaves(baseline["results"]))
+    print(f"{'metric':<45} {'baseline':>12} {'current':>12} {'change':>8}", file=sys.stderr)
+    for name, value in _leaves(current["results"]):
+        if name in previous:
+            change = f"{(value - previous[name]) / previous[name]:+.1%}" if previous[name] else ""
+            print(f"{name:<45} {previous[name]:>12} {value:>12} {change:>8}", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("benchmark", nargs="*", help=f"the benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    parser.add_argument("--requests", type=int, default=500, help="requests per client and schedule benchmark")
+    parser.add_argument("--concurrency", type=int, default=10, help="requests in parallel")
+    parser.add_argument("--latency", type=float, default=0, help="seconds the server waits before responding")
+    parser.add_argument("--jobs", type=int, default=100, help="jobs per state in listjobs.json responses")
+    parser.add_argument("--modules", type=int, default=100, help="modules in the project to build")
+    parser.add_argument("--upload-size", type=int, default=50, metavar="MB", help="size of the egg to upload")
+    parser.add_argument("--repeat", type=int, default=5, help="runs of the startup and build benchmarks")
+    parser.add_argument("--output", help="the file to write the results to (default: stdout)")
+    parser.add_argument("--compare", metavar="FILE", help="a previous output, to print the change in each metric")
+    opts = parser.parse_args(argv)
+    if unknown := set(opts.benchmark) - set(BENCHMARKS):
+        parser.error(f"unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    report = {
+        "scrapyd-client": version("scrapyd-client"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {key: value for key, value in vars(opts).items() if key not in {"benchmark", "output", "compare"}},
+        "results": {},
+    }
+    for name in opts.benchmark or BENCHMARKS:
+        print(f"Running {name}", file=sys.stderr)
+        report["results"][name] = BENCHMARKS[name](opts)
+
+    output = json.dumps(report, indent=2)
+    if opts.output:
+        with open(opts.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+    if opts.compare:
+        with open(opts.compare) as f:
+            _compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+CHUNK_SIZE = 64 * 1024
+
+
+class FakeScrapyd:
+    """
+    An in-process stand-in for Scrapyd, which serves its JSON API from a background thread.
+
+    Responses are generated, not stored: each project has the same spiders, and each state of ``listjobs.json`` has the
+    same number of jobs. Uploaded eggs are read and discarded.
+    """
+
+    def __init__(
+        self,
+        latency: float = 0,
+        projects: int = 1,
+        spiders: int = 10,
+        jobs: int = 10,
+        versions: int = 1,
+        host: str = "127.0.0.1",
+    ) -> None:
+        """
+        Initialize FakeScrapyd.
+
+        :param latency: The number of seconds to wait before each response, to simulate the network and Scrapyd
+        :param projects: The number of projects
+        :param spiders: The number of spiders per project
+        :param jobs: The number of pending, running and finished jobs per project (each)
+        :param versions: The number of versions per project, named "1", "2", etc.
+        """
+        self.latency = latency
+        self.projects = [f"project{i}" for i in range(projects)]
+        self.spiders = [f"spider{i}" for i in range(spiders)]
+        self.jobs = jobs
+        self.versions = [str(i) for i in range(1, versions + 1)]
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, 0), _Handler)
+        self._server.daemon_threads = True
+        self._server.fake = self
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """Serve requests from a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop serving requests, and close the socket."""
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def respond(self, method: str, endpoint: str, params: dict) -> dict:
+        """Return the response to a request, without its "status" and "node_name" keys."""
+        with self._lock:
+            self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        if method == "POST":
+            if endpoint == "schedule":
+                return {"jobid": uuid.uuid4().hex}
+            if endpoint == "addversion":
+                return {"project": params.get("project"), "version": params.get("version"), "spiders": 1}
+            if endpoint == "cancel":
+                return {"prevstate": "running"}
+            if endpoint in {"delproject", "delversion"}:
+                return {}
+        elif endpoint == "daemonstatus":
+            return {"pending": self.jobs, "running": self.jobs, "finished": self.jobs}
+        elif endpoint == "listprojects":
+            return {"projects": self.projects}
+        elif endpoint == "listversions":
+            return {"versions": self.versions}
+        elif endpoint == "listspiders":
+            return {"spiders": self.spiders}
+        elif endpoint == "listjobs":
+            return self._listjobs(params.get("project"))
+        elif endpoint == "status":
+            return {"currstate": "finished"}
+        raise KeyError(endpoint)
+
+    def _listjobs(self, project):
+        def job(state, i):
+            data = {"project": project, "spider": self.spiders[i % len(self.spiders)], "id": f"{state}{i:032}"}
+            if state != "pending":
+                data["pid"] = 1000 + i
+                data["start_time"] = "2025-01-01 00:00:00.000000"
+            if state == "finished":
+                data["end_time"] = "2025-01-01 00:01:00.000000"
+                data["log_url"] = f"/logs/{project}/{data['spider']}/{data['id']}.log"
+                data["items_url"] = f"/items/{project}/{data['spider']}/{data['id']}.jl"
+            return data
+
+        return {state: [job(state, i) for i in range(self.jobs)] for state in ("pending", "running", "finished")}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # The headers and body are written separately. With Nagle's algorithm, the body waits for the client's delayed ACK.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):  # noqa: N802
+        url = urlparse(self.path)
+        self._respond("GET", url.path, {key: values[0] for key, values in parse_qs(url.query).items()})
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        params = {}
+        if self.headers.get("Content-Type", "").startswith("multipart/form-data"):
+            # Read and discard the egg. The benchmark doesn't need the form fields.
+            while length > 0:
+                length -= len(self.rfile.read(min(length, CHUNK_SIZE)))
+        else:
+            params = {key: values[0] for key, values in parse_qs(self.rfile.read(length).decode()).items()}
+        self._respond("POST", self.path, params)
+
+    def _respond(self, method, path, params):
+        endpoint = path.strip("/").removesuffix(".json")
+        try:
+            data = {"node_name": "fake", "status": "ok", **self.server.fake.respond(method, endpoint, params)}
+            code = 200
+        except KeyError:
+            data = {"node_name": "fake", "status": "error", "message": f"No such endpoint: {method} {path}"}
+            code = 404
+        body = json.dumps(data).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):  # noqa: A002
+        pass
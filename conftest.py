@@ -1,5 +1,6 @@
 import pytest
-from scrapy.utils import conf
+
+from scrapyd_client import utils
 
 
 @pytest.fixture(autouse=True)
@@ -8,7 +9,20 @@ def only_closest_scrapy_cfg(monkeypatch):
 
     def get_sources(use_closest=True):
         if use_closest:
-            return [conf.closest_scrapy_cfg()]
+            return [utils.closest_scrapy_cfg()]
         return []
 
-    monkeypatch.setattr(conf, "get_sources", get_sources)
+    monkeypatch.setattr(utils, "get_sources", get_sources)
+
+
+@pytest.fixture(autouse=True)
+def isolated_cache_dir(monkeypatch, tmp_path_factory):
+    """Avoids a developer's own cache, or other tests' caches, interfering with tests."""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path_factory.mktemp("cache")))
+
+
+@pytest.fixture(autouse=True)
+def empty_config_cache(monkeypatch):
+    """Avoids configuration files parsed by other tests being reused, if written in the same clock tick."""
+    monkeypatch.setattr(utils, "_configs", {})
+    monkeypatch.setattr(utils, "_netrcs", {})
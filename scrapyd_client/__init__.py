@@ -1 +1,10 @@
-from scrapyd_client.pyclient import ScrapydClient  # noqa: F401
+def __getattr__(name):
+    # ScrapydClient is imported on first access, to not import requests when importing other modules.
+    if name == "ScrapydClient":
+        from scrapyd_client.pyclient import ScrapydClient
+
+        return ScrapydClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+__all__ = ["ScrapydClient"]
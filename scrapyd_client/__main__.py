@@ -1,27 +1,78 @@
+import fnmatch
+import json
+import re
 import sys
-from argparse import ArgumentParser
+import time
+from argparse import ArgumentParser, ArgumentTypeError
+from contextlib import nullcontext
+from datetime import datetime, timedelta
 from textwrap import indent
 from traceback import print_exc
 
-import requests
-from scrapy.utils.project import inside_project
+from scrapyd_client.cache import ResponseCache, response_cache_path
+from scrapyd_client.exceptions import CircuitOpen, ErrorResponse, MalformedResponse, RunningJobs, ServerUnavailable
+from scrapyd_client.metrics import MetricsCollector
+from scrapyd_client.records import STATES
+from scrapyd_client.utils import _get_targets, _read_config, _run_concurrently, inside_project
+from scrapyd_client.watch import watch as watch_jobs
 
-import scrapyd_client.deploy
-from scrapyd_client.exceptions import ErrorResponse, MalformedResponse
-from scrapyd_client.pyclient import ScrapydClient
-from scrapyd_client.utils import _get_targets, get_config
+# The modules that import requests (deploy, cluster, pyclient) are imported by the subcommands that need them, to keep
+# the other subcommands fast to start.
 
 ISSUE_TRACKER_URL = "https://github.com/scrapy/scrapyd-client/issues"
+CANCELABLE_STATES = ("pending", "running")
+DURATION_UNITS = {"s": "seconds", "m": "minutes", "h": "hours", "d": "days"}
 
 
 def _get_client(args):
+    from scrapyd_client.cluster import ScrapydCluster
+    from scrapyd_client.pyclient import ScrapydClient
+    from scrapyd_client.retry import CircuitBreaker, RetryPolicy
+
+    pool_maxsize = max(10, getattr(args, "concurrency", 1))
+    cache = ResponseCache(path=response_cache_path()) if getattr(args, "cache", False) else None
+    hooks = []
+    if getattr(args, "stats", False) or getattr(args, "stats_file", None):
+        args.collector = MetricsCollector()
+        hooks.append(args.collector)
+    retries = getattr(args, "retries", 0)
+    retry = RetryPolicy(attempts=retries + 1) if retries else None
+    # The session of scrapyd-client serve, which is shared by all commands.
+    session = getattr(args, "session", None)
+
+    if getattr(args, "targets", None):
+        targets = {name: target for name, target in _get_targets().items() if fnmatch.fnmatch(name, args.targets)}
+        if not targets:
+            print(f"Error: No targets match {args.targets}", file=sys.stderr)
+            raise SystemExit(1)
+        return ScrapydCluster.from_targets(
+            targets,
+            pool_maxsize=pool_maxsize,
+            cache=cache,
+            hooks=hooks,
+            retry=retry,
+            circuit_breaker=lambda: CircuitBreaker(failure_threshold=3),
+            session=session,
+        )
+
     target = _get_targets()[args.target]
 
-    return ScrapydClient(target.get("url"), target.get("username"), password=target.get("password", ""))
+    return ScrapydClient(
+        target.get("url"),
+        target.get("username"),
+        password=target.get("password", ""),
+        session=session,
+        pool_maxsize=pool_maxsize,
+        cache=cache,
+        hooks=hooks,
+        retry=retry,
+    )
 
 
 def deploy(args):  # noqa: ARG001
     """Deploy a Scrapy project to a Scrapyd instance. For help, invoke scrapyd-deploy."""
+    import scrapyd_client.deploy
+
     sys.argv.pop(1)
     scrapyd_client.deploy.main()
 
@@ -32,43 +83,439 @@ def targets(args):  # noqa: ARG001
         print("%-20s %s" % (name, target["url"]))
 
 
+def _print_failures(client):
+    for name, error in getattr(client, "failures", {}).items():
+        print(f"Failed to query target ({name}): {error}", file=sys.stderr)
+
+
+def _schedule_spider(client, project, spider, job_args, throttle=None):
+    from scrapyd_client.cluster import ScrapydCluster
+
+    if throttle is not None:
+        throttle()
+    if isinstance(client, ScrapydCluster):
+        node, job_id = client.schedule(project, spider, job_args)
+        return f"{job_id} ({node})"
+    return client.schedule(project, spider, job_args)
+
+
 def projects(args):
     """List all projects deployed on a Scrapyd instance."""
-    client = _get_client(args)
-
-    if projects := client.projects():
-        print("\n".join(projects))
+    with _get_client(args) as client:
+        if projects := client.projects():
+            print("\n".join(projects))
+        _print_failures(client)
 
 
 def schedule(args):
     """Schedule the specified spider(s)."""
-    client = _get_client(args)
-    job_args = [tuple(job_arg.split("=", 1)) for job_arg in args.arg]
+    with _get_client(args) as client:
+        job_args = [tuple(job_arg.split("=", 1)) for job_arg in args.arg]
+
+        if args.from_file:
+            _schedule_from_file(client, args, job_args)
+            return
+
+        throttle = _throttle(client, args)
+        if args.concurrency > 1:
+            _schedule_concurrently(client, args, job_args, throttle)
+            return
+
+        for project in client.projects(args.project):
+            for spider in client.spiders(project, args.spider):
+                job_id = _schedule_spider(client, project, spider, job_args, throttle)
+                print(f"{project} / {spider} => {job_id}")
+        _print_failures(client)
+
+
+def _throttle(client, args):
+    from scrapyd_client.throttle import Backpressure, TokenBucket
+
+    waits = []
+    if args.max_pending is not None:
+        waits.append(Backpressure(lambda: client.daemonstatus()["pending"], args.max_pending).acquire)
+    if args.rate is not None:
+        waits.append(TokenBucket(args.rate).acquire)
+    if not waits:
+        return None
+
+    def throttle():
+        for wait in waits:
+            wait()
+
+    return throttle
+
+
+def _schedule_concurrently(client, args, job_args, throttle=None):
+    failures = []
+
+    def list_spiders(project):
+        return client.spiders(project, args.spider)
+
+    def schedule_spider(item):
+        return _schedule_spider(client, *item, job_args, throttle)
+
+    # List the spiders, then schedule them, so that at most --concurrency requests are in flight, like the size of the
+    # connection pool.
+    projects = client.projects(args.project)
+    node_failures = dict(getattr(client, "failures", {}))
+    project_spiders = []
+    for result in _run_concurrently(list_spiders, projects, args.concurrency):
+        if result.error:
+            failures.append(result)
+            print(f"{result.item} => failed to list spiders: {result.error}")
+        else:
+            project_spiders.extend((result.item, spider) for spider in result.value)
+    node_failures.update(getattr(client, "failures", {}))
+
+    latencies = []
+    for result in _run_concurrently(schedule_spider, project_spiders, args.concurrency):
+        project, spider = result.item
+        if result.error:
+            failures.append(result)
+            print(f"{project} / {spider} => failed: {result.error}")
+        else:
+            latencies.append(result.elapsed)
+            print(f"{project} / {spider} => {result.value}")
+
+    summary = f"Scheduled {len(latencies)} job(s), {len(failures)} failure(s)"
+    if latencies:
+        summary += (
+            f"; latency min {min(latencies):.3f}s, mean {sum(latencies) / len(latencies):.3f}s,"
+            f" max {max(latencies):.3f}s"
+        )
+    print(summary)
+    for name, error in node_failures.items():
+        print(f"Failed to query target ({name}): {error}", file=sys.stderr)
+
+    if failures:
+        raise SystemExit(1)
+
+
+def _read_manifest(args, job_args, invalid):
+    # Call invalid() with the line number and the error of each line that isn't a JSON object, and skip the line.
+    defaults = {"project": args.project, "spider": args.spider, "args": job_args}
+    with nullcontext(sys.stdin) if args.from_file == "-" else open(args.from_file) as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                invalid(number, f"Invalid JSON: {e.msg} at column {e.pos + 1}")
+                continue
+            if not isinstance(job, dict):
+                invalid(number, "A job must be a JSON object")
+                continue
+            yield {**defaults, **job}
+
+
+def _schedule_from_file(client, args, job_args):
+    from scrapyd_client.cluster import ScrapydCluster
+
+    scheduled = failed = 0
+    with nullcontext(sys.stdout) if args.output == "-" else open(args.output, "w") as output:
+
+        def invalid(number, error):
+            nonlocal failed
+            failed += 1
+            print(json.dumps({"line": number, "error": error}), file=output, flush=True)
+
+        jobs = _read_manifest(args, job_args, invalid)
+        for result in client.schedule_many(jobs, args.concurrency, args.rate, args.max_pending):
+            job = {key: value for key, value in result.item.items() if value is not None}
+            if result.error:
+                failed += 1
+                job["error"] = str(result.error)
+            elif isinstance(client, ScrapydCluster):
+                scheduled += 1
+                job["node"], job["jobid"] = result.value
+            else:
+                scheduled += 1
+                job["jobid"] = result.value
+            print(json.dumps(job), file=output, flush=True)
+
+    print(f"Scheduled {scheduled} job(s), {failed} failure(s)", file=sys.stderr)
+    if failed:
+        raise SystemExit(1)
+
+
+def _nodes(client):
+    """Return the name and client of each node of a cluster, or ``None`` and the client."""
+    from scrapyd_client.cluster import ScrapydCluster
+
+    if isinstance(client, ScrapydCluster):
+        return list(client.clients.items())
+    return [(None, client)]
+
+
+def _label(name, project, *parts):
+    label = f"{project} / {' '.join(parts)}" if parts else project
+    return label if name is None else f"{label} ({name})"
 
-    for project in client.projects(args.project):
-        for spider in client.spiders(project, args.spider):
-            job_id = client.schedule(project, spider, job_args)
-            print(f"{project} / {spider} => {job_id}")
+
+def cancel(args):
+    """Cancel the pending and running jobs of the specified spider(s)."""
+    with _get_client(args) as client:
+        states = args.state or CANCELABLE_STATES
+        failures = 0
+
+        def list_jobs(node):
+            _, node_client = node
+            return [
+                job
+                for project in node_client.projects(args.project)
+                for job in node_client.iter_jobs(project, args.spider, states)
+            ]
+
+        # The jobs to cancel, grouped by node.
+        nodes = []
+        for result in _run_concurrently(list_jobs, _nodes(client), args.concurrency):
+            if result.error:
+                failures += 1
+                print(f"Failed to list jobs ({result.item[0] or args.target}): {result.error}", file=sys.stderr)
+            else:
+                nodes.append((*result.item, result.value))
+
+        if args.dry_run:
+            total = 0
+            for name, _, jobs in nodes:
+                total += len(jobs)
+                for job in jobs:
+                    print(f"{_label(name, job.project, job.spider, job.id)} => would cancel ({job.state})")
+            print(f"Would cancel {total} job(s)")
+        else:
+            canceled = 0
+            for name, node_client, jobs in nodes:
+                for result in node_client.cancel_many(jobs, args.concurrency, args.signal):
+                    job = result.item
+                    label = _label(name, job.project, job.spider, job.id)
+                    if result.error:
+                        failures += 1
+                        print(f"{label} => failed: {result.error}", file=sys.stderr)
+                    else:
+                        canceled += 1
+                        print(f"{label} => canceled ({result.value})")
+            print(f"Canceled {canceled} job(s), {failures} failure(s)")
+
+        if failures:
+            raise SystemExit(1)
+
+
+def prune(args):
+    """Delete all but the most recent versions of the specified project(s), and the versions of pending jobs."""
+    with _get_client(args) as client:
+        failures = 0
+
+        def list_versions(node):
+            name, node_client = node
+            versions, skipped = [], []
+            for project in node_client.projects(args.project):
+                try:
+                    to_prune = node_client.versions_to_prune(project, args.keep, force=args.force)
+                except RunningJobs as e:
+                    skipped.append((name, project, e))
+                else:
+                    versions.extend((name, node_client, project, version) for version in to_prune)
+            return versions, skipped
+
+        def delete_version(item):
+            _, node_client, project, version = item
+            return node_client.delversion(project, version)
+
+        versions = []
+        for result in _run_concurrently(list_versions, _nodes(client), args.concurrency):
+            if result.error:
+                failures += 1
+                print(f"Failed to list versions ({result.item[0] or args.target}): {result.error}", file=sys.stderr)
+            else:
+                node_versions, skipped = result.value
+                versions.extend(node_versions)
+                for name, project, error in skipped:
+                    failures += 1
+                    print(f"{_label(name, project)} => skipped: {error} (use --force to prune)", file=sys.stderr)
+
+        if args.dry_run:
+            for name, _, project, version in versions:
+                print(f"{_label(name, project, version)} => would delete")
+            print(f"Would delete {len(versions)} version(s)")
+        else:
+            deleted = 0
+            for result in _run_concurrently(delete_version, versions, args.concurrency):
+                name, _, project, version = result.item
+                label = _label(name, project, version)
+                if result.error:
+                    failures += 1
+                    print(f"{label} => failed: {result.error}", file=sys.stderr)
+                else:
+                    deleted += 1
+                    print(f"{label} => deleted")
+            print(f"Deleted {deleted} version(s), {failures} failure(s)")
+
+        if failures:
+            raise SystemExit(1)
 
 
 def spiders(args):
     """List all spiders for the given project(s)."""
-    client = _get_client(args)
-
-    for project in client.projects(args.project):
-        spiders = client.spiders(project)
-        if not args.verbose:
-            print(f"{project}:")
-            if spiders:
-                print(indent("\n".join(spiders), "  "))
+    with _get_client(args) as client:
+        for project in client.projects(args.project):
+            spiders = client.spiders(project)
+            if not args.verbose:
+                print(f"{project}:")
+                if spiders:
+                    print(indent("\n".join(spiders), "  "))
+                else:
+                    print("  No spiders.")
+            elif spiders:
+                print("\n".join(f"{project} {spider}" for spider in spiders))
+        _print_failures(client)
+
+
+def watch(args):
+    """Watch jobs, and print each change in their state."""
+    with _get_client(args) as client:
+        for event in watch_jobs(
+            client,
+            client.projects(args.project),
+            args.job or None,
+            interval=args.interval,
+            max_interval=args.max_interval,
+            timeout=args.timeout,
+        ):
+            if args.json:
+                print(json.dumps(event.to_dict()), flush=True)
+            else:
+                timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(event.time))
+                print(
+                    f"{timestamp} {event.project} / {event.spider} {event.jobid}: {event.previous} -> {event.state}",
+                    flush=True,
+                )
+
+
+def jobs(args):
+    """List the jobs in the local job index, optionally syncing it with the targets first."""
+    from scrapyd_client.jobindex import JobIndex
+
+    pattern = args.targets or args.target or "*"
+    failed = False
+    with JobIndex(args.index) as index:
+        if args.sync:
+            failed = _sync_index(index, args, pattern)
+        for target, job in index.query(
+            args.project, args.spider, args.state, args.since, args.until, target=pattern, limit=args.limit
+        ):
+            if args.json:
+                print(json.dumps({"target": target, **job.to_dict()}, default=str))
+            else:
+                start_time, end_time = (
+                    "-" if value is None else value.strftime("%Y-%m-%d %H:%M:%S")
+                    for value in (job.start_time, job.end_time)
+                )
+                print(
+                    f"{start_time:<19}  {end_time:<19}  {job.state:<8}  {target} {job.project} / {job.spider} {job.id}"
+                )
+
+    if failed:
+        raise SystemExit(1)
+
+
+def _sync_index(index, args, pattern):
+    args.targets = pattern
+    failed = False
+
+    def list_projects(node):
+        name, client = node
+        return [(name, client, project) for project in client.projects(args.project)]
+
+    def sync_project(item):
+        name, client, project = item
+        return index.sync(client, project, name, full=args.full)
+
+    with _get_client(args) as cluster:
+        projects = []
+        for result in _run_concurrently(list_projects, _nodes(cluster), args.concurrency):
+            if result.error:
+                failed = True
+                print(f"Failed to sync target ({result.item[0]}): {result.error}", file=sys.stderr)
+            else:
+                projects.extend(result.value)
+
+        # A failure to sync a project doesn't stop the other projects of the target.
+        for result in _run_concurrently(sync_project, projects, args.concurrency):
+            name, _, project = result.item
+            if result.error:
+                failed = True
+                print(f"Failed to sync {name} / {project}: {result.error}", file=sys.stderr)
             else:
-                print("  No spiders.")
-        elif spiders:
-            print("\n".join(f"{project} {spider}" for spider in spiders))
+                sync = result.value
+                print(
+                    f"Synced {sync.target} / {sync.project}: {sync.added} added, {sync.updated} updated,"
+                    f" {sync.removed} removed",
+                    file=sys.stderr,
+                )
+    return failed
+
+
+def serve(args):
+    """Run commands sent by scrapyd-client, from a process that keeps its connections to the targets open."""
+    from scrapyd_client.server import serve
+
+    serve(_execute, args.socket, args.connections)
+
+
+def _time(value):
+    """Parse a time, either ISO 8601 or a duration before now, like "30m", "12h" or "7d"."""
+    if match := re.fullmatch(r"(\d+(?:\.\d+)?)([smhd])", value):
+        return datetime.now() - timedelta(**{DURATION_UNITS[match.group(2)]: float(match.group(1))})  # noqa: DTZ005
+    try:
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ArgumentTypeError(f"invalid time: {value!r} (expected ISO 8601, or like 30m, 12h or 7d)") from None
+
+
+def _add_target_arguments(parser, default="default"):
+    # If the default is None, all targets are used.
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument(
+        "-t",
+        "--target",
+        default=default,
+        help="Specifies the target Scrapyd server by name." + (" (default: all targets)" if default is None else ""),
+    )
+    group.add_argument(
+        "--targets",
+        metavar="PATTERN",
+        help="Specifies the target Scrapyd servers by name, can be a globbing pattern. Results are merged.",
+    )
+
+
+def _add_client_arguments(parser):
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Reuses the lists of projects and spiders from recent invocations, for up to 1 and 5 minutes.",
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Prints the number and duration of requests by endpoint to stderr, when done.",
+    )
+    parser.add_argument(
+        "--stats-file", metavar="FILE", help="Writes request metrics to a file, in the Prometheus text format."
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Retries requests that fail to connect, time out, or get a 502, 503 or 504 response, up to N times,"
+        " with exponential backoff. Jobs are scheduled at most once.",
+    )
 
 
 def parse_cli_args(args):
-    cfg = get_config()
+    cfg = _read_config()
 
     project_kwargs = {
         "metavar": "PROJECT",
@@ -90,15 +537,18 @@ def parse_cli_args(args):
 
     parser = subparsers.add_parser("projects", description=projects.__doc__)
     parser.set_defaults(action=projects)
-    parser.add_argument("-t", "--target", default="default", help="Specifies the target Scrapyd server by name.")
+    _add_target_arguments(parser)
+    _add_client_arguments(parser)
 
-    parser = subparsers.add_parser("schedule", description=schedule.__doc__)
+    schedule_parser = parser = subparsers.add_parser("schedule", description=schedule.__doc__)
     parser.set_defaults(action=schedule)
-    parser.add_argument("-t", "--target", default="default", help="Specifies the target Scrapyd server by name.")
-    parser.add_argument("-p", "--project", **project_kwargs)
+    _add_target_arguments(parser)
+    _add_client_arguments(parser)
+    parser.add_argument("-p", "--project", **{**project_kwargs, "required": False})
     parser.add_argument(
         "spider",
         metavar="SPIDER",
+        nargs="?",
         help="Specifies the spider, can be a globbing pattern.",
     )
     parser.add_argument(
@@ -107,10 +557,76 @@ def parse_cli_args(args):
         default=[],
         help="Additional argument (key=value), can be specified multiple times.",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Sends up to N requests in parallel, and reports a summary of successes and failures.",
+    )
+    parser.add_argument(
+        "--from-file",
+        metavar="FILE",
+        help='Schedules the jobs in a JSON Lines file (\'-\' for stdin), with "project", "spider" and "args" keys.'
+        " The project, spider and --arg options are used as defaults.",
+    )
+    parser.add_argument(
+        "--output",
+        metavar="FILE",
+        default="-",
+        help="With --from-file, writes each job and its job ID (or error) as a line of JSON. (default: stdout)",
+    )
+    parser.add_argument("--rate", type=float, metavar="R", help="Schedules up to R jobs per second.")
+    parser.add_argument(
+        "--max-pending",
+        type=int,
+        metavar="N",
+        help="Pauses while the target has N or more pending jobs, as reported by daemonstatus.json. With --targets,"
+        " the total of all targets.",
+    )
+
+    parser = subparsers.add_parser("cancel", description=cancel.__doc__)
+    parser.set_defaults(action=cancel)
+    _add_target_arguments(parser)
+    _add_client_arguments(parser)
+    parser.add_argument("-p", "--project", **project_kwargs)
+    parser.add_argument("spider", metavar="SPIDER", help="Specifies the spider, can be a globbing pattern.")
+    parser.add_argument(
+        "--state",
+        action="append",
+        choices=CANCELABLE_STATES,
+        help="Specifies the state, can be specified multiple times. (default: pending and running)",
+    )
+    parser.add_argument(
+        "--signal", help="Specifies the signal to send to running jobs, like KILL. (default: Scrapyd's, TERM)"
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Lists the jobs to cancel, without canceling them.")
+    parser.add_argument(
+        "--concurrency", type=int, default=4, metavar="N", help="Sends up to N requests in parallel. (default: 4)"
+    )
+
+    prune_parser = parser = subparsers.add_parser("prune", description=prune.__doc__)
+    parser.set_defaults(action=prune)
+    _add_target_arguments(parser)
+    _add_client_arguments(parser)
+    parser.add_argument("-p", "--project", **project_kwargs)
+    parser.add_argument(
+        "--keep", type=int, required=True, metavar="N", help="Specifies the number of most recent versions to keep."
+    )
+    parser.add_argument("--dry-run", action="store_true", help="Lists the versions to delete, without deleting them.")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Prunes projects with running jobs, whose versions Scrapyd doesn't report, and which can be deleted.",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, metavar="N", help="Sends up to N requests in parallel. (default: 4)"
+    )
 
     parser = subparsers.add_parser("spiders", description=spiders.__doc__)
     parser.set_defaults(action=spiders)
-    parser.add_argument("-t", "--target", default="default", help="Specifies the target Scrapyd server by name.")
+    _add_target_arguments(parser)
+    _add_client_arguments(parser)
     parser.add_argument("-p", "--project", **project_kwargs)
     parser.add_argument(
         "-v",
@@ -120,6 +636,79 @@ def parse_cli_args(args):
         help="Prints project's and spider's name in each line, intended for processing stdout in scripts.",
     )
 
+    parser = subparsers.add_parser("watch", description=watch.__doc__)
+    parser.set_defaults(action=watch)
+    parser.add_argument("-t", "--target", default="default", help="Specifies the target Scrapyd server by name.")
+    _add_client_arguments(parser)
+    parser.add_argument("-p", "--project", **project_kwargs)
+    parser.add_argument(
+        "job",
+        metavar="JOB",
+        nargs="*",
+        help="Specifies the job ID. Exits once all are finished. If none are specified, all jobs are watched.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1,
+        help="Seconds between polls after a change. Without changes, the interval doubles. (default: 1)",
+    )
+    parser.add_argument(
+        "--max-interval", type=float, default=30, help="Maximum number of seconds between polls. (default: 30)"
+    )
+    parser.add_argument("--timeout", type=float, help="Exits after this number of seconds.")
+    parser.add_argument("--json", action="store_true", help="Prints each change as a line of JSON.")
+
+    parser = subparsers.add_parser("jobs", description=jobs.__doc__)
+    parser.set_defaults(action=jobs)
+    _add_target_arguments(parser, default=None)
+    _add_client_arguments(parser)
+    parser.add_argument(
+        "-p", "--project", default="*", help="Specifies the project, can be a globbing pattern. (default: all)"
+    )
+    parser.add_argument(
+        "--spider", default="*", help="Specifies the spider, can be a globbing pattern. (default: all)"
+    )
+    parser.add_argument(
+        "--state", action="append", choices=STATES, help="Specifies the state, can be specified multiple times."
+    )
+    parser.add_argument(
+        "--since",
+        type=_time,
+        metavar="TIME",
+        help="Lists jobs that started or finished since this time, in the servers' time zone, like"
+        " '2025-01-01 12:00' or a duration before now, like 30m, 12h or 7d.",
+    )
+    parser.add_argument(
+        "--until", type=_time, metavar="TIME", help="Lists jobs that started or finished before this time."
+    )
+    parser.add_argument("--limit", type=int, metavar="N", help="Lists at most N jobs, the most recent first.")
+    parser.add_argument("--json", action="store_true", help="Prints each job as a line of JSON.")
+    parser.add_argument(
+        "--sync", action="store_true", help="Requests new and changed jobs from the targets, before listing jobs."
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="With --sync, reads all jobs, instead of stopping at indexed jobs."
+    )
+    parser.add_argument("--concurrency", type=int, default=4, metavar="N", help="Syncs up to N targets in parallel.")
+    parser.add_argument("--index", metavar="FILE", help="The path of the job index. (default: in the cache directory)")
+
+    parser = subparsers.add_parser("serve", description=serve.__doc__)
+    parser.set_defaults(action=serve)
+    parser.add_argument(
+        "--socket",
+        metavar="PATH",
+        help="Listens on this Unix socket. Set the SCRAPYD_CLIENT_SOCKET environment variable to this path, for"
+        " scrapyd-client to send commands to it. (default: $SCRAPYD_CLIENT_SOCKET, or in the cache directory)",
+    )
+    parser.add_argument(
+        "--connections",
+        type=int,
+        default=10,
+        metavar="N",
+        help="Keeps up to N connections open to each target. (default: 10)",
+    )
+
     # If 'deploy' is moved to this module, these lines can be removed. (b9ba799)
     parsed_args, _ = mainparser.parse_known_args(args)
     if getattr(parsed_args, "action", None) is not deploy:
@@ -129,25 +718,79 @@ def parse_cli_args(args):
         mainparser.print_help()
         raise SystemExit(0)
 
+    if parsed_args.action is schedule and not parsed_args.from_file:
+        if parsed_args.project is None:
+            schedule_parser.error("the following arguments are required: -p/--project")
+        if parsed_args.spider is None:
+            schedule_parser.error("the following arguments are required: SPIDER")
+
+    if parsed_args.action is schedule:
+        if parsed_args.rate is not None and parsed_args.rate <= 0:
+            schedule_parser.error("argument --rate: must be positive")
+        if parsed_args.max_pending is not None and parsed_args.max_pending < 1:
+            schedule_parser.error("argument --max-pending: must be at least 1")
+
+    if parsed_args.action is prune and parsed_args.keep < 1:
+        prune_parser.error("argument --keep: must be at least 1")
+
+    if getattr(parsed_args, "retries", 0) < 0:
+        subparsers.choices[parsed_args.action.__name__].error("argument --retries: must be at least 0")
+
     return parsed_args
 
 
-def main():
-    if not inside_project():
-        print("Error: no Scrapy project found in this location", file=sys.stderr)
-        sys.exit(1)
+def _report_stats(args):
+    if (collector := getattr(args, "collector", None)) is None:
+        return
+    if args.stats:
+        print(collector.summary(), file=sys.stderr)
+    if args.stats_file:
+        with open(args.stats_file, "w") as f:
+            f.write(collector.to_prometheus())
 
+
+def _target_name(args, url):
+    # The name of the target with the URL, or to which the request with the URL was sent, among the targets matching
+    # --targets.
+    if url and getattr(args, "targets", None):
+        for name, target in _get_targets().items():
+            base = (target.get("url") or "").rstrip("/")
+            if fnmatch.fnmatch(name, args.targets) and base and f"{url.rstrip('/')}/".startswith(f"{base}/"):
+                return name
+    return args.target
+
+
+def _connection_errors():
+    # If requests isn't imported, no request was sent.
+    if requests := sys.modules.get("requests"):
+        return requests.ConnectionError
+    return ()
+
+
+def _execute(argv, prepare=None):
+    """
+    Run a command, and return its exit code.
+
+    :param prepare: A function to call with the parsed arguments, before running the command
+    """
     max_response_length = 120
+    args = None
     try:
-        args = parse_cli_args(sys.argv[1:])
+        args = parse_cli_args(argv)
+        if prepare is not None:
+            prepare(args)
         args.action(args)
     except KeyboardInterrupt:
         print("Aborted due to keyboard interrupt.")
         exit_code = 0
     except SystemExit as e:
         exit_code = e.code
-    except requests.ConnectionError as e:
-        print(f"Failed to connect to target ({args.target}):")
+    except _connection_errors() as e:
+        print(f"Failed to connect to target ({_target_name(args, e.request and e.request.url)}):")
+        print(e)
+        exit_code = 1
+    except (CircuitOpen, ServerUnavailable) as e:
+        print(f"Target is unavailable ({_target_name(args, e.url)}):")
         print(e)
         exit_code = 1
     except ErrorResponse as e:
@@ -168,7 +811,16 @@ def main():
     else:
         exit_code = 0
     finally:
-        raise SystemExit(exit_code)
+        _report_stats(args)
+    return exit_code
+
+
+def main():
+    if not inside_project():
+        print("Error: no Scrapy project found in this location", file=sys.stderr)
+        sys.exit(1)
+
+    raise SystemExit(_execute(sys.argv[1:]))
 
 
 if __name__ == "__main__":
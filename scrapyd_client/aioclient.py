@@ -0,0 +1,197 @@
+from __future__ import annotations
+
+import asyncio
+import fnmatch
+import json
+
+import aiohttp
+
+from scrapyd_client.exceptions import MalformedResponse
+from scrapyd_client.pyclient import DEFAULT_TARGET_URL, HEADERS, _check_response
+from scrapyd_client.utils import get_auth
+
+
+class AsyncScrapydClient:
+    """
+    AsyncScrapydClient to interact with a Scrapyd instance from asyncio code.
+
+    It has the basic methods of :class:`~scrapyd_client.pyclient.ScrapydClient`, as coroutines: :meth:`projects`,
+    :meth:`spiders`, :meth:`jobs`, :meth:`daemonstatus`, :meth:`versions`, :meth:`schedule`, :meth:`status`,
+    :meth:`delproject`, :meth:`delversion` and :meth:`cancel`. Methods like ``addversion``, ``schedule_many``,
+    ``cancel_many`` and ``iter_jobs``, and the methods that return records, are available only on ``ScrapydClient``.
+    """
+
+    def __init__(
+        self,
+        url: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        session: aiohttp.ClientSession | None = None,
+        timeout: float | None = None,
+        max_concurrency: int = 100,
+    ) -> None:
+        """
+        Initialize AsyncScrapydClient.
+
+        :param session: The session to send requests with, to share its connection pool with other clients.
+            If not provided, the client creates its own session, which is closed by :meth:`close`.
+        :param timeout: The total timeout of each request, in seconds
+        :param max_concurrency: The maximum number of requests in flight at once
+        """
+        self.url = DEFAULT_TARGET_URL if url is None else url
+        auth = get_auth(url=self.url, username=username, password=password)
+        self.auth = None if auth is None else aiohttp.BasicAuth(auth.username, auth.password)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_concurrency = max_concurrency
+        self._owns_session = session is None
+        self._session = session
+        self._semaphore = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def close(self) -> None:
+        """Close the client's session, unless it was provided by the caller."""
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions (like asyncio semaphores on Python 3.9) must be created inside a running event loop.
+        if self._session is None:
+            self._session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=self.max_concurrency))
+        return self._session
+
+    async def projects(self, pattern: str = "*") -> list[str]:
+        """
+        Return the projects matching a pattern (if provided).
+
+        :param pattern: The `pattern <https://docs.python.org/3/library/fnmatch.html>`__ for the projects to match
+        :return: The "projects" value of the API response, filtered by the pattern (if provided).
+
+        .. seealso:: `listprojects.json <https://scrapyd.readthedocs.io/en/latest/api.html#listprojects-json>`__
+        """
+        return fnmatch.filter((await self._get("listprojects"))["projects"], pattern)
+
+    async def spiders(self, project: str, pattern: str = "*") -> list[str]:
+        """
+        Return the spiders matching a pattern (if provided).
+
+        :param pattern: The `pattern <https://docs.python.org/3/library/fnmatch.html>`__ for the spiders to match
+        :return: The "spiders" value of the API response, filtered by the pattern (if provided).
+
+        .. seealso:: `listspiders.json <https://scrapyd.readthedocs.io/en/latest/api.html#listspiders-json>`__
+        """
+        return fnmatch.filter((await self._get("listspiders", {"project": project}))["spiders"], pattern)
+
+    async def jobs(self, project: str) -> dict:
+        """
+        :return: The unmodified API response.
+
+        .. seealso:: `listjobs.json <https://scrapyd.readthedocs.io/en/latest/api.html#listjobs-json>`__
+        """
+        return await self._get("listjobs", {"project": project})
+
+    async def daemonstatus(self) -> dict:
+        """
+        :return: The unmodified API response.
+
+        .. seealso:: `daemonstatus.json <https://scrapyd.readthedocs.io/en/latest/api.html#daemonstatus-json>`__
+        """
+        return await self._get("daemonstatus")
+
+    async def versions(self, project: str) -> list[str]:
+        """
+        :return: The "versions" value of the API response.
+
+        .. seealso:: `listversions.json <https://scrapyd.readthedocs.io/en/latest/api.html#listversions-json>`__
+        """
+        return (await self._get("listversions", {"project": project}))["versions"]
+
+    async def schedule(self, project: str, spider: str, args: list[tuple[str, str]] | None = None) -> str:
+        """
+        :return: The "jobid" value of the API response.
+
+        .. seealso:: `schedule.json <https://scrapyd.readthedocs.io/en/latest/api.html#schedule-json>`__
+        """
+        if args is None:
+            args = []
+
+        return (await self._post("schedule", data=[*args, ("project", project), ("spider", spider)]))["jobid"]
+
+    async def status(self, jobid: str, project: str | None = None) -> dict:
+        """
+        :return: The unmodified API response.
+
+        .. seealso:: `status.json <https://scrapyd.readthedocs.io/en/latest/api.html#status-json>`__
+        """
+        params = {"job": jobid}
+        if project is not None:
+            params["project"] = project
+
+        return await self._get("status", params)
+
+    async def delproject(self, project: str) -> dict:
+        """
+        :return: The unmodified API response.
+
+        .. seealso:: `delproject.json <https://scrapyd.readthedocs.io/en/latest/api.html#delproject-json>`__
+        """
+        return await self._post("delproject", data={"project": project})
+
+    async def delversion(self, project: str, version: str) -> dict:
+        """
+        :return: The unmodified API response.
+
+        .. seealso:: `delversion.json <https://scrapyd.readthedocs.io/en/latest/api.html#delversion-json>`__
+        """
+        return await self._post("delversion", data={"project": project, "version": version})
+
+    async def cancel(self, project: str, jobid: str, signal: str | None = None) -> dict:
+        """
+        Cancel a job, or remove it from the queue, if pending.
+
+        :param signal: The signal to send to the job's process, if running, like "KILL" (default: Scrapyd's, "TERM")
+        :return: The unmodified API response.
+
+        .. seealso:: `cancel.json <https://scrapyd.readthedocs.io/en/latest/api.html#cancel-json>`__
+        """
+        data = {"project": project, "job": jobid}
+        if signal is not None:
+            data["signal"] = signal
+
+        return await self._post("cancel", data=data)
+
+    async def _get(self, basename: str, params=None):
+        if params is None:
+            params = {}
+
+        return await self._request("GET", basename, params=params)
+
+    async def _post(self, basename: str, data):
+        return await self._request("POST", basename, data=data)
+
+    async def _request(self, method: str, basename: str, **kwargs):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        url = f"{self.url}/{basename}.json"
+        kwargs.update(headers={"User-Agent": HEADERS["User-Agent"]}, auth=self.auth, timeout=self.timeout)
+        async with self._semaphore, self.session.request(method, url, **kwargs) as response:
+            text = await response.text()
+
+        return _process_text(text)
+
+
+def _process_text(text):
+    try:
+        response = json.loads(text)
+    except json.decoder.JSONDecodeError as e:
+        raise MalformedResponse(text) from e
+
+    return _check_response(response)
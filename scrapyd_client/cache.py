@@ -0,0 +1,444 @@
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+from scrapyd_client.egg import package_files, project_files
+from scrapyd_client.utils import cache_dir
+
+DEFAULT_MAX_SIZE = 500 * 1024 * 1024
+DEFAULT_MAX_AGE = 30 * 24 * 60 * 60
+BUILD_FILES = ("MANIFEST.in", "pyproject.toml", "scrapy.cfg", "setup.cfg", "setup.py")
+#: The number of seconds for which each cacheable endpoint's responses are reused.
+DEFAULT_TTLS = {"listprojects": 60, "listspiders": 300, "listversions": 60}
+DEFAULT_MAX_ENTRIES = 256
+
+
+def response_cache_path() -> str:
+    """Return the path of the file in which the command-line tools persist their :class:`ResponseCache`."""
+    return os.path.join(cache_dir(), "responses.json")
+
+
+def deploy_manifest_path() -> str:
+    """Return the path of the file in which ``scrapyd-deploy`` stores its :class:`DeployManifest`."""
+    return os.path.join(cache_dir(), "deployments.json")
+
+
+def source_hashes(root: str, *, requirements: bool = False, all_files: bool = False) -> dict[str, str]:
+    """
+    Return the SHA-256 hash of each of a project's sources, by path relative to ``root``.
+
+    The sources are the same as those hashed by :meth:`EggCache.key`.
+
+    :param requirements: Whether to include the ``requirements.txt`` file
+    :param all_files: Whether to include all files under ``root``
+    """
+    hashes = {}
+    for path in _source_files(root, requirements=requirements, all_files=all_files):
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            while chunk := f.read(65536):
+                digest.update(chunk)
+        hashes[os.path.relpath(path, root).replace(os.sep, "/")] = digest.hexdigest()
+    return hashes
+
+
+class EggCache:
+    """
+    A cache of built eggs, keyed by a hash of the project's sources.
+
+    Entries are evicted when they haven't been used for ``max_age`` seconds, or, least recently used first, when the
+    total size of the cache exceeds ``max_size`` bytes.
+    """
+
+    def __init__(
+        self, directory: str | None = None, max_size: int = DEFAULT_MAX_SIZE, max_age: float = DEFAULT_MAX_AGE
+    ) -> None:
+        self.directory = cache_dir("eggs") if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+        self.max_size = max_size
+        self.max_age = max_age
+
+    def key(self, root: str, *extra: str, requirements: bool = False, all_files: bool = False) -> str:
+        """
+        Return the hash of a project's sources.
+
+        The sources are the build configuration files, the top-level modules, and all files in packages, under the
+        ``root`` directory. A project's own ``setup.py`` can include other files, like ``package_data``,
+        ``data_files`` and ``MANIFEST.in`` patterns, in which case all files must be hashed.
+
+        :param extra: Other values that affect the build, like the settings module and the setuptools command
+        :param requirements: Whether to include the ``requirements.txt`` file
+        :param all_files: Whether to include all files under ``root``, except in ignored and hidden directories and in
+            virtual environments
+        """
+        digest = hashlib.sha256()
+        for value in (f"{sys.version_info[0]}.{sys.version_info[1]}", *extra):
+            digest.update(value.encode() + b"\0")
+        for path in _source_files(root, requirements=requirements, all_files=all_files):
+            digest.update(os.path.relpath(path, root).replace(os.sep, "/").encode() + b"\0")
+            with open(path, "rb") as f:
+                while chunk := f.read(65536):
+                    digest.update(chunk)
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the path to the cached egg, if any, and mark it as recently used."""
+        path = self._path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, eggpath: str) -> str:
+        """Copy the egg into the cache, evict old entries, and return the path to the cached egg."""
+        fd, tmppath = tempfile.mkstemp(suffix=".tmp", dir=self.directory)
+        with os.fdopen(fd, "wb") as f, open(eggpath, "rb") as egg:
+            shutil.copyfileobj(egg, f)
+        path = self._path(key)
+        os.replace(tmppath, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: str | None = None) -> int:
+        """
+        Remove entries that are too old, then the least recently used entries, while the cache is too large.
+
+        :return: The number of entries removed.
+        """
+        now = time.time()
+        entries = []
+        removed = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_file() or entry.path == keep:
+                continue
+            stat = entry.stat()
+            if now - stat.st_mtime > self.max_age:
+                os.remove(entry.path)
+                removed += 1
+            else:
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        size = sum(entry[1] for entry in entries)
+        if keep is not None:
+            size += os.path.getsize(keep)
+        for _mtime, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            os.remove(path)
+            size -= entry_size
+            removed += 1
+
+        return removed
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.egg")
+
+
+class DependencyCache:
+    """
+    A cache of wheels of a project's dependencies, keyed by a hash of its requirements files.
+
+    The requirements files are ``requirements.txt``, and the requirements and constraints files that it includes.
+
+    Each entry is a directory of wheels that pip can install from without network access, using the
+    ``PIP_FIND_LINKS`` and ``PIP_NO_INDEX`` environment variables.
+    """
+
+    marker = ".complete"
+
+    def __init__(self, directory: str | None = None) -> None:
+        self.directory = cache_dir("wheels") if directory is None else directory
+        os.makedirs(self.directory, exist_ok=True)
+
+    def key(self, requirements: str) -> str:
+        """Return the hash of the requirements files, the Python version and the platform."""
+        digest = hashlib.sha256()
+        digest.update(f"{sys.implementation.name}-{sys.version_info[0]}.{sys.version_info[1]}\0".encode())
+        digest.update(f"{sysconfig.get_platform()}\0".encode())
+        for path in _requirement_files(requirements):
+            with open(path, "rb") as f:
+                digest.update(path.encode() + b"\0" + f.read() + b"\0")
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """Return the directory of wheels, if any, and mark it as recently used."""
+        path = os.path.join(self.directory, key)
+        try:
+            os.utime(os.path.join(path, self.marker))
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, key: str, requirements: str, **kwargs) -> str:
+        """
+        Build wheels of the requirements and their dependencies with ``pip wheel``, and return their directory.
+
+        :param kwargs: Keyword arguments to :func:`subprocess.run`, like ``stdout`` and ``stderr``
+        """
+        tmpdir = tempfile.mkdtemp(prefix=".tmp-", dir=self.directory)
+        try:
+            subprocess.run(
+                [sys.executable, "-m", "pip", "wheel", "-r", requirements, "-w", tmpdir], check=True, **kwargs
+            )
+            with open(os.path.join(tmpdir, self.marker), "w"):
+                pass
+            path = os.path.join(self.directory, key)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmpdir, path)
+        except BaseException:
+            shutil.rmtree(tmpdir, ignore_errors=True)
+            raise
+        return path
+
+    def prune(self, max_age: float = DEFAULT_MAX_AGE) -> int:
+        """Remove the entries that haven't been used for ``max_age`` seconds, and return their number."""
+        now = time.time()
+        removed = 0
+        for entry in os.scandir(self.directory):
+            try:
+                mtime = os.path.getmtime(os.path.join(entry.path, self.marker))
+            except FileNotFoundError:  # incomplete
+                mtime = entry.stat().st_mtime
+            if now - mtime > max_age:
+                shutil.rmtree(entry.path, ignore_errors=True)
+                removed += 1
+        return removed
+
+
+class ResponseCache:
+    """
+    A cache of the responses of Scrapyd's read-only endpoints, for use by :class:`~scrapyd_client.ScrapydClient`.
+
+    Responses are reused for the number of seconds in ``ttls``, by endpoint. Endpoints without a TTL aren't cached.
+    Once there are ``max_entries`` entries, the least recently used entry is evicted.
+
+    If ``path`` is provided, the cache is loaded from that JSON file, and saved to it by :meth:`save`, so that it
+    persists across processes. :class:`~scrapyd_client.ScrapydClient` saves its cache when it is closed.
+    """
+
+    def __init__(
+        self, ttls: dict[str, float] | None = None, max_entries: int = DEFAULT_MAX_ENTRIES, path: str | None = None
+    ) -> None:
+        """
+        Initialize ResponseCache.
+
+        :param ttls: The number of seconds for which to reuse responses, by endpoint, like "listspiders".
+            These override :data:`DEFAULT_TTLS`. A TTL of 0 disables the cache for an endpoint.
+        :param path: The path of the file in which to persist the cache, like ``cache_dir("responses.json")``
+        """
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.max_entries = max_entries
+        self.path = path
+        self._entries: OrderedDict[str, list] = OrderedDict()
+        self._lock = threading.Lock()
+        self._changed = False
+        if path is not None:
+            self._load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def cacheable(self, endpoint: str) -> bool:
+        """Return whether the endpoint's responses are cached."""
+        return self.ttls.get(endpoint, 0) > 0
+
+    def get(self, url: str, endpoint: str, params: dict) -> dict | None:
+        """Return the cached response, if any and not expired, and mark it as recently used."""
+        key = _response_key(url, endpoint, params)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[2]
+
+    def set(self, url: str, endpoint: str, params: dict, response: dict) -> None:
+        """Cache the response, and evict the least recently used entry if the cache is full."""
+        key = _response_key(url, endpoint, params)
+        with self._lock:
+            self._entries[key] = [time.time() + self.ttls[endpoint], params.get("project"), response]
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            self._changed = True
+
+    def invalidate(self, url: str, project: str | None = None) -> int:
+        """
+        Remove the responses from a Scrapyd instance that a change to the project can make stale.
+
+        These are the list of projects, and the project's versions and spiders. If ``project`` is not provided, all
+        the instance's responses are removed.
+
+        :return: The number of entries removed.
+        """
+        with self._lock:
+            stale = [
+                key
+                for key, (_expires, entry_project, _response) in self._entries.items()
+                if _response_url(key) == url
+                and (project is None or entry_project in (None, project))  # listprojects has no project
+            ]
+            for key in stale:
+                del self._entries[key]
+            if stale:
+                self._changed = True
+            return len(stale)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+            self._changed = True
+
+    def save(self) -> None:
+        """Save the cache to its file, if it has a path and changed since it was loaded or last saved."""
+        with self._lock:
+            if self.path is None or not self._changed:
+                return
+            self._save()
+            self._changed = False
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                entries = json.load(f)
+        except (OSError, ValueError):  # missing or corrupt
+            return
+        now = time.time()
+        self._entries.update((key, entry) for key, entry in entries if entry[0] > now)
+
+    def _save(self):
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(list(self._entries.items()), f)
+            os.replace(tmppath, self.path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmppath)
+            raise
+
+
+class Deployment(NamedTuple):
+    """A version of a project's sources, as recorded by :class:`DeployManifest`."""
+
+    version: str
+    #: A hash of the options that affect the build, other than the sources, like the settings module.
+    build: str
+    #: The hash of each source file, by path, as returned by :func:`source_hashes`.
+    files: dict[str, str]
+
+    def changes(self, other: Deployment) -> list[tuple[str, str]]:
+        """Return the files that were "added", "modified" or "removed" in the other deployment, sorted by path."""
+        changes = [("removed", path) for path in self.files.keys() - other.files.keys()]
+        changes.extend(
+            ("modified" if path in self.files else "added", path)
+            for path, digest in other.files.items()
+            if self.files.get(path) != digest
+        )
+        return sorted(changes, key=lambda change: change[1])
+
+
+class DeployManifest:
+    """
+    The last deployment of each project to each Scrapyd instance, in a JSON file.
+
+    ``scrapyd-deploy --incremental`` compares the project's sources to the last deployment, to skip the upload if they
+    are unchanged.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Initialize DeployManifest.
+
+        :param path: The path of the file (default: :func:`deploy_manifest_path`)
+        """
+        self.path = deploy_manifest_path() if path is None else path
+
+    def get(self, url: str, project: str) -> Deployment | None:
+        """Return the last deployment of the project to the Scrapyd instance, if any."""
+        data = self._load().get(url, {}).get(project)
+        return None if data is None else Deployment(**data)
+
+    def set(self, url: str, project: str, deployment: Deployment) -> None:
+        """Record the deployment of the project to the Scrapyd instance."""
+        entries = self._load()
+        entries.setdefault(url, {})[project] = deployment._asdict()
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, tmppath = tempfile.mkstemp(suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(entries, f)
+            os.replace(tmppath, self.path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(tmppath)
+            raise
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):  # missing or corrupt
+            return {}
+
+
+def _response_key(url, endpoint, params):
+    return json.dumps([url, endpoint, sorted(params.items())])
+
+
+def _response_url(key):
+    return json.loads(key)[0]
+
+
+def _source_files(root, requirements=False, all_files=False):
+    if all_files:
+        return project_files(root)
+
+    names = [*BUILD_FILES, "requirements.txt"] if requirements else list(BUILD_FILES)
+    files = [os.path.join(root, name) for name in names if os.path.isfile(os.path.join(root, name))]
+
+    files.extend(
+        entry.path
+        for entry in sorted(os.scandir(root), key=lambda entry: entry.name)
+        if entry.is_file() and entry.name.endswith(".py") and entry.name not in BUILD_FILES
+    )
+    files.extend(package_files(root))
+    return files
+
+
+def _requirement_files(path, seen=None):
+    # The requirements file, and the files it includes with -r and -c options, recursively. A missing file is skipped,
+    # for pip to report it.
+    seen = set() if seen is None else seen
+    path = os.path.normpath(path)
+    if path in seen or not os.path.isfile(path):
+        return []
+    seen.add(path)
+    files = [path]
+    with open(path) as f:
+        for line in f:
+            if match := re.match(r"(?:-r|-c|--requirement|--constraint)(?:\s*=\s*|\s+|(?=\S))(\S+)", line.strip()):
+                files.extend(_requirement_files(os.path.join(os.path.dirname(path), match.group(1)), seen))
+    return files
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.utils import TaskResult, _run_concurrently, _schedule_many
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    import requests
+
+    from scrapyd_client.cache import ResponseCache
+    from scrapyd_client.metrics import RequestEvent
+    from scrapyd_client.retry import CircuitBreaker, RetryPolicy
+
+JOB_STATES = ("pending", "running", "finished")
+
+
+class ScrapydCluster:
+    """
+    ScrapydCluster to interact with several Scrapyd instances (nodes) at once.
+
+    Nodes are queried in parallel. A node that fails to respond is skipped, and its exception is stored in the
+    :attr:`failures` attribute until the next call.
+    """
+
+    def __init__(self, clients: dict[str, ScrapydClient], concurrency: int | None = None, load_ttl: float = 5) -> None:
+        """
+        Initialize ScrapydCluster.
+
+        :param clients: The clients of the nodes, by name
+        :param concurrency: The maximum number of nodes to query at once (default: all nodes)
+        :param load_ttl: The number of seconds after which to refresh the nodes' loads, when scheduling jobs
+        """
+        self.clients = clients
+        self.concurrency = concurrency or len(clients)
+        self.load_ttl = load_ttl
+        self.failures: dict[str, Exception] = {}
+        self._nodes: dict[str, dict] = {}
+        self._refresh_failures: dict[str, Exception] = {}
+        self._refreshed = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    @classmethod
+    def from_targets(
+        cls,
+        targets: dict[str, dict],
+        pool_maxsize: int = 10,
+        cache: ResponseCache | None = None,
+        hooks: Iterable[Callable[[RequestEvent], None]] = (),
+        retry: RetryPolicy | None = None,
+        circuit_breaker: Callable[[], CircuitBreaker] | None = None,
+        session: requests.Session | None = None,
+        **kwargs,
+    ) -> ScrapydCluster:
+        """
+        Create a cluster from targets, as returned by :func:`scrapyd_client.utils._get_targets`.
+
+        :param pool_maxsize: The maximum number of connections to keep per node
+        :param cache: The response cache to share between the nodes' clients
+        :param hooks: The functions to call after each request to any node
+        :param retry: The policy to retry failed requests to any node
+        :param circuit_breaker: The function that creates each node's circuit breaker, like
+            :class:`~scrapyd_client.retry.CircuitBreaker`
+        :param session: The session to share between the nodes' clients (default: a session per node, with
+            ``pool_maxsize``)
+        """
+        clients = {
+            name: ScrapydClient(
+                target.get("url"),
+                target.get("username"),
+                password=target.get("password", ""),
+                session=session,
+                pool_maxsize=pool_maxsize,
+                cache=cache,
+                hooks=hooks,
+                retry=retry,
+                circuit_breaker=None if circuit_breaker is None else circuit_breaker(),
+            )
+            for name, target in targets.items()
+        }
+        return cls(clients, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the clients of all nodes."""
+        for client in self.clients.values():
+            client.close()
+
+    def projects(self, pattern: str = "*") -> list[str]:
+        """
+        :return: The projects on any node matching a pattern, in order of first appearance.
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.projects`
+        """
+        projects, self.failures = self._map(lambda client: client.projects(pattern))
+        return _merge(projects.values())
+
+    def spiders(self, project: str, pattern: str = "*") -> list[str]:
+        """
+        Return the spiders of the project matching a pattern, on the nodes that have the project.
+
+        The nodes' projects are refreshed like when scheduling jobs, every ``load_ttl`` seconds.
+
+        :return: The spiders, in order of first appearance.
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.spiders`
+        """
+        nodes, refresh_failures = self._current_nodes()
+        names = [name for name, node in nodes.items() if project in node["projects"]]
+        spiders, failures = self._map(lambda client: client.spiders(project, pattern), names)
+        self.failures = {**refresh_failures, **failures}
+        return _merge(spiders.values())
+
+    def jobs(self, project: str) -> dict:
+        """
+        :return: The pending, running and finished jobs of the project on all nodes. Each job has a "node" key.
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.jobs`
+        """
+        jobs = {state: [] for state in JOB_STATES}
+        responses, self.failures = self._map(lambda client: client.jobs(project))
+        for name, response in responses.items():
+            for state in JOB_STATES:
+                jobs[state].extend({**job, "node": name} for job in response.get(state, []))
+        return jobs
+
+    def daemonstatus(self) -> dict:
+        """
+        Return the total numbers of pending, running and finished jobs on all nodes.
+
+        :return: The totals, and the response of each node under the "nodes" key.
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.daemonstatus`
+        """
+        nodes, self.failures = self._map(lambda client: client.daemonstatus())
+        status = {state: sum(response.get(state, 0) for response in nodes.values()) for state in JOB_STATES}
+        status["nodes"] = nodes
+        return status
+
+    def schedule(self, project: str, spider: str, args: list[tuple[str, str]] | None = None) -> tuple[str, str]:
+        """
+        Schedule a job on the least-loaded node that has the project.
+
+        A node's load is its number of pending and running jobs. Loads are refreshed from ``daemonstatus.json``
+        every ``load_ttl`` seconds, and incremented locally as jobs are scheduled in between. Nodes whose circuit
+        breaker is open are skipped, unless no other node has the project.
+
+        :return: The name of the node, and the "jobid" value of the API response.
+        :raises ValueError: if no node has the project, or if the nodes that failed to refresh might have it
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.schedule`
+        """
+        _, failures = self._current_nodes()
+        with self._lock:
+            candidates = [name for name, node in self._nodes.items() if project in node["projects"]]
+            if not candidates:
+                message = f"No node has the project {project!r}"
+                if failures:
+                    message += "; failed to refresh " + ", ".join(f"{name} ({e})" for name, e in failures.items())
+                raise ValueError(message)
+            candidates = [name for name in candidates if self._available(name)] or candidates
+            name = min(candidates, key=lambda name: self._nodes[name]["load"])
+            self._nodes[name]["load"] += 1
+
+        return name, self.clients[name].schedule(project, spider, args)
+
+    def schedule_many(
+        self, jobs: Iterable[dict], concurrency: int = 1, rate: float | None = None, max_pending: int | None = None
+    ) -> Iterator[TaskResult]:
+        """
+        Schedule jobs, each on the least loaded node that has its project, and yield the results in order.
+
+        ``max_pending`` applies to the total number of pending jobs on all nodes.
+
+        :return: The results, with the job as the ``item``, and the name of the node and the job ID as the ``value``,
+            or an ``error``.
+
+        .. seealso:: :meth:`scrapyd_client.pyclient.ScrapydClient.schedule_many`
+        """
+        return _schedule_many(self, jobs, concurrency, rate, max_pending)
+
+    def refresh(self) -> None:
+        """Refresh the loads and projects of all nodes."""
+
+        def get_node(client):
+            status = client.daemonstatus()
+            return {"load": status.get("pending", 0) + status.get("running", 0), "projects": set(client.projects())}
+
+        nodes, self.failures = self._map(get_node)
+        with self._lock:
+            self._nodes = nodes
+            self._refresh_failures = self.failures
+            self._refreshed = time.monotonic()
+
+    def _current_nodes(self):
+        # Refresh the nodes if stale, without holding the lock used to pick nodes. Other threads that need a refresh
+        # wait for this one's.
+        with self._refresh_lock:
+            if self._refreshed is None or time.monotonic() - self._refreshed > self.load_ttl:
+                self.refresh()
+            return self._nodes, self._refresh_failures
+
+    def _available(self, name):
+        breaker = self.clients[name].circuit_breaker
+        return breaker is None or breaker.available
+
+    def _map(self, func, names=None) -> tuple[dict, dict[str, Exception]]:
+        # Return the results and the exceptions, by node. Callers assign the exceptions to self.failures at once, as
+        # methods can be called from several threads.
+        if names is None:
+            names = list(self.clients)
+
+        results = {}
+        failures = {}
+        for result in _run_concurrently(lambda name: func(self.clients[name]), names, self.concurrency):
+            if result.error:
+                failures[result.item] = result.error
+            else:
+                results[result.item] = result.value
+        return results, failures
+
+
+def _merge(lists) -> list:
+    return list(dict.fromkeys(item for items in lists for item in items))
@@ -1,4 +1,5 @@
 import glob
+import hashlib
 import json
 import os
 import shutil
@@ -11,10 +12,27 @@ from urllib.parse import urljoin
 
 import requests
 from requests.auth import HTTPBasicAuth
-from scrapy.utils.conf import closest_scrapy_cfg
-from scrapy.utils.project import inside_project
 
-from scrapyd_client.utils import _get_targets, get_auth, get_config
+from scrapyd_client.cache import (
+    DependencyCache,
+    DeployManifest,
+    Deployment,
+    EggCache,
+    ResponseCache,
+    response_cache_path,
+    source_hashes,
+)
+from scrapyd_client.egg import build_egg, egg_filename
+from scrapyd_client.exceptions import ErrorResponse, MalformedResponse
+from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.utils import (
+    _get_targets,
+    _read_config,
+    _run_concurrently,
+    closest_scrapy_cfg,
+    get_auth,
+    inside_project,
+)
 
 _SETUP_PY_TEMPLATE = """
 # Automatically created by: scrapyd-deploy
@@ -28,6 +46,7 @@ setup(
     entry_points = {'scrapy': ['settings = %(settings)s']},
 )
 """.lstrip()
+_KIB = 1024
 
 
 def parse_args():
@@ -36,6 +55,13 @@ def parse_args():
     parser.add_argument("-p", "--project", help="the project name in the TARGET")
     parser.add_argument("-v", "--version", help="the version to deploy. Defaults to current timestamp")
     parser.add_argument("-a", "--deploy-all-targets", action="store_true", help="deploy all targets")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        metavar="N",
+        help="the number of targets to deploy to in parallel, with --deploy-all-targets (default: 4)",
+    )
     parser.add_argument(
         "-d",
         "--debug",
@@ -49,12 +75,43 @@ def parse_args():
         action="store_true",
         help="include dependencies from requirements.txt in the egg",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--builder",
+        choices=["setuptools", "native"],
+        default="setuptools",
+        help="build the egg with setup.py (default), or in-process without setup.py",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="build the egg and download dependencies, even if they are cached; the cache hashes all files under the"
+        " project if it has its own setup.py, but not files outside the project",
+    )
+    parser.add_argument(
+        "--prune-cache",
+        action="store_true",
+        help="remove cached eggs and dependencies that haven't been used for 30 days, and exit",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="skip targets to which the same sources were last deployed, if that version is still the latest, and"
+        " print the files changed since",
+    )
+    opts = parser.parse_args()
+    if opts.incremental and (opts.egg or opts.build_egg):
+        parser.error("argument --incremental: not allowed with argument --egg or --build-egg")
+    return opts
 
 
 def main():
     opts = parse_args()
     exitcode = 0
+    if opts.prune_cache:
+        removed = EggCache().evict() + DependencyCache().prune()
+        print(f"Removed {removed} cache entries", file=sys.stderr)
+        sys.exit(0)
+
     if not inside_project():
         print("Error: no Scrapy project found in this location", file=sys.stderr)
         sys.exit(1)
@@ -66,12 +123,24 @@ def main():
         print(f"Writing egg to {opts.build_egg}", file=sys.stderr)
         shutil.copyfile(eggpath, opts.build_egg)
     elif opts.deploy_all_targets:
-        version = None
-        for target in _get_targets().values():
-            if version is None:
-                version = _get_version(target, opts)
-            _, tmpdir = _build_egg_and_deploy_target(target, version, opts)
-            _remove_tmpdir(tmpdir, opts)
+        targets = _get_targets()
+        if not targets:
+            print("Error: No targets are configured", file=sys.stderr)
+            sys.exit(1)
+        version = _get_version(next(iter(targets.values())), opts)
+        if opts.incremental:
+            targets = _changed_targets(targets, _deployment(version, opts), opts)
+            if not targets:
+                sys.exit(0)
+        if opts.egg:
+            print(f"Using egg: {opts.egg}", file=sys.stderr)
+            eggpath = opts.egg
+        else:
+            print(f"Packing version {version}", file=sys.stderr)
+            eggpath, tmpdir = _build_egg(opts)
+
+        exitcode = _deploy_all_targets(targets, version, eggpath, opts)
+        _remove_tmpdir(tmpdir, opts)
     else:  # build egg and deploy
         try:
             target = _get_targets()[opts.target]
@@ -103,6 +172,17 @@ def _build_egg_and_deploy_target(target, version, opts):
         print("Error: Missing project", file=sys.stderr)
         sys.exit(1)
 
+    if opts.incremental:
+        previous, reason, changes = _check_deployment(target, project, _deployment(version, opts))
+        if reason is None:
+            print(
+                f"Skipping upload: no changes since version {previous.version}, the latest version on the target",
+                file=sys.stderr,
+            )
+            return exitcode, tmpdir
+        print(f"Deploying: {reason}", file=sys.stderr)
+        _print_changes(changes)
+
     if opts.egg:
         print(f"Using egg: {opts.egg}", file=sys.stderr)
         eggpath = opts.egg
@@ -113,35 +193,21 @@ def _build_egg_and_deploy_target(target, version, opts):
     url = _url(target, "addversion.json")
     print(f'Deploying to project "{project}" in {url}', file=sys.stderr)
 
-    # Upload egg.
-    kwargs = {}
-    if auth := get_auth(url=target["url"], username=target.get("username"), password=target.get("password", "")):
-        kwargs["auth"] = HTTPBasicAuth(auth.username, auth.password)
-
     try:
-        with open(eggpath, "rb") as f:
-            response = requests.post(
-                _url(target, "addversion.json"),
-                data={"project": project, "version": version},
-                files=[("egg", ("project.egg", f))],
-                **kwargs,
-            )
-        response.raise_for_status()
-        print(f"Server response ({response.status_code}):", file=sys.stderr)
-        print(response.text)
-    except requests.HTTPError as e:
-        print(f"Deploy failed ({e.response.status_code}):", file=sys.stderr)
+        response, _ = _upload_egg(target, project, version, eggpath, _response_cache(), bar=sys.stderr.isatty())
+        if opts.incremental:
+            DeployManifest().set(target["url"], project, _deployment(version, opts))
+        print("Server response:", file=sys.stderr)
+        print(json.dumps(response))
+    except ErrorResponse as e:
+        print("Deploy failed:", file=sys.stderr)
         exitcode = 1
-        try:
-            data = e.response.json()
-        except json.decoder.JSONDecodeError:
-            print(e.response.text)
-        else:
-            if "status" in data and "message" in data:
-                print(f"Status: {data['status']}")
-                print(f"Message:\n{data['message']}")
-            else:
-                print(json.dumps(data, indent=3))
+        print("Status: error")
+        print(f"Message:\n{e}")
+    except MalformedResponse as e:
+        print("Deploy failed:", file=sys.stderr)
+        exitcode = 1
+        print(e)
     except requests.RequestException as e:
         print(f"Deploy failed: {e}", file=sys.stderr)
         exitcode = 1
@@ -149,6 +215,154 @@ def _build_egg_and_deploy_target(target, version, opts):
     return exitcode, tmpdir
 
 
+def _deploy_all_targets(targets, version, eggpath, opts):
+    # The clients share the cache, so that concurrent deploys don't overwrite each other's changes to its file.
+    cache = _response_cache()
+
+    def deploy(item):
+        _name, target = item
+        project = opts.project or target.get("project")
+        if not project:
+            raise ValueError("Missing project")
+        if "url" not in target:
+            raise ValueError("Missing url for project")
+        return project, _upload_egg(target, project, version, eggpath, cache)
+
+    print(f"Deploying to {len(targets)} targets", file=sys.stderr)
+    # The sources of the egg, which was built by the time this runs.
+    deployment = _deployment(version, opts) if opts.incremental else None
+    exitcode = 0
+    for result in _run_concurrently(deploy, targets.items(), opts.concurrency):
+        name = result.item[0]
+        if result.error is None:
+            project, (response, throughput) = result.value
+            if deployment is not None:
+                DeployManifest().set(result.item[1]["url"], project, deployment)
+            status = "ok"
+            detail = f'{_format_size(throughput or 0)}/s, project "{project}": {json.dumps(response)}'
+        else:
+            exitcode = 1
+            status, detail = "failed", str(result.error)
+        print(f"{name:<20} {status:<12} {result.elapsed:>7.2f}s  {detail}")
+
+    return exitcode
+
+
+def _deployment(version, opts):
+    # The sources and the build options that --incremental compares to the last deployment to each target.
+    root = os.path.dirname(closest_scrapy_cfg())
+    settings = _read_config().get("settings", "default")
+    build = f"{sys.version_info[0]}.{sys.version_info[1]}\0{settings}\0{opts.builder}\0{opts.include_dependencies}"
+    return Deployment(
+        version,
+        hashlib.sha256(build.encode()).hexdigest(),
+        source_hashes(root, requirements=opts.include_dependencies, all_files=_custom_setup(root, settings, opts)),
+    )
+
+
+def _check_deployment(target, project, deployment):
+    """Return the last deployment to the target, and why to upload the egg, with the changed files, or ``None``."""
+    previous = DeployManifest().get(target.get("url"), project)
+    if previous is None:
+        return previous, "no previous deployment with --incremental", []
+    if previous.build != deployment.build:
+        return previous, f"build options changed since version {previous.version}", []
+    if changes := previous.changes(deployment):
+        return previous, f"{len(changes)} file(s) changed since version {previous.version}", changes
+    try:
+        response = requests.get(_url(target, "listversions.json"), params={"project": project}, **_auth(target))
+        response.raise_for_status()
+        versions = response.json()["versions"]
+    except (requests.RequestException, ValueError, KeyError) as e:
+        return previous, f"failed to list versions ({e})", []
+    if not versions or versions[-1] != previous.version:
+        # The version was deleted, or another version was deployed since.
+        return previous, f"version {previous.version} isn't the latest version on the target", []
+    return previous, None, []
+
+
+def _changed_targets(targets, deployment, opts):
+    def check(item):
+        _name, target = item
+        return _check_deployment(target, opts.project or target.get("project"), deployment)
+
+    changed = {}
+    for result in _run_concurrently(check, targets.items(), opts.concurrency):
+        name, target = result.item
+        if result.error is not None:  # like a missing url, reported by the deploy
+            changed[name] = target
+            continue
+        previous, reason, changes = result.value
+        if reason is None:
+            print(f"{name:<20} {'unchanged':<12} {result.elapsed:>7.2f}s  version {previous.version}")
+        else:
+            print(f"Deploying to {name}: {reason}", file=sys.stderr)
+            _print_changes(changes)
+            changed[name] = target
+    return changed
+
+
+def _print_changes(changes):
+    for change, path in changes:
+        print(f"  {change:<8}  {path}", file=sys.stderr)
+
+
+def _auth(target):
+    if auth := get_auth(url=target["url"], username=target.get("username"), password=target.get("password", "")):
+        return {"auth": HTTPBasicAuth(auth.username, auth.password)}
+    return {}
+
+
+def _upload_egg(target, project, version, eggpath, cache=None, *, bar=False):
+    # Return the API response, and the upload's throughput in bytes per second.
+    progress = _Progress(bar=bar)
+    username, password = target.get("username"), target.get("password", "")
+    with ScrapydClient(target["url"], username, password=password, cache=cache) as client:
+        response = client.addversion(project, version, eggpath, callback=progress)
+    return response, progress.throughput
+
+
+def _response_cache():
+    # The new version changes the project's versions and spiders, as cached by scrapyd-client's --cache option.
+    path = response_cache_path()
+    return ResponseCache(path=path) if os.path.exists(path) else None
+
+
+class _Progress:
+    # Measures the upload's throughput, and displays a progress bar if ``bar`` is set.
+    def __init__(self, *, bar=False, width=30):
+        self.bar = bar
+        self.width = width
+        self.started = time.monotonic()
+        self.percent = None
+        self.throughput = None
+
+    def __call__(self, sent, total):
+        throughput = sent / max(time.monotonic() - self.started, 1e-9)
+        if sent == total:
+            self.throughput = throughput
+        percent = sent * 100 // total
+        if not self.bar or percent == self.percent:
+            return
+        self.percent = percent
+        filled = self.width * sent // total
+        print(
+            f"\rUploading [{'#' * filled}{' ' * (self.width - filled)}] {percent:3}%"
+            f" {_format_size(sent)} of {_format_size(total)}, {_format_size(throughput)}/s",
+            end="\n" if sent == total else "",
+            file=sys.stderr,
+            flush=True,
+        )
+
+
+def _format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < _KIB:
+            return f"{size:.1f} {unit}"
+        size /= _KIB
+    return f"{size:.1f} GB"
+
+
 def _url(target, action):
     if "url" in target:
         return urljoin(target["url"], action)
@@ -189,17 +403,24 @@ def _get_version(target, opts):
     return str(int(time.time()))
 
 
+def _custom_setup(root, settings, opts):
+    # Whether setuptools builds the egg with the project's own setup.py, which can include any file.
+    if opts.builder != "setuptools" or not os.path.exists(path := os.path.join(root, "setup.py")):
+        return False
+    with open(path) as f:
+        return f.read() != _SETUP_PY_TEMPLATE % {"settings": settings}
+
+
 def _build_egg(opts):
     closest = closest_scrapy_cfg()
     os.chdir(os.path.dirname(closest))
-    if not os.path.exists("setup.py"):
-        settings = get_config().get("settings", "default")
-        with open("setup.py", "w") as f:
-            f.write(_SETUP_PY_TEMPLATE % {"settings": settings})
-    tmpdir = tempfile.mkdtemp(prefix="scrapydeploy-")
+    settings = _read_config().get("settings", "default")
 
     if opts.include_dependencies:
         print("Including dependencies from requirements.txt", file=sys.stderr)
+        if opts.builder == "native":
+            print("Error: --include-dependencies requires the setuptools builder", file=sys.stderr)
+            sys.exit(1)
         if not os.path.isfile("requirements.txt"):
             print("Error: Missing requirements.txt", file=sys.stderr)
             sys.exit(1)
@@ -207,11 +428,44 @@ def _build_egg(opts):
     else:
         command = "bdist_egg"
 
-    kwargs = {} if opts.debug else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
-    subprocess.run([sys.executable, "setup.py", "clean", "-a"], check=True, **kwargs)
-    subprocess.run([sys.executable, "setup.py", command, "-d", tmpdir], check=True, **kwargs)
+    if opts.builder == "setuptools" and not os.path.exists("setup.py"):
+        with open("setup.py", "w") as f:
+            f.write(_SETUP_PY_TEMPLATE % {"settings": settings})
+
+    if not opts.no_cache:
+        cache = EggCache()
+        key = cache.key(
+            os.getcwd(),
+            settings,
+            opts.builder,
+            command,
+            requirements=opts.include_dependencies,
+            all_files=_custom_setup(os.getcwd(), settings, opts),
+        )
+        if eggpath := cache.get(key):
+            print(f"Using cached egg: {eggpath}", file=sys.stderr)
+            return eggpath, None
+
+    tmpdir = tempfile.mkdtemp(prefix="scrapydeploy-")
+
+    if opts.builder == "native":
+        eggpath = build_egg(os.getcwd(), settings, os.path.join(tmpdir, egg_filename()))
+    else:
+        kwargs = {} if opts.debug else {"stdout": subprocess.DEVNULL, "stderr": subprocess.DEVNULL}
+        if opts.include_dependencies and not opts.no_cache:
+            # bdist_uberegg runs "pip install -r requirements.txt", which then installs from the cached wheels.
+            dependency_cache = DependencyCache()
+            dependency_key = dependency_cache.key("requirements.txt")
+            wheeldir = dependency_cache.get(dependency_key) or dependency_cache.put(
+                dependency_key, "requirements.txt", **kwargs
+            )
+            kwargs["env"] = {**os.environ, "PIP_FIND_LINKS": wheeldir, "PIP_NO_INDEX": "1"}
+        subprocess.run([sys.executable, "setup.py", "clean", "-a"], check=True, **kwargs)
+        subprocess.run([sys.executable, "setup.py", command, "-d", tmpdir], check=True, **kwargs)
+        eggpath = glob.glob(os.path.join(tmpdir, "*.egg"))[0]
 
-    eggpath = glob.glob(os.path.join(tmpdir, "*.egg"))[0]
+    if not opts.no_cache:
+        cache.put(key, eggpath)
     return eggpath, tmpdir
 
 
@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import os
+import shutil
+import sys
+import zipfile
+
+IGNORED_DIRS = {"__pycache__", "build", "dist"}
+IGNORED_SUFFIXES = (".egg", ".pyc", ".pyo")
+# A fixed timestamp makes the egg reproducible, like SOURCE_DATE_EPOCH.
+DATE_TIME = (1980, 1, 1, 0, 0, 0)
+
+_PKG_INFO_TEMPLATE = """\
+Metadata-Version: 2.1
+Name: %(name)s
+Version: %(version)s
+"""
+
+_ENTRY_POINTS_TEMPLATE = """\
+[scrapy]
+settings = %(settings)s
+"""
+
+
+def egg_filename(name: str = "project", version: str = "1.0") -> str:
+    """Return the filename of an egg, like setuptools' ``bdist_egg`` command."""
+    return f"{name}-{version}-py{sys.version_info[0]}.{sys.version_info[1]}.egg"
+
+
+def package_files(root: str) -> list[str]:
+    """
+    Return the files in the packages under the ``root`` directory, in a stable order.
+
+    Like setuptools' ``find_packages``, a package is a directory with an ``__init__.py`` file, whose parent directory
+    is a package or the ``root`` directory. Unlike ``bdist_egg``, data files are included.
+    """
+    files = []
+    for entry in sorted(os.scandir(root), key=lambda entry: entry.name):
+        if entry.is_dir() and _is_included(entry.name) and os.path.isfile(os.path.join(entry.path, "__init__.py")):
+            for dirpath, dirnames, filenames in os.walk(entry.path):
+                dirnames[:] = sorted(dirname for dirname in dirnames if _is_included(dirname))
+                files.extend(
+                    os.path.join(dirpath, filename)
+                    for filename in sorted(filenames)
+                    if not filename.endswith(IGNORED_SUFFIXES)
+                )
+    return files
+
+
+def project_files(root: str) -> list[str]:
+    """
+    Return all files under the ``root`` directory, in a stable order.
+
+    Files in hidden directories, in ignored directories, like ``build``, and in virtual environments are excluded.
+    """
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(
+            dirname
+            for dirname in dirnames
+            if _is_included(dirname) and not os.path.isfile(os.path.join(dirpath, dirname, "pyvenv.cfg"))
+        )
+        files.extend(
+            os.path.join(dirpath, filename)
+            for filename in sorted(filenames)
+            if not filename.endswith(IGNORED_SUFFIXES)
+        )
+    return files
+
+
+def build_egg(root: str, settings: str, path: str, name: str = "project", version: str = "1.0") -> str:
+    """
+    Write an egg of the packages under the ``root`` directory, without running setuptools.
+
+    Files are streamed into the archive. The ``EGG-INFO`` directory declares the ``scrapy`` settings entry point.
+
+    :param settings: The Scrapy settings module, like ``myproject.settings``
+    :param path: The path of the egg to write
+    :return: The path of the egg
+    """
+    files = [os.path.relpath(filepath, root).replace(os.sep, "/") for filepath in package_files(root)]
+    top_level = sorted({filename.split("/", 1)[0] for filename in files})
+    metadata = {
+        "PKG-INFO": _PKG_INFO_TEMPLATE % {"name": name, "version": version},
+        "SOURCES.txt": "".join(f"{filename}\n" for filename in files),
+        "dependency_links.txt": "\n",
+        "entry_points.txt": _ENTRY_POINTS_TEMPLATE % {"settings": settings},
+        "top_level.txt": "".join(f"{package}\n" for package in top_level),
+        "zip-safe": "\n",
+    }
+
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as egg:
+        for filename in files:
+            filepath = os.path.join(root, filename)
+            info = zipfile.ZipInfo(filename, date_time=DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.file_size = os.path.getsize(filepath)  # to use ZIP64 extensions if needed
+            with open(filepath, "rb") as src, egg.open(info, "w") as dst:
+                shutil.copyfileobj(src, dst)
+        for filename, content in metadata.items():
+            info = zipfile.ZipInfo(f"EGG-INFO/{filename}", date_time=DATE_TIME)
+            info.compress_type = zipfile.ZIP_DEFLATED
+            egg.writestr(info, content)
+
+    return path
+
+
+def _is_included(dirname):
+    return not dirname.startswith(".") and dirname not in IGNORED_DIRS and not dirname.endswith(".egg-info")
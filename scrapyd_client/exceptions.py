@@ -1,6 +1,39 @@
+from __future__ import annotations
+
+
 class ErrorResponse(Exception):  # noqa: N818
     """Raised when Scrapyd reports an error."""
 
 
 class MalformedResponse(Exception):  # noqa: N818
     """Raised when the response can't be decoded."""
+
+
+class RunningJobs(Exception):  # noqa: N818
+    """Raised when a project's versions aren't pruned, because Scrapyd doesn't report the versions of running jobs."""
+
+
+class ServerUnavailable(Exception):  # noqa: N818
+    """Raised when the response has a 502, 503 or 504 status, if the client has a retry policy or circuit breaker."""
+
+    def __init__(self, message: str = "", url: str | None = None) -> None:
+        """
+        Initialize ServerUnavailable.
+
+        :param url: The URL of the Scrapyd instance
+        """
+        super().__init__(message)
+        self.url = url
+
+
+class CircuitOpen(Exception):  # noqa: N818
+    """Raised when a request isn't sent, because the node's circuit breaker is open."""
+
+    def __init__(self, message: str = "", url: str | None = None) -> None:
+        """
+        Initialize CircuitOpen.
+
+        :param url: The URL of the Scrapyd instance, set by the client
+        """
+        super().__init__(message)
+        self.url = url
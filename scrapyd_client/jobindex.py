@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, NamedTuple
+
+from scrapyd_client.cache import cache_dir
+from scrapyd_client.records import STATES, Job
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from scrapyd_client.pyclient import ScrapydClient
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    target TEXT NOT NULL,
+    project TEXT NOT NULL,
+    id TEXT NOT NULL,
+    spider TEXT NOT NULL,
+    state TEXT NOT NULL,
+    pid INTEGER,
+    start_time TEXT,
+    end_time TEXT,
+    time TEXT,
+    log_url TEXT,
+    items_url TEXT,
+    PRIMARY KEY (target, project, id)
+);
+CREATE INDEX IF NOT EXISTS jobs_project_spider_time ON jobs (project, spider, time);
+CREATE INDEX IF NOT EXISTS jobs_state_time ON jobs (state, time);
+CREATE INDEX IF NOT EXISTS jobs_time ON jobs (time);
+CREATE TABLE IF NOT EXISTS syncs (
+    target TEXT NOT NULL,
+    project TEXT NOT NULL,
+    synced_at REAL NOT NULL,
+    PRIMARY KEY (target, project)
+);
+"""
+INSERT_JOB = """
+INSERT OR REPLACE INTO jobs (target, time, project, spider, id, state, pid, start_time, end_time, log_url, items_url)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+SELECT_JOBS = "SELECT target, project, spider, id, state, pid, start_time, end_time, log_url, items_url FROM jobs"
+PATTERN_CHARS = frozenset("*?[")
+
+
+def job_index_path() -> str:
+    """Return the path of the file in which the command-line tools store their :class:`JobIndex`."""
+    return os.path.join(cache_dir(), "jobs.sqlite3")
+
+
+class SyncResult(NamedTuple):
+    """The changes to the index of one target's project, as returned by :meth:`JobIndex.sync`."""
+
+    target: str
+    project: str
+    #: The number of jobs that weren't in the index.
+    added: int
+    #: The number of jobs whose state changed.
+    updated: int
+    #: The number of pending or running jobs that Scrapyd no longer lists, like canceled pending jobs.
+    removed: int
+
+
+class IndexedJob(NamedTuple):
+    """A job in the index, as returned by :meth:`JobIndex.query`."""
+
+    target: str
+    job: Job
+
+
+class JobIndex:
+    """
+    A local index of the jobs of Scrapyd targets, in a SQLite database.
+
+    :meth:`sync` updates the index from a target's ``listjobs.json`` response, writing only new and changed jobs. The
+    index keeps finished jobs after Scrapyd discards them, and :meth:`query` filters jobs by target, project, spider,
+    state and time using the database's indexes, without sending requests.
+
+    The index can be shared between threads.
+    """
+
+    def __init__(self, path: str | None = None) -> None:
+        """
+        Initialize JobIndex.
+
+        :param path: The path of the database (default: :func:`job_index_path`). Use ":memory:" for a temporary index.
+        """
+        self.path = job_index_path() if path is None else path
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self._db.close()
+
+    def sync(
+        self, client: ScrapydClient, project: str, target: str | None = None, *, full: bool = False
+    ) -> SyncResult:
+        """
+        Update the index with a project's jobs on a target.
+
+        Scrapyd lists finished jobs from the most recently finished. Unless ``full`` is set, the response is read only
+        until a job that is finished in the index, once all the jobs that were pending or running are accounted for.
+        Earlier syncs have indexed the rest.
+
+        :param target: The name of the target in the index (default: the client's URL)
+        :param full: Whether to read the whole response, for example, if the index was edited
+        """
+        target = client.url if target is None else target
+        with self._lock:
+            active = dict(
+                self._db.execute(
+                    "SELECT id, state FROM jobs WHERE target = ? AND project = ? AND state != 'finished'",
+                    (target, project),
+                )
+            )
+
+        changes = []
+        added = 0
+        with contextlib.closing(client.iter_jobs(project)) as jobs:
+            for job in jobs:
+                previous = active.pop(job.id, None)
+                if previous == job.state:
+                    continue
+                if previous is None and job.state == "finished":
+                    with self._lock:
+                        known = self._db.execute(
+                            "SELECT 1 FROM jobs WHERE target = ? AND project = ? AND id = ?", (target, project, job.id)
+                        ).fetchone()
+                    if known:
+                        if not full and not active:
+                            break
+                        continue
+                if previous is None:
+                    added += 1
+                changes.append(job)
+
+        with self._lock, self._db:
+            self._db.executemany(
+                INSERT_JOB,
+                ((target, _format(job.time), *_row(job)) for job in changes),
+            )
+            self._db.executemany(
+                "DELETE FROM jobs WHERE target = ? AND project = ? AND id = ?",
+                ((target, project, jobid) for jobid in active),
+            )
+            self._db.execute(
+                "INSERT OR REPLACE INTO syncs (target, project, synced_at) VALUES (?, ?, ?)",
+                (target, project, time.time()),
+            )
+
+        return SyncResult(target, project, added, len(changes) - added, len(active))
+
+    def last_synced(self, target: str, project: str) -> float | None:
+        """Return the time of the last sync of the target's project, as a Unix timestamp, or ``None`` if never."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT synced_at FROM syncs WHERE target = ? AND project = ?", (target, project)
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def query(
+        self,
+        project: str = "*",
+        spider: str = "*",
+        state: str | Iterable[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+        target: str = "*",
+        limit: int | None = None,
+    ) -> list[IndexedJob]:
+        """
+        Return the indexed jobs matching the filters, from the most recently changed.
+
+        The filters have the same meaning as those of :meth:`~scrapyd_client.pyclient.ScrapydClient.iter_jobs`.
+
+        :param project: The `pattern <https://docs.python.org/3/library/fnmatch.html>`__ for the projects to match
+        :param spider: The pattern for the spiders to match
+        :param state: The state or states to match, like "finished" (default: all)
+        :param since: The time from which the job last changed state, naive, in the Scrapyd server's time zone.
+            Pending jobs don't match.
+        :param until: The time before which the job last changed state. Pending jobs don't match.
+        :param target: The pattern for the targets to match
+        :param limit: The maximum number of jobs to return
+        """
+        clauses = []
+        params = []
+        # The patterns to match with fnmatch, like ScrapydClient, by column number. SQLite's GLOB differs.
+        patterns = []
+        for number, (column, pattern) in enumerate((("target", target), ("project", project), ("spider", spider))):
+            if pattern == "*":
+                continue
+            if PATTERN_CHARS.intersection(pattern):
+                patterns.append((number, pattern))
+            else:
+                # An exact match can use the indexes.
+                clauses.append(f"{column} = ?")
+                params.append(pattern)
+        if state is not None:
+            states = (state,) if isinstance(state, str) else tuple(state)
+            if unknown := set(states) - set(STATES):
+                raise ValueError(f"Unknown states: {', '.join(sorted(unknown))}")
+            clauses.append(f"state IN ({', '.join('?' * len(states))})")
+            params.extend(states)
+        if since is not None:
+            clauses.append("time >= ?")
+            params.append(_format(since))
+        if until is not None:
+            clauses.append("time < ?")
+            params.append(_format(until))
+
+        sql = SELECT_JOBS
+        if clauses:
+            sql += f" WHERE {' AND '.join(clauses)}"
+        sql += " ORDER BY time IS NULL DESC, time DESC"
+
+        with self._lock:
+            rows = self._db.execute(sql, params)
+            if patterns:
+                rows = (row for row in rows if all(fnmatch.fnmatch(row[i], pattern) for i, pattern in patterns))
+            rows = list(itertools.islice(rows, limit))
+        return [IndexedJob(target, _job(row)) for target, *row in rows]
+
+
+def _format(value):
+    # A fixed format, so that times sort as text.
+    return None if value is None else value.isoformat(" ", timespec="microseconds")
+
+
+def _parse(value):
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _row(job):
+    return (
+        job.project,
+        job.spider,
+        job.id,
+        job.state,
+        job.pid,
+        _format(job.start_time),
+        _format(job.end_time),
+        job.log_url,
+        job.items_url,
+    )
+
+
+def _job(row):
+    project, spider, jobid, state, pid, start_time, end_time, log_url, items_url = row
+    return Job(project, spider, jobid, state, pid, _parse(start_time), _parse(end_time), log_url, items_url)
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import codecs
+import json
+from typing import TYPE_CHECKING, Any
+
+from scrapyd_client.exceptions import MalformedResponse
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+WHITESPACE = " \t\n\r"
+# The number of consumed characters after which the buffer is compacted.
+COMPACT_THRESHOLD = 64 * 1024
+# The number of characters of the response to include in errors.
+EXCERPT_LENGTH = 200
+
+
+class JSONObjectStream:
+    """
+    An incremental parser of a JSON object, which yields the items of its arrays as they are read.
+
+    Only one item, and the chunk being read, are in memory at once. The object's other values are stored in
+    :attr:`fields`, once read.
+    """
+
+    def __init__(self, chunks: Iterable[bytes]) -> None:
+        """
+        Initialize JSONObjectStream.
+
+        :param chunks: The UTF-8 encoded object, in chunks, like ``response.iter_content(65536)``
+        """
+        self.fields: dict[str, Any] = {}
+        self.bytes_read = 0
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._json = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def __iter__(self) -> Iterator[tuple[str, Any]]:
+        """Yield the key of each array and each of its items, in order."""
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self._value()
+            if not isinstance(key, str):
+                self._error("Expected a key")
+            self._expect(":")
+            if self._peek() == "[":
+                self._pos += 1
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield key, self._value()
+                        if self._next(",]") == "]":
+                            break
+            else:
+                self.fields[key] = self._value()
+            if self._next(",}") == "}":
+                return
+
+    def _value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = self._json.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if not self._read():
+                    self._error("Invalid JSON")
+                continue
+            # A number (or literal) at the end of the buffer might continue in the next chunk.
+            if end == len(self._buffer) and self._read():
+                continue
+            self._pos = end
+            return value
+
+    def _expect(self, char):
+        if self._peek() != char:
+            self._error(f"Expected {char!r}")
+        self._pos += 1
+
+    def _next(self, chars):
+        char = self._peek()
+        if char not in chars:
+            self._error(f"Expected one of {chars!r}")
+        self._pos += 1
+        return char
+
+    def _peek(self):
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read():
+                self._error("Unexpected end of response")
+
+    def _read(self):
+        if self._eof:
+            return False
+        if self._pos > COMPACT_THRESHOLD:
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        for chunk in self._chunks:
+            self.bytes_read += len(chunk)
+            if text := self._decoder.decode(chunk):
+                self._buffer += text
+                return True
+        self._eof = True
+        self._buffer += self._decoder.decode(b"", final=True)
+        return False
+
+    def _error(self, message):
+        excerpt = self._buffer[max(0, self._pos - EXCERPT_LENGTH // 2) : self._pos + EXCERPT_LENGTH // 2]
+        raise MalformedResponse(f"{message}: {excerpt}")
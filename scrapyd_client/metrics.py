@@ -0,0 +1,189 @@
+from __future__ import annotations
+
+import bisect
+import threading
+from typing import NamedTuple
+
+#: The upper bounds of the histograms' buckets, in seconds.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+PHASES = ("connect", "server", "transfer", "decode")
+
+
+class RequestEvent(NamedTuple):
+    """
+    A request to Scrapyd, as passed to the hooks of :class:`~scrapyd_client.ScrapydClient`.
+
+    The durations are in seconds. ``connect`` is the time to resolve the host and open a connection (including the TLS
+    handshake), which is 0 if a connection was reused, or if the session wasn't created by
+    :func:`~scrapyd_client.pyclient.create_session`. ``server`` is the time from sending the request to receiving the
+    response's headers, ``transfer`` the time to receive the response's body, and ``decode`` the time to parse it.
+    """
+
+    method: str
+    endpoint: str
+    url: str
+    #: The HTTP status code, or ``None`` if no response was received.
+    status: int | None
+    #: The exception raised by the request, if any, like a connection error or an error response.
+    error: Exception | None
+    request_bytes: int
+    response_bytes: int
+    connect: float
+    server: float
+    transfer: float
+    decode: float
+    total: float
+
+
+class Histogram:
+    """A histogram of durations, with cumulative buckets like Prometheus'."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # the last bucket is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value: float) -> None:
+        """Add a value."""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def cumulative(self) -> list[tuple[float, int]]:
+        """Return the upper bound of each bucket, and the number of values less than or equal to it."""
+        total = 0
+        result = []
+        for bound, count in zip((*self.buckets, float("inf")), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q: float) -> float | None:
+        """Return an estimate of the quantile, by linear interpolation within its bucket, or ``None`` if empty."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        lower, seen = self.min, 0
+        for bound, total in self.cumulative():
+            if total >= rank and total > seen:
+                upper = min(bound, self.max)
+                lower = max(lower, self.min)
+                return lower + (upper - lower) * (rank - seen) / (total - seen)
+            lower, seen = bound, total
+        return self.max
+
+    @property
+    def mean(self) -> float | None:
+        return self.sum / self.count if self.count else None
+
+
+class EndpointMetrics:
+    """The metrics of the requests to one endpoint, as collected by :class:`MetricsCollector`."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.requests = 0
+        self.errors = 0
+        #: The number of requests, by HTTP status code, or ``None`` if no response was received.
+        self.statuses: dict[int | None, int] = {}
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.duration = Histogram(buckets)
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+
+
+class MetricsCollector:
+    """
+    An in-memory collector of request metrics, by endpoint.
+
+    Pass it as a hook to :class:`~scrapyd_client.ScrapydClient`. It can be shared by several clients and threads.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        #: The metrics, by endpoint, like "schedule".
+        self.endpoints: dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: RequestEvent) -> None:
+        """Record the request."""
+        with self._lock:
+            metrics = self.endpoints.get(event.endpoint)
+            if metrics is None:
+                metrics = self.endpoints[event.endpoint] = EndpointMetrics(self.buckets)
+            metrics.requests += 1
+            if event.error is not None:
+                metrics.errors += 1
+            metrics.statuses[event.status] = metrics.statuses.get(event.status, 0) + 1
+            metrics.request_bytes += event.request_bytes
+            metrics.response_bytes += event.response_bytes
+            metrics.duration.observe(event.total)
+            for phase in PHASES:
+                metrics.phases[phase].observe(getattr(event, phase))
+
+    def summary(self) -> str:
+        """Return a table of the number of requests, errors, and durations in milliseconds, by endpoint."""
+        columns = ("requests", "errors", "mean", "p50", "p95", "max", *PHASES)
+        lines = [f"{'endpoint':<16}" + "".join(f"{column:>10}" for column in columns)]
+        with self._lock:
+            for endpoint, metrics in sorted(self.endpoints.items()):
+                duration = metrics.duration
+                values = [duration.mean, duration.quantile(0.5), duration.quantile(0.95), duration.max]
+                values.extend(metrics.phases[phase].mean for phase in PHASES)
+                lines.append(
+                    f"{endpoint:<16}{metrics.requests:>10}{metrics.errors:>10}"
+                    + "".join(f"{value * 1000:>10.1f}" for value in values)
+                )
+        return "\n".join(lines)
+
+    def to_prometheus(self, namespace: str = "scrapyd_client") -> str:
+        """Return the metrics in the Prometheus text exposition format."""
+        lines = []
+
+        def header(name, kind, description):
+            lines.append(f"# HELP {namespace}_{name} {description}")
+            lines.append(f"# TYPE {namespace}_{name} {kind}")
+
+        def histogram(name, histogram, **labels):
+            for bound, count in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(float(bound))
+                lines.append(f"{namespace}_{name}_bucket{_labels(**labels, le=le)} {count}")
+            lines.append(f"{namespace}_{name}_sum{_labels(**labels)} {histogram.sum!r}")
+            lines.append(f"{namespace}_{name}_count{_labels(**labels)} {histogram.count}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+
+            header(
+                "requests_total", "counter", "Requests to Scrapyd, by endpoint and HTTP status (empty if no response)."
+            )
+            for endpoint, metrics in endpoints:
+                for status, count in sorted(metrics.statuses.items(), key=lambda item: item[0] or 0):
+                    labels = _labels(endpoint=endpoint, status="" if status is None else status)
+                    lines.append(f"{namespace}_requests_total{labels} {count}")
+            header("request_errors_total", "counter", "Requests to Scrapyd that raised an error, by endpoint.")
+            for endpoint, metrics in endpoints:
+                lines.append(f"{namespace}_request_errors_total{_labels(endpoint=endpoint)} {metrics.errors}")
+            for direction in ("request", "response"):
+                header(f"{direction}_bytes_total", "counter", f"Bytes of {direction} bodies, by endpoint.")
+                for endpoint, metrics in endpoints:
+                    value = getattr(metrics, f"{direction}_bytes")
+                    lines.append(f"{namespace}_{direction}_bytes_total{_labels(endpoint=endpoint)} {value}")
+            header("request_duration_seconds", "histogram", "Duration of requests to Scrapyd, by endpoint.")
+            for endpoint, metrics in endpoints:
+                histogram("request_duration_seconds", metrics.duration, endpoint=endpoint)
+            header("request_phase_seconds", "histogram", "Duration of each phase of requests, by endpoint.")
+            for endpoint, metrics in endpoints:
+                for phase in PHASES:
+                    histogram("request_phase_seconds", metrics.phases[phase], endpoint=endpoint, phase=phase)
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels):
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for value in labels.values())
+    return "{" + ",".join(f'{key}="{value}"' for key, value in zip(labels, escaped)) + "}"
@@ -1,25 +1,173 @@
 from __future__ import annotations
 
+import contextlib
 import fnmatch
 import json
+import threading
+import time
+import uuid
+from typing import TYPE_CHECKING
 
 import requests
-
-from scrapyd_client.exceptions import ErrorResponse, MalformedResponse
-from scrapyd_client.utils import get_auth
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from scrapyd_client.exceptions import CircuitOpen, ErrorResponse, MalformedResponse, RunningJobs, ServerUnavailable
+from scrapyd_client.jsonstream import JSONObjectStream
+from scrapyd_client.metrics import RequestEvent
+from scrapyd_client.records import STATES, DaemonStatus, Job, JobStatus, SpiderListing
+from scrapyd_client.retry import UNAVAILABLE_STATUSES
+from scrapyd_client.upload import CHUNK_SIZE, MultipartEncoder
+from scrapyd_client.utils import _run_concurrently, _schedule_many, get_auth
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+    from datetime import datetime
+
+    from scrapyd_client.cache import ResponseCache
+    from scrapyd_client.retry import CircuitBreaker, RetryPolicy
+    from scrapyd_client.utils import TaskResult
 
 DEFAULT_TARGET_URL = "http://localhost:6800"
 HEADERS = requests.utils.default_headers().copy()
 HEADERS["User-Agent"] = "Scrapyd-client/2.0.3"
 
+# The time spent opening connections, by the current thread, during the current request.
+_timings = threading.local()
+_timings.connect = 0
+
+
+class _TimedConnectionMixin:
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            _timings.connect = getattr(_timings, "connect", 0) + time.perf_counter() - start
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedHTTPAdapter(HTTPAdapter):
+    """An adapter that records the time spent opening connections, for request hooks."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def create_session(
+    *,
+    pool_connections: int = 10,
+    pool_maxsize: int = 10,
+    pool_block: bool = False,
+    retries: int = 0,
+    backoff_factor: float = 0,
+) -> requests.Session:
+    """
+    Create a session whose connections are kept alive and reused across requests.
+
+    A session can be shared by several clients that point at the same Scrapyd instance.
+
+    :param pool_connections: The number of hosts for which to keep a connection pool
+    :param pool_maxsize: The maximum number of connections to keep per host
+    :param pool_block: Whether to wait for a free connection, instead of opening a throwaway one, if the pool is full
+    :param retries: The number of times to retry a GET request that fails to connect or returns a 502, 503 or 504
+    :param backoff_factor: The factor for the exponential delay between retries, in seconds
+    """
+    adapter = _TimedHTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("GET",),
+            raise_on_status=False,
+        ),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 class ScrapydClient:
     """ScrapydClient to interact with a Scrapyd instance."""
 
-    def __init__(self, url: str | None = None, username: str | None = None, password: str | None = None) -> None:
-        """Initialize ScrapydClient."""
+    def __init__(
+        self,
+        url: str | None = None,
+        username: str | None = None,
+        password: str | None = None,
+        *,
+        session: requests.Session | None = None,
+        pool_maxsize: int = 10,
+        timeout: float | tuple[float, float] | None = None,
+        cache: ResponseCache | None = None,
+        hooks: Iterable[Callable[[RequestEvent], None]] = (),
+        retry: RetryPolicy | None = None,
+        circuit_breaker: CircuitBreaker | None = None,
+    ) -> None:
+        """
+        Initialize ScrapydClient.
+
+        :param session: The session to send requests with, to share its connection pool with other clients.
+            If not provided, the client creates its own session, which is closed by :meth:`close`.
+        :param pool_maxsize: The maximum number of connections to keep, if the client creates its own session
+        :param timeout: The connect and read timeout of each request, in seconds, as a float or a tuple
+        :param cache: The cache in which to reuse the responses of ``listprojects.json``, ``listspiders.json`` and
+            ``listversions.json``. Entries are invalidated when the client adds or deletes a version or a project.
+            The cache is saved by :meth:`close`.
+        :param hooks: Functions to call after each request, with a :class:`~scrapyd_client.metrics.RequestEvent`, like
+            a :class:`~scrapyd_client.metrics.MetricsCollector`. They are also called if the request fails.
+        :param retry: The policy to retry requests that fail to connect, time out, or get a 502, 503 or 504 response.
+            With a retry policy or a circuit breaker, such responses raise
+            :class:`~scrapyd_client.exceptions.ServerUnavailable`, once retries are exhausted.
+        :param circuit_breaker: The circuit breaker of the node, to fail fast while the node is unavailable
+        """
         self.url = DEFAULT_TARGET_URL if url is None else url
         self.auth = get_auth(url=self.url, username=username, password=password)
+        self.timeout = timeout
+        self.cache = cache
+        self.hooks = list(hooks)
+        self.retry = retry
+        self.circuit_breaker = circuit_breaker
+        self._owns_session = session is None
+        self.session = create_session(pool_maxsize=pool_maxsize) if session is None else session
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Save the client's cache, if any, and close its session, unless it was provided by the caller."""
+        if self.cache is not None:
+            self.cache.save()
+        if self._owns_session:
+            self.session.close()
 
     def projects(self, pattern: str = "*") -> list[str]:
         """
@@ -69,6 +217,11 @@ class ScrapydClient:
 
     def schedule(self, project: str, spider: str, args: list[tuple[str, str]] | None = None) -> str:
         """
+        Schedule a job.
+
+        If the client has a retry policy, the client generates the job ID (unless a "jobid" argument is provided).
+        Before retrying, it checks whether the failed request scheduled the job, so that the job is scheduled once.
+
         :return: The "jobid" value of the API response.
 
         .. seealso:: `schedule.json <https://scrapyd.readthedocs.io/en/latest/api.html#schedule-json>`__
@@ -76,7 +229,53 @@ class ScrapydClient:
         if args is None:
             args = []
 
-        return self._post("schedule", data=[*args, ("project", project), ("spider", spider)])["jobid"]
+        data = [*args, ("project", project), ("spider", spider)]
+        if self.retry is None:
+            return self._post("schedule", data=data)["jobid"]
+
+        jobid = dict(args).get("jobid")
+        if jobid is None:
+            jobid = uuid.uuid4().hex
+            data.append(("jobid", jobid))
+        attempted = False
+
+        def send():
+            nonlocal attempted
+            if attempted and self._is_scheduled(project, jobid):
+                return jobid
+            attempted = True
+            return self._send_once("POST", "schedule", HEADERS, data=data)["jobid"]
+
+        return self._retrying(send, idempotent=True)
+
+    def _is_scheduled(self, project, jobid):
+        try:
+            return (
+                self._send_once("GET", "status", HEADERS, params={"job": jobid, "project": project})["currstate"]
+                != "unknown"
+            )
+        except (ErrorResponse, MalformedResponse):
+            # Scrapyd < 1.5 has no status.json endpoint.
+            return any(job.id == jobid for job in self.iter_jobs(project))
+
+    def schedule_many(
+        self, jobs: Iterable[dict], concurrency: int = 1, rate: float | None = None, max_pending: int | None = None
+    ) -> Iterator[TaskResult]:
+        """
+        Schedule jobs, with up to ``concurrency`` requests in flight, and yield the results in order.
+
+        The jobs are consumed lazily, so they can be streamed from a large file. A failure to schedule a job doesn't
+        stop the others. To send more than 10 requests in parallel, pass a larger session to the client, like
+        ``create_session(pool_maxsize=concurrency)``.
+
+        :param jobs: The jobs to schedule, as dicts with "project", "spider" and (optionally) "args" keys, where
+            "args" is a dict or a list of key-value pairs.
+        :param rate: The maximum number of jobs to schedule per second
+        :param max_pending: The number of pending jobs on Scrapyd (as reported by :meth:`daemonstatus`) at which to
+            pause, until Scrapyd starts some (see :class:`~scrapyd_client.throttle.Backpressure`)
+        :return: The results, with the job as the ``item``, and the job ID as the ``value`` or an ``error``.
+        """
+        return _schedule_many(self, jobs, concurrency, rate, max_pending)
 
     def status(self, jobid: str, project: str | None = None) -> dict:
         """
@@ -90,13 +289,38 @@ class ScrapydClient:
 
         return self._get("status", params)
 
+    def addversion(
+        self, project: str, version: str, egg: str, callback: Callable[[int, int], None] | None = None
+    ) -> dict:
+        """
+        Upload an egg, streaming it from disk.
+
+        :param egg: The path of the egg
+        :param callback: A function called with the number of bytes sent so far and the total number of bytes, each
+            time a chunk of the request body is sent, like to display the upload's progress
+        :return: The unmodified API response.
+
+        .. seealso:: `addversion.json <https://scrapyd.readthedocs.io/en/latest/api.html#addversion-json>`__
+        """
+
+        def send():
+            # Each attempt reads the egg from the start.
+            with MultipartEncoder(
+                {"project": project, "version": version}, {"egg": (f"{project}.egg", egg)}, callback=callback
+            ) as body:
+                return self._send_once("POST", "addversion", {**HEADERS, "Content-Type": body.content_type}, data=body)
+
+        with self._invalidating(project):
+            return self._retrying(send, idempotent=False)
+
     def delproject(self, project: str) -> dict:
         """
         :return: The unmodified API response.
 
         .. seealso:: `delproject.json <https://scrapyd.readthedocs.io/en/latest/api.html#delproject-json>`__
         """
-        return self._post("delproject", data={"project": project})
+        with self._invalidating(project):
+            return self._post("delproject", data={"project": project})
 
     def delversion(self, project: str, version: str) -> dict:
         """
@@ -104,28 +328,282 @@ class ScrapydClient:
 
         .. seealso:: `delversion.json <https://scrapyd.readthedocs.io/en/latest/api.html#delversion-json>`__
         """
-        return self._post("delversion", data={"project": project, "version": version})
+        with self._invalidating(project):
+            return self._post("delversion", data={"project": project, "version": version})
+
+    def versions_to_prune(self, project: str, keep: int, *, force: bool = False) -> list[str]:
+        """
+        Return the versions that :meth:`prune_versions` would delete.
+
+        These are all but the ``keep`` most recent versions, excluding the versions of pending jobs. Scrapyd's
+        ``listjobs.json`` reports the version of pending jobs only, so, unless ``force`` is set, the versions aren't
+        pruned while the project has running jobs, whose versions could otherwise be deleted.
+
+        :param keep: The number of most recent versions to keep, at least 1
+        :param force: Whether to prune the versions, even if the project has running jobs
+        :return: The versions to delete, from the oldest.
+        :raises RunningJobs: if the project has running jobs, and ``force`` isn't set
+        """
+        if keep < 1:
+            raise ValueError("keep must be at least 1")
+
+        versions = self.versions(project)
+        jobs = self.jobs(project)
+        if jobs.get("running") and not force:
+            raise RunningJobs(f"{len(jobs['running'])} running job(s), whose versions Scrapyd doesn't report")
+        in_use = {job.get("version") for job in jobs.get("pending", [])}
+        return [version for version in versions[:-keep] if version not in in_use]
+
+    def prune_versions(
+        self, project: str, keep: int, concurrency: int = 1, *, force: bool = False
+    ) -> Iterator[TaskResult]:
+        """
+        Delete all but the ``keep`` most recent versions of a project, except the versions of pending jobs.
+
+        A failure to delete a version doesn't stop the others.
+
+        :param keep: The number of most recent versions to keep, at least 1
+        :param force: Whether to prune the versions, even if the project has running jobs
+        :return: The results, with the version as the ``item``, and the API response as the ``value`` or an ``error``.
+        :raises RunningJobs: if the project has running jobs, and ``force`` isn't set
+
+        .. seealso:: :meth:`versions_to_prune`
+        """
+        versions = self.versions_to_prune(project, keep, force=force)
+        return _run_concurrently(lambda version: self.delversion(project, version), versions, concurrency)
 
-    def cancel(self, project: str, jobid: str) -> dict:
+    def cancel(self, project: str, jobid: str, signal: str | None = None) -> dict:
         """
+        Cancel a job, or remove it from the queue, if pending.
+
+        :param signal: The signal to send to the job's process, if running, like "KILL" (default: Scrapyd's, "TERM")
         :return: The unmodified API response.
 
         .. seealso:: `cancel.json <https://scrapyd.readthedocs.io/en/latest/api.html#cancel-json>`__
         """
-        return self._post("cancel", data={"project": project, "job": jobid})
+        data = {"project": project, "job": jobid}
+        if signal is not None:
+            data["signal"] = signal
+
+        return self._post("cancel", data=data)
+
+    def cancel_many(
+        self, jobs: Iterable[Job], concurrency: int = 1, signal: str | None = None
+    ) -> Iterator[TaskResult]:
+        """
+        Cancel jobs, with up to ``concurrency`` requests in flight, and yield the results in order.
+
+        A failure to cancel a job doesn't stop the others. To select the jobs to cancel, use :meth:`iter_jobs`, like
+        ``client.cancel_many(list(client.iter_jobs("myproject", "myspider", state="running")), 10)``.
+
+        :param jobs: The jobs to cancel
+        :param signal: The signal to send to the jobs' processes, if running, like "KILL" (default: Scrapyd's, "TERM")
+        :return: The results, with the job as the ``item``, and its previous state as the ``value`` or an ``error``.
+        """
+
+        def cancel(job):
+            return self.cancel(job.project, job.id, signal).get("prevstate")
+
+        return _run_concurrently(cancel, jobs, concurrency)
+
+    def iter_jobs(
+        self,
+        project: str,
+        spider: str = "*",
+        state: str | Iterable[str] | None = None,
+        since: datetime | None = None,
+        until: datetime | None = None,
+    ) -> Iterator[Job]:
+        """
+        Yield the jobs matching the filters, as the response is received.
+
+        Unlike :meth:`jobs`, the response is parsed incrementally, and jobs that don't match the filters are discarded
+        as they are parsed. Memory use doesn't depend on the number of jobs, and the first jobs are yielded before the
+        response is fully received.
+
+        :param spider: The `pattern <https://docs.python.org/3/library/fnmatch.html>`__ for the spiders to match
+        :param state: The state or states to match, like "finished" (default: all)
+        :param since: The time from which the job last changed state (see :attr:`~scrapyd_client.records.Job.time`),
+            naive, in the Scrapyd server's time zone. Pending jobs don't match.
+        :param until: The time before which the job last changed state. Pending jobs don't match.
+        :return: The jobs, in the order of the API response: pending, running, then finished.
+
+        .. seealso:: `listjobs.json <https://scrapyd.readthedocs.io/en/latest/api.html#listjobs-json>`__
+        """
+        states = STATES if state is None else (state,) if isinstance(state, str) else tuple(state)
+        url = f"{self.url}/listjobs.json"
+        _timings.connect = 0
+        response = stream = error = None
+        start = received = time.perf_counter()
+        try:
+            response = self._retrying(lambda: self._open_stream(url, {"project": project}), idempotent=True)
+            received = time.perf_counter()
+            with response:
+                stream = JSONObjectStream(response.iter_content(CHUNK_SIZE))
+                for key, data in stream:
+                    if key not in states or not fnmatch.fnmatch(data.get("spider", ""), spider):
+                        continue
+                    job = Job.from_dict(data, project, key)
+                    if since is not None or until is not None:
+                        if job.time is None or (since is not None and job.time < since):
+                            continue
+                        if until is not None and job.time >= until:
+                            continue
+                    yield job
+                _check_response(stream.fields)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            if self.hooks:
+                response_bytes = 0 if stream is None else stream.bytes_read
+                self._call_hooks("GET", "listjobs", url, response, error, start, received, response_bytes)
+
+    def _open_stream(self, url, params):
+        response = self.session.get(
+            url, params=params, headers=HEADERS, auth=self.auth, timeout=self.timeout, stream=True
+        )
+        self._check_status(response)
+        return response
+
+    def job_records(self, project: str) -> list[Job]:
+        """
+        Return the project's jobs as compact records, like ``list(client.iter_jobs(project))``.
+
+        :return: The jobs, in the order of the API response: pending, running, then finished.
+
+        .. seealso:: :meth:`jobs`, which returns the unmodified API response
+        """
+        return list(self.iter_jobs(project))
+
+    def job_status(self, jobid: str, project: str | None = None) -> JobStatus:
+        """
+        :return: The job's state, and start and end times (if provided by Scrapyd).
+
+        .. seealso:: :meth:`status`, which returns the unmodified API response
+        """
+        return JobStatus.from_dict(self.status(jobid, project))
+
+    def spider_listing(self, project: str) -> SpiderListing:
+        """
+        :return: The project's spiders, and the node's name.
+
+        .. seealso:: :meth:`spiders`, which returns the spiders, filtered by a pattern
+        """
+        return SpiderListing.from_dict(self._get("listspiders", {"project": project}), project)
+
+    def daemon_status(self) -> DaemonStatus:
+        """
+        :return: The node's name, and the numbers of pending, running and finished jobs.
+
+        .. seealso:: :meth:`daemonstatus`, which returns the unmodified API response
+        """
+        return DaemonStatus.from_dict(self.daemonstatus())
 
     def _get(self, basename: str, params=None):
         if params is None:
             params = {}
 
-        return _process_response(
-            requests.get(f"{self.url}/{basename}.json", params=params, headers=HEADERS, auth=self.auth)
-        )
+        cacheable = self.cache is not None and self.cache.cacheable(basename)
+        if cacheable and (response := self.cache.get(self.url, basename, params)) is not None:
+            return response
+
+        response = self._send("GET", basename, params=params)
+        if cacheable:
+            self.cache.set(self.url, basename, params, response)
+        return response
+
+    @contextlib.contextmanager
+    def _invalidating(self, project):
+        # Invalidate even if the request fails, as the change might have been made.
+        try:
+            yield
+        finally:
+            if self.cache is not None:
+                self.cache.invalidate(self.url, project)
 
     def _post(self, basename: str, data):
-        return _process_response(
-            requests.post(f"{self.url}/{basename}.json", data=data, headers=HEADERS, auth=self.auth)
-        )
+        return self._send("POST", basename, data=data)
+
+    def _send(self, method, basename, headers=HEADERS, **kwargs):
+        if self.retry is None and self.circuit_breaker is None:
+            return self._send_once(method, basename, headers, **kwargs)
+        return self._retrying(lambda: self._send_once(method, basename, headers, **kwargs), idempotent=method == "GET")
+
+    def _retrying(self, func, *, idempotent):
+        attempt = 0
+        while True:
+            if self.circuit_breaker is not None:
+                try:
+                    self.circuit_breaker.before_request()
+                except CircuitOpen as e:
+                    e.url = self.url
+                    raise
+            try:
+                value = func()
+            except Exception as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(e)
+                if self.retry is None or not self.retry.should_retry(e, attempt, idempotent=idempotent):
+                    raise
+                time.sleep(self.retry.delay(attempt))
+                attempt += 1
+            else:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record(None)
+                return value
+
+    def _check_status(self, response):
+        if (self.retry or self.circuit_breaker) and response.status_code in UNAVAILABLE_STATUSES:
+            response.close()
+            raise ServerUnavailable(f"{response.status_code} {response.reason}: {response.url}", self.url)
+
+    def _send_once(self, method, basename, headers, **kwargs):
+        url = f"{self.url}/{basename}.json"
+        send = self.session.get if method == "GET" else self.session.post
+        kwargs.update(headers=headers, auth=self.auth, timeout=self.timeout)
+        if not self.hooks:
+            response = send(url, **kwargs)
+            self._check_status(response)
+            return _process_response(response)
+
+        _timings.connect = 0
+        response = error = None
+        start = received = time.perf_counter()
+        try:
+            response = send(url, **kwargs)
+            received = time.perf_counter()
+            self._check_status(response)
+            return _process_response(response)
+        except Exception as e:
+            error = e
+            raise
+        finally:
+            self._call_hooks(method, basename, url, response, error, start, received)
+
+    def _call_hooks(self, method, endpoint, url, response, error, start, received, response_bytes=None):
+        end = time.perf_counter()
+        if response is None:
+            event = RequestEvent(method, endpoint, url, None, error, 0, 0, _timings.connect, 0, 0, 0, end - start)
+        else:
+            # The elapsed time is from sending the request to parsing the response's headers, including connecting.
+            headers = response.elapsed.total_seconds()
+            event = RequestEvent(
+                method,
+                endpoint,
+                url,
+                response.status_code,
+                error,
+                len(response.request.body or b""),
+                len(response.content) if response_bytes is None else response_bytes,
+                _timings.connect,
+                max(headers - _timings.connect, 0),
+                max(received - start - headers, 0),
+                end - received,
+                end - start,
+            )
+        for hook in self.hooks:
+            hook(event)
 
 
 def _process_response(response):
@@ -134,6 +612,10 @@ def _process_response(response):
     except json.decoder.JSONDecodeError as e:
         raise MalformedResponse(response.text) from e
 
+    return _check_response(response)
+
+
+def _check_response(response):
     status = response["status"]
     if status == "ok":
         return response
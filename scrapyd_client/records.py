@@ -0,0 +1,170 @@
+from __future__ import annotations
+
+import sys
+from datetime import datetime
+from typing import NamedTuple
+
+STATES = ("pending", "running", "finished")
+# Scrapyd's default URLs of a job's log and items, which are derived instead of stored.
+_LOG_URL = "/logs/{project}/{spider}/{id}.log"
+_ITEMS_URL = "/items/{project}/{spider}/{id}.jl"
+_DERIVED = object()
+
+
+class Job:
+    """
+    A job, as listed by ``listjobs.json``.
+
+    Jobs are compact: attributes are stored in slots, project, spider and state names are interned (shared by all
+    jobs), and the log and items URLs are derived from the other attributes, unless they differ from Scrapyd's default.
+    Times are naive, in the Scrapyd server's time zone.
+
+    Jobs can be compared, hashed and sorted with a key, like ``sorted(jobs, key=operator.attrgetter("end_time"))``.
+    """
+
+    __slots__ = ("_items_url", "_log_url", "end_time", "id", "pid", "project", "spider", "start_time", "state")
+
+    def __init__(
+        self,
+        project: str,
+        spider: str,
+        id: str,  # noqa: A002
+        state: str,
+        pid: int | None = None,
+        start_time: datetime | None = None,
+        end_time: datetime | None = None,
+        log_url: str | None = None,
+        items_url: str | None = None,
+    ) -> None:
+        self.project = sys.intern(project)
+        self.spider = sys.intern(spider)
+        self.id = id
+        self.state = sys.intern(state)
+        self.pid = pid
+        self.start_time = start_time
+        self.end_time = end_time
+        self._log_url = _compact(log_url, _LOG_URL, project, spider, id)
+        self._items_url = _compact(items_url, _ITEMS_URL, project, spider, id)
+
+    @classmethod
+    def from_dict(cls, data: dict, project: str, state: str) -> Job:
+        """Create a job from an item of a ``listjobs.json`` response."""
+        return cls(
+            data.get("project", project),
+            data["spider"],
+            data["id"],
+            state,
+            data.get("pid"),
+            _parse_time(data.get("start_time")),
+            _parse_time(data.get("end_time")),
+            data.get("log_url"),
+            data.get("items_url"),
+        )
+
+    @property
+    def log_url(self) -> str | None:
+        return _expand(self._log_url, _LOG_URL, self)
+
+    @property
+    def items_url(self) -> str | None:
+        return _expand(self._items_url, _ITEMS_URL, self)
+
+    @property
+    def time(self) -> datetime | None:
+        """The time of the job's last change of state: its end time, start time, or ``None`` if pending."""
+        return self.end_time or self.start_time
+
+    def to_dict(self) -> dict:
+        """Return the job as a dict, like an item of a ``listjobs.json`` response, with :class:`datetime` values."""
+        return {
+            "project": self.project,
+            "spider": self.spider,
+            "id": self.id,
+            "state": self.state,
+            "pid": self.pid,
+            "start_time": self.start_time,
+            "end_time": self.end_time,
+            "log_url": self.log_url,
+            "items_url": self.items_url,
+        }
+
+    def _key(self):
+        return tuple(self.to_dict().values())
+
+    def __eq__(self, other):
+        if not isinstance(other, Job):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self):
+        return hash(self._key())
+
+    def __repr__(self):
+        return f"Job({', '.join(f'{key}={value!r}' for key, value in self.to_dict().items())})"
+
+
+class JobStatus(NamedTuple):
+    """A job's status, as returned by ``status.json``."""
+
+    state: str
+    start_time: datetime | None = None
+    end_time: datetime | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict) -> JobStatus:
+        """Create a status from a ``status.json`` response."""
+        return cls(
+            sys.intern(data["currstate"]), _parse_time(data.get("start_time")), _parse_time(data.get("end_time"))
+        )
+
+
+class SpiderListing(NamedTuple):
+    """A project's spiders, as returned by ``listspiders.json``."""
+
+    project: str
+    spiders: tuple[str, ...]
+    node_name: str | None = None
+
+    @classmethod
+    def from_dict(cls, data: dict, project: str) -> SpiderListing:
+        """Create a listing from a ``listspiders.json`` response."""
+        return cls(
+            sys.intern(project),
+            tuple(sys.intern(spider) for spider in data["spiders"]),
+            _intern(data.get("node_name")),
+        )
+
+
+class DaemonStatus(NamedTuple):
+    """The numbers of jobs in each state, as returned by ``daemonstatus.json``."""
+
+    node_name: str | None
+    pending: int
+    running: int
+    finished: int
+
+    @classmethod
+    def from_dict(cls, data: dict) -> DaemonStatus:
+        """Create a status from a ``daemonstatus.json`` response."""
+        return cls(_intern(data.get("node_name")), data["pending"], data["running"], data["finished"])
+
+
+def _parse_time(value):
+    # Scrapyd formats times with str(datetime), which omits microseconds if 0.
+    return None if value is None else datetime.fromisoformat(value)
+
+
+def _intern(value):
+    return None if value is None else sys.intern(value)
+
+
+def _compact(url, template, project, spider, id):  # noqa: A002
+    if url is not None and url == template.format(project=project, spider=spider, id=id):
+        return _DERIVED
+    return url
+
+
+def _expand(url, template, job):
+    if url is _DERIVED:
+        return template.format(project=job.project, spider=job.spider, id=job.id)
+    return url
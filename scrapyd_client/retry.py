@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import random
+import threading
+import time
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from scrapyd_client.exceptions import CircuitOpen, ServerUnavailable
+
+#: The HTTP status codes of responses from an unavailable Scrapyd, or from a proxy in front of it.
+UNAVAILABLE_STATUSES = (502, 503, 504)
+
+
+class RetryPolicy:
+    """
+    A policy to retry failed requests, with exponential backoff and jitter.
+
+    A request is retried if it fails to connect, times out, or gets a 502, 503 or 504 response. Requests that change
+    Scrapyd's state, other than ``schedule.json``, are retried only if they weren't sent, because they might have been
+    processed by Scrapyd. :meth:`~scrapyd_client.pyclient.ScrapydClient.schedule` is retried only if the job isn't
+    found on Scrapyd.
+    """
+
+    def __init__(self, attempts: int = 3, backoff: float = 0.5, max_backoff: float = 10) -> None:
+        """
+        Initialize RetryPolicy.
+
+        :param attempts: The maximum number of attempts of each request, including the first
+        :param backoff: The maximum delay before the first retry, in seconds, which doubles with each retry
+        :param max_backoff: The maximum delay before any retry, in seconds
+        """
+        if attempts < 1:
+            raise ValueError("attempts must be at least 1")
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    def delay(self, attempt: int) -> float:
+        """
+        Return the number of seconds to wait before retrying a request.
+
+        The delay is random, between 0 and the exponential backoff ("full jitter"), so that clients that failed at the
+        same time don't retry at the same time.
+
+        :param attempt: The number of the failed attempt, from 0
+        """
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))  # noqa: S311
+
+    def should_retry(self, error: Exception, attempt: int, *, idempotent: bool) -> bool:
+        """
+        Return whether to retry a request after an error.
+
+        :param attempt: The number of the failed attempt, from 0
+        :param idempotent: Whether the request can be sent more than once
+        """
+        if attempt + 1 >= self.attempts or not is_node_failure(error):
+            return False
+        return idempotent or not was_sent(error)
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker for requests to one Scrapyd node, which can be shared between threads.
+
+    After ``failure_threshold`` consecutive failures (see :func:`is_node_failure`), the circuit opens: requests fail
+    immediately with :class:`~scrapyd_client.exceptions.CircuitOpen`, instead of waiting for timeouts. After
+    ``reset_timeout`` seconds, one request is let through: if it succeeds, the circuit closes; otherwise, it opens
+    again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """The state of the circuit: "closed", "open" or "half-open" (a request can be let through)."""
+        with self._lock:
+            if self._opened is None:
+                return "closed"
+            if self._trial or time.monotonic() - self._opened < self.reset_timeout:
+                return "open"
+            return "half-open"
+
+    @property
+    def available(self) -> bool:
+        """Whether a request would be sent."""
+        return self.state != "open"
+
+    def before_request(self) -> None:
+        """Raise :class:`~scrapyd_client.exceptions.CircuitOpen` if the circuit is open."""
+        with self._lock:
+            if self._opened is None:
+                return
+            remaining = self.reset_timeout - (time.monotonic() - self._opened)
+            if self._trial or remaining > 0:
+                raise CircuitOpen(f"{self.failures} consecutive failures, retrying in {max(remaining, 0):.1f}s")
+            self._trial = True
+
+    def record(self, error: Exception | None) -> None:
+        """Record the outcome of a request: a success, if ``error`` is ``None`` or isn't a node failure."""
+        with self._lock:
+            self._trial = False
+            if error is None or not is_node_failure(error):
+                self.failures = 0
+                self._opened = None
+                return
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self._opened = time.monotonic()
+
+
+def is_node_failure(error: Exception) -> bool:
+    """Return whether an error means that the node is unavailable: a connection error, a timeout or a 5xx status."""
+    return isinstance(error, (requests.ConnectionError, requests.Timeout, ServerUnavailable))
+
+
+def was_sent(error: Exception) -> bool:
+    """Return whether a request might have reached the server, despite the error."""
+    if isinstance(error, requests.ConnectTimeout):
+        return False
+    if isinstance(error, requests.ConnectionError) and error.args:
+        # requests wraps urllib3's MaxRetryError, whose reason is the underlying error.
+        return not isinstance(getattr(error.args[0], "reason", None), NewConnectionError)
+    return True
@@ -0,0 +1,238 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import signal
+import socket
+import socketserver
+import sys
+import threading
+from typing import TYPE_CHECKING
+
+from scrapyd_client.shim import LOCAL_COMMANDS, SOCKET_ENV
+from scrapyd_client.utils import _get_targets, cache_dir, closest_scrapy_cfg, get_sources
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    import requests
+
+# The options whose values are paths, which are relative to the client's working directory, not the server's.
+PATH_OPTIONS = ("from_file", "output", "stats_file", "index")
+# The environment variables that change the configuration files, the caches or the requests, in addition to the
+# variables that configuration files expand. The proxy variables can also be lowercase.
+ENVIRONMENT = (
+    "HOME",
+    "NETRC",
+    "XDG_CACHE_HOME",
+    "XDG_CONFIG_HOME",
+    "HTTP_PROXY",
+    "HTTPS_PROXY",
+    "ALL_PROXY",
+    "NO_PROXY",
+    "REQUESTS_CA_BUNDLE",
+    "CURL_CA_BUNDLE",
+)
+
+
+def socket_path() -> str:
+    """Return the path of the server's socket: ``$SCRAPYD_CLIENT_SOCKET``, or a file in the cache directory."""
+    return os.environ.get(SOCKET_ENV) or os.path.join(cache_dir(), "serve.sock")
+
+
+class ThreadLocalStream:
+    """
+    A proxy of a text stream, like :data:`sys.stdout`, to which each thread can redirect its own writes.
+
+    Unlike :func:`contextlib.redirect_stdout`, the redirection doesn't affect other threads.
+    """
+
+    def __init__(self, default) -> None:
+        self.default = default
+        self._local = threading.local()
+
+    def redirect(self, stream) -> None:
+        """Redirect the current thread's writes to a stream, or stop redirecting them, if ``None``."""
+        self._local.stream = stream
+
+    def __getattr__(self, name):
+        return getattr(getattr(self._local, "stream", None) or self.default, name)
+
+
+class _Output:
+    # A text stream that sends writes to the client, as lines of JSON.
+    encoding = "utf-8"
+
+    def __init__(self, wfile, lock, name):
+        self._wfile = wfile
+        self._lock = lock
+        self._name = name
+
+    def write(self, text):
+        if text:
+            with self._lock:
+                self._wfile.write(json.dumps({self._name: text}).encode() + b"\n")
+        return len(text)
+
+    def flush(self):
+        with self._lock:
+            self._wfile.flush()
+
+    def isatty(self):
+        return False
+
+
+class CommandServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """
+    A server that runs ``scrapyd-client`` commands sent by clients, over a Unix socket, each in a thread.
+
+    The server reuses its imported modules, its parsed configuration files and its connections to Scrapyd, across
+    commands. A command is run by the server only if it's sent from the server's Scrapy project, as its configuration
+    file determines the targets, and with the same values of the environment variables that the configuration files
+    expand, and of :data:`ENVIRONMENT`.
+
+    The socket can be used only by the user who runs the server. While the server is open, :data:`sys.stdout` and
+    :data:`sys.stderr` are replaced by :class:`ThreadLocalStream` proxies, which send each command's output to its
+    client.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        path: str,
+        execute: Callable[..., int | str | None],
+        session: requests.Session | None = None,
+        connections: int = 10,
+    ) -> None:
+        """
+        Initialize CommandServer.
+
+        :param path: The path of the socket
+        :param execute: The function that runs a command, like ``scrapyd_client.__main__._execute``
+        :param session: The session to send requests with, shared by all commands
+        :param connections: The maximum number of connections per target of the session. Commands with a higher
+            ``--concurrency`` use a session of their own, instead of discarding connections.
+        """
+        if _is_serving(path):
+            raise OSError(f"A server is already listening on {path}")
+        if os.path.exists(path):
+            os.remove(path)  # a server didn't exit cleanly
+
+        self.execute = execute
+        self.session = session
+        self.connections = connections
+        self.environ = dict(os.environ)
+        self.project = closest_scrapy_cfg()
+        umask = os.umask(0o177)
+        try:
+            super().__init__(path, _Handler)
+        finally:
+            os.umask(umask)
+
+        self.stdout = sys.stdout = ThreadLocalStream(sys.stdout)
+        self.stderr = sys.stderr = ThreadLocalStream(sys.stderr)
+
+    def server_close(self) -> None:
+        super().server_close()
+        sys.stdout = self.stdout.default
+        sys.stderr = self.stderr.default
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # Buffer the output, which is sent when the command prints with flush=True, or ends.
+    wbufsize = -1
+
+    def handle(self):
+        if not (line := self.rfile.readline()):
+            return  # a probe, by a server checking whether this one is running
+        request = json.loads(line)
+        lock = threading.Lock()
+        if closest_scrapy_cfg(request["cwd"]) != self.server.project:
+            self._send(lock, {"fallback": "another project"})
+            return
+        names = _expanded_variables()
+        if _environment(request["env"], names) != _environment(self.server.environ, names):
+            self._send(lock, {"fallback": "another environment"})
+            return
+
+        stdout = _Output(self.wfile, lock, "stdout")
+        stderr = _Output(self.wfile, lock, "stderr")
+        self.server.stdout.redirect(stdout)
+        self.server.stderr.redirect(stderr)
+        try:
+            code = self.server.execute(request["argv"], lambda args: self._prepare(args, request["cwd"]))
+        finally:
+            self.server.stdout.redirect(None)
+            self.server.stderr.redirect(None)
+        self._send(lock, {"exit": code})
+
+    def _prepare(self, args, cwd):
+        if args.action.__name__ in LOCAL_COMMANDS:
+            print(f"Error: {args.action.__name__} can't be run by scrapyd-client serve", file=sys.stderr)
+            raise SystemExit(2)
+        if getattr(args, "from_file", None) == "-":
+            print("Error: scrapyd-client serve can't read standard input, use --from-file FILE", file=sys.stderr)
+            raise SystemExit(2)
+        for name in PATH_OPTIONS:
+            value = getattr(args, name, None)
+            if value is not None and value != "-":
+                setattr(args, name, os.path.join(cwd, value))
+        if getattr(args, "concurrency", 1) <= self.server.connections:
+            args.session = self.server.session
+
+    def _send(self, lock, message):
+        with lock:
+            self.wfile.write(json.dumps(message).encode() + b"\n")
+            self.wfile.flush()
+
+
+def _expanded_variables():
+    # The names of the environment variables in the configuration files.
+    names = set()
+    for path in get_sources():
+        if os.path.exists(path):
+            with open(path) as f:
+                names.update(
+                    match.group(1) or match.group(2) for match in re.finditer(r"\$(?:(\w+)|\{(\w+)\})", f.read())
+                )
+    return names
+
+
+def _environment(env, names):
+    # The variables of an environment on which the result of a command depends.
+    return {name: value for name, value in env.items() if name in names or name.upper() in ENVIRONMENT}
+
+
+def _is_serving(path):
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return False
+    return True
+
+
+def serve(execute: Callable[..., int | str | None], path: str | None = None, connections: int = 10) -> None:
+    """
+    Run a :class:`CommandServer` until interrupted.
+
+    :param path: The path of the socket (default: :func:`socket_path`)
+    :param connections: The maximum number of connections to keep per target
+    """
+    # Import the modules of the subcommands, to not import them for the first command.
+    import scrapyd_client.cluster
+    import scrapyd_client.jobindex
+    import scrapyd_client.throttle  # noqa: F401
+    from scrapyd_client.pyclient import create_session
+
+    path = socket_path() if path is None else path
+    # Remove the socket on SIGTERM, like on SIGINT.
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    session = create_session(pool_connections=max(10, len(_get_targets())), pool_maxsize=connections)
+    with session, CommandServer(path, execute, session, connections) as server:
+        print(f"Serving on {path}", file=sys.stderr, flush=True)
+        server.serve_forever()
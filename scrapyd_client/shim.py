@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+
+# This module runs before each command, so it imports only what it needs to send the command to the server.
+
+#: The environment variable of the path of the server's socket. If set, ``scrapyd-client`` sends commands to it.
+SOCKET_ENV = "SCRAPYD_CLIENT_SOCKET"
+#: The subcommands that aren't sent to the server. ``deploy`` changes the working directory of the process.
+LOCAL_COMMANDS = ("deploy", "serve")
+
+
+def main() -> None:
+    """
+    Run a ``scrapyd-client`` command.
+
+    If the ``SCRAPYD_CLIENT_SOCKET`` environment variable is set, the command is sent to the server listening on that
+    socket. Otherwise, or if no server is listening, or if the server can't run the command, the command is run in this
+    process.
+    """
+    argv = sys.argv[1:]
+    path = os.environ.get(SOCKET_ENV)
+    if path and argv and argv[0] not in LOCAL_COMMANDS:
+        _forward(path, argv)  # exits, unless the command isn't run by the server
+
+    import scrapyd_client.__main__
+
+    scrapyd_client.__main__.main()
+
+
+def _forward(path, argv):
+    with socket.socket(socket.AF_UNIX) as sock:
+        try:
+            sock.connect(path)
+        except OSError:
+            return
+        with sock.makefile("rwb") as f:
+            f.write(json.dumps({"argv": argv, "cwd": os.getcwd(), "env": dict(os.environ)}).encode() + b"\n")
+            f.flush()
+            for line in f:
+                message = json.loads(line)
+                if "stdout" in message:
+                    sys.stdout.write(message["stdout"])
+                    sys.stdout.flush()
+                elif "stderr" in message:
+                    sys.stderr.write(message["stderr"])
+                    sys.stderr.flush()
+                elif "exit" in message:
+                    raise SystemExit(message["exit"])
+                else:
+                    return
+
+    print(f"Error: The server on {path} closed the connection", file=sys.stderr)
+    raise SystemExit(1)
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+
+class TokenBucket:
+    """
+    A token bucket rate limiter, which can be shared between threads.
+
+    Tokens are added at ``rate`` per second, up to ``burst`` tokens. Each call to :meth:`acquire` takes a token,
+    waiting for one to be added if none are left.
+    """
+
+    def __init__(self, rate: float, burst: float | None = None) -> None:
+        """
+        Initialize TokenBucket.
+
+        :param rate: The number of tokens added per second
+        :param burst: The maximum number of tokens (default: 1, meaning no bursts)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.burst = 1 if burst is None else burst
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1) -> float:
+        """
+        Take tokens, waiting for them to be added if needed.
+
+        :return: The number of seconds waited.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            # A negative balance reserves the next tokens for this caller, so that callers are served in order.
+            delay = max(0, -self._tokens / self.rate)
+
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+class Backpressure:
+    """
+    A limit on the length of Scrapyd's pending queue, which pauses callers while the queue is full.
+
+    The number of pending jobs is estimated from the last count, plus one for each call to :meth:`acquire` since. The
+    count is refreshed only once the estimate reaches ``max_pending``, so that jobs are scheduled at full speed until
+    the queue is full, and then as fast as Scrapyd starts them. While the queue is full, the count is refreshed every
+    ``interval`` seconds, doubling up to ``max_interval`` seconds while nothing changes.
+    """
+
+    def __init__(
+        self, pending: Callable[[], int], max_pending: int, interval: float = 1, max_interval: float = 10
+    ) -> None:
+        """
+        Initialize Backpressure.
+
+        :param pending: A function that returns the number of pending jobs, like
+            ``lambda: client.daemonstatus()["pending"]``
+        :param max_pending: The number of pending jobs at which to pause
+        """
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.pending = pending
+        self.max_pending = max_pending
+        self.interval = interval
+        self.max_interval = max_interval
+        self._estimate = None
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Wait until the queue isn't full, and count one more pending job.
+
+        :return: The number of seconds waited.
+        """
+        waited = 0
+        delay = self.interval
+        # Callers wait in turn, so that only one polls Scrapyd.
+        with self._lock:
+            while True:
+                if self._estimate is None or self._estimate >= self.max_pending:
+                    previous, self._estimate = self._estimate, self.pending()
+                    if previous is not None and self._estimate < previous:
+                        delay = self.interval
+                if self._estimate < self.max_pending:
+                    self._estimate += 1
+                    return waited
+                time.sleep(delay)
+                waited += delay
+                delay = min(delay * 2, self.max_interval)
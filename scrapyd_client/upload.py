@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import os
+import uuid
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+CHUNK_SIZE = 64 * 1024
+
+
+class MultipartEncoder:
+    """
+    A ``multipart/form-data`` request body that reads files from disk in chunks, as it is sent.
+
+    Pass it as the ``data`` argument of a ``requests`` call, with its :attr:`content_type` as the ``Content-Type``
+    header. Memory use doesn't depend on the size of the files.
+
+    Use it as a context manager, or call :meth:`close`, to close the file being read if the request fails.
+    """
+
+    def __init__(
+        self,
+        fields: dict[str, str],
+        files: dict[str, tuple[str, str]],
+        callback: Callable[[int, int], None] | None = None,
+    ) -> None:
+        """
+        Initialize MultipartEncoder.
+
+        :param fields: The form fields, by name
+        :param files: The filename and path of each file, by field name
+        :param callback: A function called with the number of bytes read so far and the total number of bytes,
+            each time a chunk is read
+        """
+        self.boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={self.boundary}"
+        self.callback = callback
+        self.bytes_read = 0
+
+        self._parts = []
+        for name, value in fields.items():
+            self._parts.append(self._header(name) + b"\r\n\r\n" + str(value).encode() + b"\r\n")
+        for name, (filename, path) in files.items():
+            header = self._header(name) + f'; filename="{filename}"'.encode()
+            self._parts.append(header + b"\r\nContent-Type: application/octet-stream\r\n\r\n")
+            self._parts.append(path)
+            self._parts.append(b"\r\n")
+        self._parts.append(f"--{self.boundary}--\r\n".encode())
+
+        self.len = sum(os.path.getsize(part) if isinstance(part, str) else len(part) for part in self._parts)
+        self._index = 0
+        self._offset = 0
+        self._file = None
+
+    def __len__(self) -> int:
+        return self.len
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the file being read, if any."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def read(self, size: int = -1) -> bytes:
+        """Read up to ``size`` bytes, or, if ``size`` is negative, up to one chunk."""
+        if size < 0:
+            size = CHUNK_SIZE
+
+        chunks = []
+        while size > 0 and self._index < len(self._parts):
+            chunk = self._read_part(size)
+            if chunk:
+                chunks.append(chunk)
+                size -= len(chunk)
+            else:
+                self._index += 1
+                self._offset = 0
+
+        data = b"".join(chunks)
+        self.bytes_read += len(data)
+        if self.callback is not None and data:
+            self.callback(self.bytes_read, self.len)
+        return data
+
+    def _read_part(self, size):
+        part = self._parts[self._index]
+        if isinstance(part, bytes):
+            chunk = part[self._offset : self._offset + size]
+            self._offset += len(chunk)
+            return chunk
+
+        if self._file is None:
+            self._file = open(part, "rb")  # noqa: SIM115
+        chunk = self._file.read(size)
+        if not chunk:
+            self.close()
+        return chunk
+
+    def _header(self, name):
+        return f'--{self.boundary}\r\nContent-Disposition: form-data; name="{name}"'.encode()
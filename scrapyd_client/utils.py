@@ -2,11 +2,27 @@ from __future__ import annotations
 
 import netrc
 import os
+import time
+import warnings
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from configparser import BasicInterpolation, ConfigParser
+from importlib import import_module
+from typing import TYPE_CHECKING, Any, NamedTuple
 from urllib.parse import urlparse
 
-from requests.auth import HTTPBasicAuth
-from scrapy.utils import conf
+from scrapyd_client.throttle import Backpressure, TokenBucket
+
+# Scrapy and requests are imported when needed, to keep the command-line tools fast to start.
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable, Iterator
+
+    from requests.auth import HTTPBasicAuth
+
+# Parsers of configuration files and .netrc files, keyed by the files' paths, modification times and sizes. They aren't
+# cached on disk, because the files can contain passwords.
+_configs = {}
+_netrcs = {}
 
 
 class EnvInterpolation(BasicInterpolation):
@@ -19,25 +35,134 @@ class EnvInterpolation(BasicInterpolation):
 
 def get_auth(url: str, username: str, password: str) -> HTTPBasicAuth | None:
     """Retrieve authentication from arguments or infers from .netrc."""
+    from requests.auth import HTTPBasicAuth
+
     if username:
         return HTTPBasicAuth(username=username, password=password)
 
-    try:
-        username, _account, password = netrc.netrc().authenticators(urlparse(url).hostname)
-        return HTTPBasicAuth(username=username, password=password)
-    except (OSError, netrc.NetrcParseError, TypeError):
+    parsed = _netrc()
+    if parsed is None:  # no .netrc file, or an invalid one
         return None
+    authenticators = parsed.authenticators(urlparse(url).hostname)
+    if authenticators is None:  # no credentials for the host
+        return None
+    username, _account, password = authenticators
+    return HTTPBasicAuth(username=username, password=password)
+
+
+def _netrc():
+    # netrc.netrc() reads this file, if no file is given.
+    key = _stat_key([os.path.join(os.path.expanduser("~"), ".netrc")])
+    if key not in _netrcs:
+        try:
+            _netrcs[key] = netrc.netrc()
+        except (OSError, netrc.NetrcParseError):
+            _netrcs[key] = None
+    return _netrcs[key]
+
+
+def _stat_key(paths):
+    key = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            key.append((path, None, None))
+        else:
+            key.append((path, stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+def cache_dir(*parts: str) -> str:
+    """Return a directory in scrapyd-client's cache directory, creating it if needed."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    path = os.path.join(base, "scrapyd-client", *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def closest_scrapy_cfg(path: str = ".", prevpath: str | None = None) -> str:
+    """
+    Return the path to the closest ``scrapy.cfg`` file, in the directory or its parents, or an empty string.
+
+    .. seealso:: ``scrapy.utils.conf.closest_scrapy_cfg``
+    """
+    path = os.path.realpath(path)
+    while path != prevpath:
+        cfgfile = os.path.join(path, "scrapy.cfg")
+        if os.path.exists(cfgfile):
+            return cfgfile
+        path, prevpath = os.path.dirname(path), path
+    return ""
+
+
+def get_sources(use_closest=True) -> list[str]:
+    """
+    Return the paths of the Scrapy configuration files, from lowest to highest precedence.
+
+    .. seealso:: ``scrapy.utils.conf.get_sources``
+    """
+    xdg_config_home = os.environ.get("XDG_CONFIG_HOME") or os.path.expanduser("~/.config")
+    sources = [
+        "/etc/scrapy.cfg",
+        r"c:\scrapy\scrapy.cfg",
+        os.path.join(xdg_config_home, "scrapy.cfg"),
+        os.path.expanduser("~/.scrapy.cfg"),
+    ]
+    if use_closest:
+        sources.append(closest_scrapy_cfg())
+    return sources
+
+
+def inside_project() -> bool:
+    """
+    Return whether the Scrapy settings module can be imported, or a ``scrapy.cfg`` file is found.
+
+    .. seealso:: ``scrapy.utils.project.inside_project``
+    """
+    if scrapy_module := os.environ.get("SCRAPY_SETTINGS_MODULE"):
+        try:
+            import_module(scrapy_module)
+        except ImportError as e:
+            warnings.warn(f"Cannot import scrapy settings module {scrapy_module}: {e}", stacklevel=2)
+        else:
+            return True
+    return bool(closest_scrapy_cfg())
 
 
 def get_config(use_closest=True):
-    """Get Scrapy config file as a ConfigParser."""
+    """
+    Get Scrapy config file as a ConfigParser.
+
+    The files are parsed once per process, and again only if their modification times or sizes change. Environment
+    variables in values are expanded when the values are read, and aren't cached.
+    """
     cfg = ConfigParser(interpolation=EnvInterpolation())
-    cfg.read(conf.get_sources(use_closest))
+    try:
+        cfg.read_dict(_sections(_read_config(use_closest)))
+    except ValueError:  # a "%" that isn't interpolation syntax, which is an error only when the value is read
+        cfg = ConfigParser(interpolation=EnvInterpolation())
+        cfg.read(get_sources(use_closest))
     return cfg
 
 
+def _read_config(use_closest=True):
+    # Like get_config(), but the parser is shared with other callers: don't modify it.
+    sources = get_sources(use_closest)
+    key = _stat_key(sources)
+    if key not in _configs:
+        cfg = ConfigParser(interpolation=EnvInterpolation())
+        cfg.read(sources)
+        _configs[key] = cfg
+    return _configs[key]
+
+
+def _sections(cfg):
+    return {"DEFAULT": cfg.defaults(), **{name: dict(cfg.items(name, raw=True)) for name in cfg.sections()}}
+
+
 def _get_targets():
-    cfg = get_config()
+    cfg = _read_config()
     baset = dict(cfg.items("deploy")) if cfg.has_section("deploy") else {}
     targets = {}
     if "url" in baset:
@@ -48,3 +173,63 @@ def _get_targets():
             t.update(cfg.items(section))
             targets[section[7:]] = t
     return targets
+
+
+class TaskResult(NamedTuple):
+    """The outcome of calling a function on an item, as yielded by :func:`_run_concurrently`."""
+
+    item: Any
+    value: Any
+    error: Exception | None
+    elapsed: float
+
+
+def _call(func, item):
+    start = time.perf_counter()
+    try:
+        value = func(item)
+    except Exception as e:  # noqa: BLE001
+        return TaskResult(item, None, e, time.perf_counter() - start)
+    return TaskResult(item, value, None, time.perf_counter() - start)
+
+
+def _run_concurrently(func: Callable, iterable: Iterable, concurrency: int = 1) -> Iterator[TaskResult]:
+    """
+    Call a function on each item, and yield the results in order, as soon as they are available.
+
+    At most ``concurrency`` calls are in flight at once, and the iterable is consumed lazily.
+    """
+    if concurrency <= 1:
+        for item in iterable:
+            yield _call(func, item)
+        return
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = deque()
+        for item in iterable:
+            futures.append(executor.submit(_call, func, item))
+            if len(futures) >= concurrency:
+                yield futures.popleft().result()
+        while futures:
+            yield futures.popleft().result()
+
+
+def _schedule_many(client, jobs, concurrency=1, rate=None, max_pending=None) -> Iterator[TaskResult]:
+    # Schedule jobs with the schedule() method of a ScrapydClient or ScrapydCluster, as documented by
+    # ScrapydClient.schedule_many.
+    limiter = None if rate is None else TokenBucket(rate)
+    backpressure = None if max_pending is None else Backpressure(lambda: client.daemonstatus()["pending"], max_pending)
+
+    def schedule(job):
+        if not job.get("project") or not job.get("spider"):
+            raise ValueError("A job must have a project and a spider")
+        args = job.get("args") or []
+        if isinstance(args, dict):
+            args = list(args.items())
+        if backpressure is not None:
+            backpressure.acquire()
+        if limiter is not None:
+            limiter.acquire()
+        return client.schedule(job["project"], job["spider"], [tuple(arg) for arg in args])
+
+    return _run_concurrently(schedule, jobs, concurrency)
@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+import time
+from typing import TYPE_CHECKING, NamedTuple
+
+from scrapyd_client.records import STATES
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+
+    from scrapyd_client.pyclient import ScrapydClient
+
+#: The state of a watched job that isn't listed by Scrapyd, either because the job ID is unknown, or because the job
+#: finished long ago and Scrapyd no longer keeps track of it.
+UNKNOWN = "unknown"
+TERMINAL_STATES = ("finished", UNKNOWN)
+
+
+class JobEvent(NamedTuple):
+    """A change in a job's state, as yielded by :func:`watch`."""
+
+    time: float
+    project: str | None
+    jobid: str
+    spider: str | None
+    previous: str | None
+    state: str
+
+    def to_dict(self) -> dict:
+        """Return the event as a JSON-serializable dict."""
+        return self._asdict()
+
+
+def watch(
+    client: ScrapydClient,
+    projects: Iterable[str],
+    jobids: Iterable[str] | None = None,
+    interval: float = 1,
+    max_interval: float = 30,
+    backoff: float = 2,
+    timeout: float | None = None,
+) -> Iterator[JobEvent]:
+    """
+    Yield an event each time a job changes state.
+
+    Each poll requests ``listjobs.json`` once per project, however many jobs are watched. If no job changed state,
+    the next poll waits ``backoff`` times longer, up to ``max_interval`` seconds. Otherwise, it waits ``interval``
+    seconds.
+
+    :param projects: The projects whose jobs to watch
+    :param jobids: The IDs of the jobs to watch. The generator stops once all are finished or unknown.
+        If not provided, all jobs are watched, and jobs that are already finished at the first poll are ignored.
+        Jobs that Scrapyd no longer lists are forgotten, so that memory use doesn't grow over time.
+    :param timeout: The number of seconds after which the generator stops, if not stopped earlier
+    """
+    projects = list(projects)
+    watched = None if jobids is None else set(jobids)
+    states = {}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    delay = interval
+    first = True
+
+    while True:
+        changed = False
+        seen = set()
+        for project in projects:
+            response = client.jobs(project)
+            for state in STATES:
+                for job in response.get(state, []):
+                    jobid = job["id"]
+                    if watched is not None and jobid not in watched:
+                        continue
+                    seen.add(jobid)
+                    previous = states.get(jobid)
+                    if previous == state or (first and watched is None and state == "finished"):
+                        states[jobid] = state
+                        continue
+                    states[jobid] = state
+                    changed = True
+                    yield JobEvent(time.time(), project, jobid, job.get("spider"), previous, state)
+
+        if watched is None:
+            # Forget the jobs that Scrapyd no longer lists, like finished jobs that left its list of finished jobs.
+            for jobid in states.keys() - seen:
+                del states[jobid]
+        else:
+            for jobid in sorted(watched - seen):
+                if states.get(jobid) != UNKNOWN:
+                    project = projects[0] if len(projects) == 1 else None
+                    changed = True
+                    yield JobEvent(time.time(), project, jobid, None, states.get(jobid), UNKNOWN)
+                    states[jobid] = UNKNOWN
+            if all(states.get(jobid) in TERMINAL_STATES for jobid in watched):
+                return
+
+        first = False
+        delay = interval if changed else min(delay * backoff, max_interval)
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            delay = min(delay, remaining)
+        time.sleep(delay)
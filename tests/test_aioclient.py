@@ -0,0 +1,89 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+
+from scrapyd_client.aioclient import AsyncScrapydClient
+from scrapyd_client.exceptions import ErrorResponse, MalformedResponse
+
+in_flight = {"current": 0, "peak": 0}
+
+
+async def handler(request):
+    basename = request.match_info["basename"]
+    if basename == "listprojects":
+        return web.json_response({"status": "ok", "projects": ["foo", "bar"]})
+    if basename == "listspiders":
+        return web.json_response({"status": "ok", "spiders": [f"{request.query['project']}_1", "other"]})
+    if basename == "schedule":
+        data = await request.post()
+        return web.json_response({"status": "ok", "jobid": f"{data['project']}-{data['spider']}-{data['key']}"})
+    if basename == "status":
+        in_flight["current"] += 1
+        in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        await asyncio.sleep(0.01)
+        in_flight["current"] -= 1
+        return web.json_response({"status": "ok", "currstate": "running"})
+    if basename == "listversions":
+        return web.Response(text="<html>")
+    return web.json_response({"status": "error", "message": "Not found."})
+
+
+def run(coroutine_function):
+    async def main():
+        app = web.Application()
+        app.router.add_route("*", "/{basename}.json", handler)
+        async with TestServer(app) as server:
+            client = AsyncScrapydClient(str(server.make_url("")).rstrip("/"), max_concurrency=2)
+            try:
+                return await coroutine_function(client)
+            finally:
+                await client.close()
+
+    return asyncio.run(main())
+
+
+def test_projects(conf_default_target):
+    async def main(client):
+        return await client.projects("f*")
+
+    assert run(main) == ["foo"]
+
+
+def test_spiders(conf_default_target):
+    async def main(client):
+        return await client.spiders("foo")
+
+    assert run(main) == ["foo_1", "other"]
+
+
+def test_schedule(conf_default_target):
+    async def main(client):
+        return await client.schedule("foo", "bar", [("key", "value")])
+
+    assert run(main) == "foo-bar-value"
+
+
+def test_status_concurrently(conf_default_target):
+    async def main(client):
+        return await asyncio.gather(*(client.status(str(jobid)) for jobid in range(10)))
+
+    assert run(main) == [{"status": "ok", "currstate": "running"}] * 10
+    assert in_flight["peak"] == 2
+
+
+def test_error_response(conf_default_target):
+    async def main(client):
+        return await client.daemonstatus()
+
+    with pytest.raises(ErrorResponse, match="Not found."):
+        run(main)
+
+
+def test_malformed_response(conf_default_target):
+    async def main(client):
+        return await client.versions("foo")
+
+    with pytest.raises(MalformedResponse, match="<html>"):
+        run(main)
@@ -0,0 +1,40 @@
+import json
+
+import pytest
+
+from benchmarks.__main__ import main
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.pyclient import ScrapydClient
+
+
+def test_fake_scrapyd():
+    with FakeScrapyd(projects=2, spiders=3, jobs=4) as server, ScrapydClient(server.url) as client:
+        assert client.projects() == ["project0", "project1"]
+        assert client.spiders("project0") == ["spider0", "spider1", "spider2"]
+        jobs = client.jobs("project0")
+        assert [len(jobs[state]) for state in ("pending", "running", "finished")] == [4, 4, 4]
+        assert len(client.schedule("project0", "spider0", [("arg", "value")])) == 32
+        with pytest.raises(ErrorResponse, match="No such endpoint: GET /nonexistent"):
+            client._get("nonexistent")  # noqa: SLF001
+
+    assert server.requests == 5
+
+
+def test_main(tmp_path, capsys):
+    output = tmp_path / "results.json"
+
+    main(["client", "schedule", "upload", "--requests", "5", "--upload-size", "1", "--output", str(output)])
+    main(["schedule", "--requests", "5", "--compare", str(output)])
+
+    results = json.loads(output.read_text())["results"]
+    assert set(results) == {"client", "schedule", "upload"}
+    assert results["schedule"]["jobs"]["count"] == 5
+    assert "schedule.jobs.per_second" in capsys.readouterr().err
+
+
+def test_main_unknown(capsys):
+    with pytest.raises(SystemExit):
+        main(["nonexistent"])
+
+    assert "unknown benchmarks: nonexistent" in capsys.readouterr().err
@@ -0,0 +1,241 @@
+import os
+import subprocess
+import time
+
+import pytest
+
+from scrapyd_client.cache import (
+    DependencyCache,
+    DeployManifest,
+    Deployment,
+    EggCache,
+    ResponseCache,
+    source_hashes,
+)
+
+
+def write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_key(tmp_path):
+    cache = EggCache(str(tmp_path / "cache"))
+    root = tmp_path / "project"
+    write(str(root / "setup.py"), "setup()")
+    write(str(root / "myproject" / "__init__.py"), "")
+    write(str(root / "myproject" / "data" / "file.json"), "{}")
+    key = cache.key(str(root), "myproject.settings")
+
+    # Ignored files.
+    write(str(root / "myproject" / "__pycache__" / "x.pyc"), "")
+    write(str(root / "build" / "lib" / "x.py"), "")
+    write(str(root / "notapackage" / "x.py"), "")
+    write(str(root / ".git" / "HEAD"), "")
+    write(str(root / "requirements.txt"), "scrapy")
+    assert cache.key(str(root), "myproject.settings") == key
+
+    assert cache.key(str(root), "myproject.settings", requirements=True) != key
+    assert cache.key(str(root), "other.settings") != key
+
+    write(str(root / "myproject" / "data" / "file.json"), "[]")
+    assert cache.key(str(root), "myproject.settings") != key
+
+
+def test_key_all_files(tmp_path):
+    cache = EggCache(str(tmp_path / "cache"))
+    root = tmp_path / "project"
+    write(str(root / "setup.py"), "setup(data_files=[('data', ['data/file.json'])])")
+    write(str(root / "data" / "file.json"), "{}")
+    key = cache.key(str(root), "myproject.settings", all_files=True)
+
+    # Ignored files.
+    write(str(root / "build" / "lib" / "x.py"), "")
+    write(str(root / ".git" / "HEAD"), "")
+    write(str(root / "venv" / "pyvenv.cfg"), "")
+    write(str(root / "venv" / "lib" / "x.py"), "")
+    assert cache.key(str(root), "myproject.settings", all_files=True) == key
+    assert cache.key(str(root), "myproject.settings") != key
+
+    write(str(root / "data" / "file.json"), "[]")
+    assert cache.key(str(root), "myproject.settings", all_files=True) != key
+
+
+def test_source_hashes(tmp_path):
+    root = tmp_path / "project"
+    write(str(root / "setup.py"), "setup()")
+    write(str(root / "myproject" / "__init__.py"), "")
+    write(str(root / "myproject" / "__pycache__" / "x.pyc"), "")
+    write(str(root / "requirements.txt"), "scrapy")
+
+    assert source_hashes(str(root)) == {
+        "setup.py": "e260962f3d4d4ec2b5b757f59662096f02d4735b0db3d34ee14a55d63e6aac2c",
+        "myproject/__init__.py": "e3b0c44298fc1c149afbf4c8996fb92427ae41e4649b934ca495991b7852b855",
+    }
+    assert "requirements.txt" in source_hashes(str(root), requirements=True)
+
+
+def test_deployment_changes():
+    previous = Deployment("1", "build", {"a.py": "1", "b.py": "2", "c.py": "3"})
+    current = Deployment("2", "build", {"a.py": "1", "b.py": "changed", "d.py": "4"})
+
+    assert previous.changes(current) == [("modified", "b.py"), ("removed", "c.py"), ("added", "d.py")]
+    assert previous.changes(previous) == []
+
+
+def test_deploy_manifest(tmp_path):
+    path = str(tmp_path / "deployments.json")
+    deployment = Deployment("1", "build", {"a.py": "1"})
+    DeployManifest(path).set("http://localhost:6800/", "myproject", deployment)
+
+    manifest = DeployManifest(path)
+    assert manifest.get("http://localhost:6800/", "myproject") == deployment
+    assert manifest.get("http://localhost:6800/", "other") is None
+    assert manifest.get("http://otherhost:6800/", "myproject") is None
+
+
+def test_get_put(tmp_path):
+    cache = EggCache(str(tmp_path / "cache"))
+    write(str(tmp_path / "project.egg"), "egg")
+
+    assert cache.get("abc") is None
+
+    path = cache.put("abc", str(tmp_path / "project.egg"))
+
+    assert cache.get("abc") == path
+    with open(path) as f:
+        assert f.read() == "egg"
+
+
+def test_evict(tmp_path):
+    cache = EggCache(str(tmp_path / "cache"), max_size=10, max_age=60)
+    write(str(tmp_path / "project.egg"), "egg")
+    now = time.time()
+    for key, age in (("old", 120), ("a", 30), ("b", 20), ("c", 10)):
+        path = cache.put(key, str(tmp_path / "project.egg"))
+        os.utime(path, (now - age, now - age))
+
+    cache.put("d", str(tmp_path / "project.egg"))
+
+    assert [key for key in ("old", "a", "b", "c", "d") if cache.get(key)] == ["b", "c", "d"]
+
+
+def test_dependency_cache(mocker, tmp_path):
+    def run(args, **kwargs):
+        write(os.path.join(args[args.index("-w") + 1], "scrapy-2.0-py3-none-any.whl"), "")
+
+    mock_run = mocker.patch("scrapyd_client.cache.subprocess.run", side_effect=run)
+    cache = DependencyCache(str(tmp_path / "cache"))
+    write(str(tmp_path / "requirements.txt"), "scrapy")
+    key = cache.key(str(tmp_path / "requirements.txt"))
+
+    assert cache.get(key) is None
+
+    path = cache.put(key, str(tmp_path / "requirements.txt"))
+
+    assert cache.get(key) == path
+    assert "scrapy-2.0-py3-none-any.whl" in os.listdir(path)
+    mock_run.assert_called_once()
+
+    write(str(tmp_path / "requirements.txt"), "scrapy==2.0")
+    assert cache.key(str(tmp_path / "requirements.txt")) != key
+
+
+def test_dependency_cache_key_includes(tmp_path):
+    cache = DependencyCache(str(tmp_path / "cache"))
+    write(str(tmp_path / "requirements.txt"), "-r requirements/base.txt\n--constraint=constraints.txt\n")
+    write(str(tmp_path / "requirements" / "base.txt"), "scrapy\n-r../requirements.txt\n")
+    write(str(tmp_path / "constraints.txt"), "scrapy==2.0")
+    key = cache.key(str(tmp_path / "requirements.txt"))
+
+    write(str(tmp_path / "requirements" / "base.txt"), "scrapy\nitemadapter\n")
+    assert cache.key(str(tmp_path / "requirements.txt")) != key
+    key = cache.key(str(tmp_path / "requirements.txt"))
+
+    write(str(tmp_path / "constraints.txt"), "scrapy==2.1")
+    assert cache.key(str(tmp_path / "requirements.txt")) != key
+
+
+def test_dependency_cache_prune(mocker, tmp_path):
+    mocker.patch("scrapyd_client.cache.subprocess.run")
+    cache = DependencyCache(str(tmp_path / "cache"))
+    write(str(tmp_path / "requirements.txt"), "")
+    path = cache.put("old", str(tmp_path / "requirements.txt"))
+    cache.put("new", str(tmp_path / "requirements.txt"))
+    os.utime(os.path.join(path, DependencyCache.marker), (0, 0))
+
+    assert cache.prune(max_age=60) == 1
+    assert cache.get("old") is None
+    assert cache.get("new") is not None
+
+
+def test_dependency_cache_put_error(mocker, tmp_path):
+    mocker.patch("scrapyd_client.cache.subprocess.run", side_effect=subprocess.CalledProcessError(1, "pip"))
+    cache = DependencyCache(str(tmp_path / "cache"))
+
+    with pytest.raises(subprocess.CalledProcessError):
+        cache.put("key", "requirements.txt")
+
+    assert os.listdir(cache.directory) == []
+
+
+def test_response_cache(mocker):
+    mock_time = mocker.patch("scrapyd_client.cache.time.time", return_value=1000)
+    cache = ResponseCache({"listversions": 0}, max_entries=2)
+
+    assert cache.cacheable("listspiders")
+    assert not cache.cacheable("listversions")
+    assert not cache.cacheable("listjobs")
+
+    cache.set("http://a", "listprojects", {}, {"projects": ["foo"]})
+    cache.set("http://a", "listspiders", {"project": "foo"}, {"spiders": ["bar"]})
+    assert cache.get("http://a", "listprojects", {}) == {"projects": ["foo"]}
+    assert cache.get("http://b", "listprojects", {}) is None
+
+    # The least recently used entry is evicted.
+    cache.set("http://a", "listspiders", {"project": "baz"}, {"spiders": []})
+    assert cache.get("http://a", "listspiders", {"project": "foo"}) is None
+    assert len(cache) == 2
+
+    # Entries expire.
+    mock_time.return_value = 1061
+    assert cache.get("http://a", "listprojects", {}) is None
+    assert cache.get("http://a", "listspiders", {"project": "baz"}) == {"spiders": []}
+
+
+def test_response_cache_invalidate():
+    cache = ResponseCache()
+    cache.set("http://a", "listprojects", {}, {"projects": ["foo", "bar"]})
+    cache.set("http://a", "listspiders", {"project": "foo"}, {"spiders": []})
+    cache.set("http://a", "listspiders", {"project": "bar"}, {"spiders": []})
+    cache.set("http://b", "listprojects", {}, {"projects": ["foo"]})
+
+    assert cache.invalidate("http://a", "foo") == 2
+    assert cache.get("http://a", "listspiders", {"project": "bar"}) is not None
+    assert cache.get("http://b", "listprojects", {}) is not None
+
+    assert cache.invalidate("http://a") == 1
+    assert len(cache) == 1
+
+
+def test_response_cache_persistence(tmp_path):
+    path = str(tmp_path / "responses.json")
+    cache = ResponseCache(path=path)
+    cache.set("http://a", "listprojects", {}, {"projects": ["foo"]})
+    assert not os.path.exists(path)
+
+    cache.save()
+    assert ResponseCache(path=path).get("http://a", "listprojects", {}) == {"projects": ["foo"]}
+
+    cache.invalidate("http://a")
+    cache.save()
+    assert ResponseCache(path=path).get("http://a", "listprojects", {}) is None
+
+    os.remove(path)
+    cache.save()  # unchanged
+    assert not os.path.exists(path)
+
+    with open(path, "w") as f:
+        f.write("{")
+    assert len(ResponseCache(path=path)) == 0
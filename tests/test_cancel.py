@@ -0,0 +1,94 @@
+from textwrap import dedent
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.pyclient import ScrapydClient
+from tests.conftest import _write_conf_file
+
+
+def test_cancel(script_runner, project):
+    with FakeScrapyd(spiders=2, jobs=2) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "cancel", "-p", "*", "spider1"])
+
+        assert server.requests == 4  # listprojects, listjobs and 2 cancel
+
+    assert result.success, result.stderr
+    assert result.stdout == dedent(
+        f"""\
+        project0 / spider1 pending{1:032} => canceled (running)
+        project0 / spider1 running{1:032} => canceled (running)
+        Canceled 2 job(s), 0 failure(s)
+        """
+    )
+
+
+def test_cancel_state_dry_run(script_runner, project):
+    with FakeScrapyd(spiders=2, jobs=2) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(
+            ["scrapyd-client", "cancel", "-p", "project0", "*", "--state", "running", "--dry-run"]
+        )
+
+        assert server.requests == 2  # listprojects and listjobs
+
+    assert result.success, result.stderr
+    assert result.stdout == dedent(
+        f"""\
+        project0 / spider0 running{0:032} => would cancel (running)
+        project0 / spider1 running{1:032} => would cancel (running)
+        Would cancel 2 job(s)
+        """
+    )
+
+
+def test_cancel_targets(script_runner, project):
+    with FakeScrapyd(jobs=1) as a, FakeScrapyd(jobs=1) as b:
+        _write_conf_file(
+            f"[deploy:a]\nurl = {a.url}\n[deploy:b]\nurl = {b.url}\n[deploy:c]\nurl = http://127.0.0.1:1\n"
+        )
+
+        result = script_runner.run(
+            ["scrapyd-client", "cancel", "--targets", "*", "-p", "*", "*", "--state", "pending"]
+        )
+
+    assert not result.success
+    assert "Failed to list jobs (c): " in result.stderr
+    assert sorted(result.stdout.splitlines()) == [
+        "Canceled 2 job(s), 1 failure(s)",
+        f"project0 / spider0 pending{0:032} (a) => canceled (running)",
+        f"project0 / spider0 pending{0:032} (b) => canceled (running)",
+    ]
+
+
+def test_cancel_failure(mocker, script_runner, project):
+    cancel = ScrapydClient.cancel
+
+    def fail(self, project, job, *args):
+        if job.startswith("pending"):
+            raise ErrorResponse("Boom.")
+        return cancel(self, project, job, *args)
+
+    mocker.patch("scrapyd_client.pyclient.ScrapydClient.cancel", autospec=True, side_effect=fail)
+    with FakeScrapyd(jobs=1) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "cancel", "-p", "*", "*"])
+
+    assert result.returncode == 1
+    assert result.stdout == dedent(
+        f"""\
+        project0 / spider0 running{0:032} => canceled (running)
+        Canceled 1 job(s), 1 failure(s)
+        """
+    )
+    assert result.stderr == f"project0 / spider0 pending{0:032} => failed: Boom.\n"
+
+
+def test_cancel_missing_spider(script_runner, project):
+    result = script_runner.run(["scrapyd-client", "cancel", "-p", "project0"])
+
+    assert not result.success
+    assert "the following arguments are required: SPIDER" in result.stderr
@@ -0,0 +1,192 @@
+import pytest
+import requests
+
+from scrapyd_client.cluster import ScrapydCluster
+from scrapyd_client.exceptions import ErrorResponse
+from tests import assert_lines
+
+
+@pytest.fixture
+def cluster(mocker):
+    node1 = mocker.Mock()
+    node1.projects.return_value = ["foo", "bar"]
+    node1.spiders.return_value = ["spider1"]
+    node1.jobs.return_value = {"status": "ok", "pending": [{"id": "1"}], "running": [], "finished": []}
+    node1.daemonstatus.return_value = {"status": "ok", "pending": 3, "running": 2, "finished": 10}
+    node1.schedule.return_value = "job1"
+
+    node2 = mocker.Mock()
+    node2.projects.return_value = ["bar", "baz"]
+    node2.spiders.return_value = ["spider1", "spider2"]
+    node2.jobs.return_value = {"status": "ok", "pending": [], "running": [{"id": "2"}], "finished": []}
+    node2.daemonstatus.return_value = {"status": "ok", "pending": 0, "running": 4, "finished": 1}
+    node2.schedule.return_value = "job2"
+
+    return ScrapydCluster({"node1": node1, "node2": node2})
+
+
+def test_projects(cluster):
+    assert cluster.projects() == ["foo", "bar", "baz"]
+    assert cluster.failures == {}
+
+
+def test_spiders(cluster):
+    assert cluster.spiders("foo") == ["spider1"]
+    cluster.clients["node2"].spiders.assert_not_called()
+    assert cluster.spiders("bar") == ["spider1", "spider2"]
+    assert cluster.clients["node1"].projects.call_count == 1
+
+
+def test_jobs(cluster):
+    assert cluster.jobs("bar") == {
+        "pending": [{"id": "1", "node": "node1"}],
+        "running": [{"id": "2", "node": "node2"}],
+        "finished": [],
+    }
+
+
+def test_daemonstatus(cluster):
+    status = cluster.daemonstatus()
+
+    assert status["pending"] == 3
+    assert status["running"] == 6
+    assert status["finished"] == 11
+    assert set(status["nodes"]) == {"node1", "node2"}
+
+
+def test_schedule_least_loaded(cluster):
+    assert [cluster.schedule("bar", "spider1")[0] for _ in range(4)] == ["node2", "node1", "node2", "node1"]
+    assert cluster.schedule("foo", "spider1") == ("node1", "job1")
+    assert cluster.clients["node1"].daemonstatus.call_count == 1
+
+
+def test_schedule_no_node(cluster):
+    with pytest.raises(ValueError, match="No node has the project 'other'"):
+        cluster.schedule("other", "spider1")
+
+
+def test_schedule_refresh_failed(cluster):
+    cluster.clients["node1"].daemonstatus.side_effect = ErrorResponse("Boom.")
+
+    with pytest.raises(ValueError, match=r"No node has the project 'foo'; failed to refresh node1 \(Boom.\)"):
+        cluster.schedule("foo", "spider1")
+    assert list(cluster.failures) == ["node1"]
+
+
+def test_spiders_failures(cluster):
+    cluster.clients["node1"].spiders.side_effect = ErrorResponse("Boom.")
+    cluster.clients["node2"].projects.side_effect = ErrorResponse("Boom.")
+
+    assert cluster.spiders("bar") == []
+    assert set(cluster.failures) == {"node1", "node2"}
+
+
+def test_failures(cluster):
+    cluster.clients["node2"].projects.side_effect = ErrorResponse("Boom.")
+
+    assert cluster.projects() == ["foo", "bar"]
+    assert list(cluster.failures) == ["node2"]
+
+
+def test_cli_projects(mocker, script_runner, conf_named_targets):
+    def get(session, url, **kwargs):
+        if url.startswith("http://localhost:6801/"):
+            raise requests.ConnectionError("Refused.")
+        response = mocker.Mock()
+        response.json.return_value = {"status": "ok", "projects": ["foo"]}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+
+    result = script_runner.run(["scrapyd-client", "projects", "--targets", "target*"])
+
+    assert result.success
+    assert result.stdout == "foo\n"
+    assert_lines(result.stderr, "Failed to query target (target1): Refused.")
+
+
+def test_cli_schedule(mocker, script_runner, conf_named_targets):
+    def get(session, url, **kwargs):
+        response = mocker.Mock()
+        if url.endswith("/daemonstatus.json"):
+            running = 5 if url.startswith("http://localhost:6801/") else 10
+            response.json.return_value = {"status": "ok", "pending": 0, "running": running}
+        elif url.endswith("/listprojects.json"):
+            response.json.return_value = {"status": "ok", "projects": ["foo"]}
+        else:
+            response.json.return_value = {"status": "ok", "spiders": ["bar"]}
+        return response
+
+    mock_post_response = mocker.Mock()
+    mock_post_response.json.return_value = {"status": "ok", "jobid": "42"}
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, return_value=mock_post_response)
+
+    result = script_runner.run(["scrapyd-client", "schedule", "--targets", "*", "-p", "foo", "bar"])
+
+    assert result.success, result.stdout + "\n" + result.stderr
+    assert result.stdout == "foo / bar => 42 (target1)\n"
+
+
+def test_cli_schedule_connection_error(mocker, script_runner, conf_named_targets):
+    def get(session, url, **kwargs):
+        response = mocker.Mock()
+        if url.endswith("/daemonstatus.json"):
+            running = 5 if url.startswith("http://localhost:6801/") else 10
+            response.json.return_value = {"status": "ok", "pending": 0, "running": running}
+        else:
+            response.json.return_value = {"status": "ok", "projects": ["foo"], "spiders": ["bar"]}
+        return response
+
+    # Nothing listens on target1's port.
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+
+    result = script_runner.run(["scrapyd-client", "schedule", "--targets", "*", "-p", "foo", "bar"])
+
+    assert not result.success
+    assert result.stdout.startswith("Failed to connect to target (target1):\n")
+
+
+def test_cli_no_targets(script_runner, conf_named_targets):
+    result = script_runner.run(["scrapyd-client", "projects", "--targets", "other*"])
+
+    assert not result.success
+    assert_lines(result.stderr, "Error: No targets match other*")
+
+
+def test_close(mocker):
+    cluster = ScrapydCluster.from_targets({"a": {"url": "http://a:6800"}, "b": {"url": "http://b:6800"}})
+    mocks = [mocker.patch.object(client.session, "close") for client in cluster.clients.values()]
+
+    with cluster:
+        pass
+
+    for mock in mocks:
+        mock.assert_called_once_with()
+
+
+def test_cli_schedule_concurrency_failures(mocker, script_runner, conf_named_targets):
+    def get(session, url, **kwargs):
+        response = mocker.Mock()
+        if url.startswith("http://localhost:6801/"):
+            raise requests.ConnectionError("Refused.")
+        if url.endswith("/daemonstatus.json"):
+            response.json.return_value = {"status": "ok", "pending": 0, "running": 0}
+        elif url.endswith("/listprojects.json"):
+            response.json.return_value = {"status": "ok", "projects": ["foo"]}
+        else:
+            response.json.return_value = {"status": "ok", "spiders": ["bar"]}
+        return response
+
+    mock_post_response = mocker.Mock()
+    mock_post_response.json.return_value = {"status": "ok", "jobid": "42"}
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, return_value=mock_post_response)
+
+    result = script_runner.run(
+        ["scrapyd-client", "schedule", "--targets", "*", "-p", "foo", "bar", "--concurrency", "2"]
+    )
+
+    assert result.success, result.stdout + "\n" + result.stderr
+    assert result.stdout.startswith("foo / bar => 42 (target2)\nScheduled 1 job(s), 0 failure(s)")
+    assert result.stderr == "Failed to query target (target1): Refused.\n"
@@ -0,0 +1,59 @@
+import os
+import zipfile
+from importlib.metadata import PathDistribution
+
+from scrapyd_client.egg import build_egg, egg_filename
+
+
+def write(path, content=""):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(content)
+
+
+def test_build_egg(tmp_path):
+    root = tmp_path / "project"
+    write(str(root / "setup.py"))
+    write(str(root / "local_settings.py"))
+    write(str(root / "myproject" / "__init__.py"))
+    write(str(root / "myproject" / "settings.py"), "BOT_NAME = 'myproject'")
+    write(str(root / "myproject" / "spiders" / "__init__.py"))
+    write(str(root / "myproject" / "spiders" / "__pycache__" / "x.cpython-311.pyc"))
+    write(str(root / "myproject" / "data" / "file.json"), "{}")
+    write(str(root / "notapackage" / "x.py"))
+    write(str(root / "build" / "lib" / "myproject" / "__init__.py"))
+
+    path = build_egg(str(root), "myproject.settings", str(tmp_path / egg_filename()))
+
+    with zipfile.ZipFile(path) as egg:
+        assert sorted(egg.namelist()) == [
+            "EGG-INFO/PKG-INFO",
+            "EGG-INFO/SOURCES.txt",
+            "EGG-INFO/dependency_links.txt",
+            "EGG-INFO/entry_points.txt",
+            "EGG-INFO/top_level.txt",
+            "EGG-INFO/zip-safe",
+            "myproject/__init__.py",
+            "myproject/data/file.json",
+            "myproject/settings.py",
+            "myproject/spiders/__init__.py",
+        ]
+        assert egg.read("myproject/settings.py") == b"BOT_NAME = 'myproject'"
+
+    distribution = PathDistribution(zipfile.Path(path, "EGG-INFO/"))
+    assert distribution.metadata["Name"] == "project"
+    assert [(ep.group, ep.name, ep.value) for ep in distribution.entry_points] == [
+        ("scrapy", "settings", "myproject.settings")
+    ]
+
+
+def test_build_egg_reproducible(tmp_path):
+    root = tmp_path / "project"
+    write(str(root / "myproject" / "__init__.py"), "x = 1")
+
+    first = build_egg(str(root), "myproject.settings", str(tmp_path / "first.egg"))
+    os.utime(str(root / "myproject" / "__init__.py"), (0, 0))
+    second = build_egg(str(root), "myproject.settings", str(tmp_path / "second.egg"))
+
+    with open(first, "rb") as f, open(second, "rb") as g:
+        assert f.read() == g.read()
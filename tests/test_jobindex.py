@@ -0,0 +1,230 @@
+import json
+from datetime import datetime
+
+import pytest
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.jobindex import IndexedJob, JobIndex, SyncResult
+from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.records import Job
+from tests.conftest import _write_conf_file
+
+
+def naive(*args):
+    return datetime(*args)  # noqa: DTZ001
+
+
+def finished(jobid, spider="s1", minute=1):
+    return Job("p", spider, jobid, "finished", 1, naive(2025, 1, 1), naive(2025, 1, 1, 0, minute))
+
+
+class FakeClient:
+    url = "http://localhost:6800"
+
+    def __init__(self, *jobs):
+        self.listed = list(jobs)
+        self.read = 0
+
+    def iter_jobs(self, project):
+        for job in self.listed:
+            assert job.project == project
+            self.read += 1
+            yield job
+
+
+@pytest.fixture
+def index():
+    with JobIndex(":memory:") as index:
+        yield index
+
+
+def test_sync(index):
+    client = FakeClient(
+        Job("p", "s1", "1", "pending"),
+        Job("p", "s2", "2", "running", 2, naive(2025, 1, 1)),
+        finished("3"),
+    )
+
+    assert index.sync(client, "p", "t") == SyncResult("t", "p", 3, 0, 0)
+    assert index.last_synced("t", "p") is not None
+    assert index.last_synced("t", "other") is None
+    assert index.query() == [IndexedJob("t", client.listed[i]) for i in (0, 2, 1)]
+
+
+def test_sync_incremental(index):
+    client = FakeClient(Job("p", "s1", "1", "running"), *(finished(str(i)) for i in "345"))
+    index.sync(client, "p", "t")
+
+    # 1 finished, and 6 started and finished, between syncs.
+    client.listed = [finished("1", minute=3), finished("6", minute=2), *(finished(str(i)) for i in "345")]
+    client.read = 0
+
+    assert index.sync(client, "p", "t") == SyncResult("t", "p", 1, 1, 0)
+    assert client.read == 3  # stopped at 3
+    assert [item.job.id for item in index.query()] == ["1", "6", "3", "4", "5"]
+
+    client.read = 0
+
+    assert index.sync(client, "p", "t") == SyncResult("t", "p", 0, 0, 0)
+    assert client.read == 1
+    assert index.sync(client, "p", "t", full=True) == SyncResult("t", "p", 0, 0, 0)
+    assert client.read == 6
+
+
+def test_sync_removed(index):
+    client = FakeClient(Job("p", "s1", "1", "pending"), Job("p", "s1", "2", "running"), finished("3"))
+    index.sync(client, "p", "t")
+
+    # 1 was canceled, and 2 finished, but Scrapyd doesn't list it, like after a restart with in-memory job storage.
+    client.listed = [finished("3"), finished("4")]
+    client.read = 0
+
+    assert index.sync(client, "p", "t") == SyncResult("t", "p", 1, 0, 2)
+    assert client.read == 2  # read to the end, to look for 1 and 2
+    assert {item.job.id for item in index.query()} == {"3", "4"}
+
+
+def test_sync_reads_until_active_found(index):
+    client = FakeClient(Job("p", "s1", "1", "running"), finished("2"))
+    index.sync(client, "p", "t")
+
+    # Scrapyd listed 1 after 2, although it finished later.
+    client.listed = [finished("2"), finished("1", minute=2)]
+    client.read = 0
+
+    assert index.sync(client, "p", "t") == SyncResult("t", "p", 0, 1, 0)
+    assert client.read == 2
+    assert index.query(state="finished", target="t", project="p")[0].job == finished("1", minute=2)
+
+
+def test_sync_targets(index):
+    index.sync(FakeClient(finished("1")), "p", "a")
+    index.sync(FakeClient(finished("1", minute=2)), "p", "b")
+    index.sync(FakeClient(finished("1", minute=3)), "p")
+
+    assert [item.target for item in index.query()] == ["http://localhost:6800", "b", "a"]
+    assert [item.target for item in index.query(target="[ab]")] == ["b", "a"]
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({}, ["1", "2", "4", "3"]),
+        ({"spider": "s2"}, ["2", "3"]),
+        ({"spider": "s*", "state": "finished"}, ["4", "3"]),
+        ({"state": ["pending", "running"]}, ["1", "2"]),
+        ({"since": naive(2025, 1, 1, 0, 1)}, ["2", "4"]),
+        ({"until": naive(2025, 1, 1, 0, 1)}, ["3"]),
+        ({"project": "other"}, []),
+        ({"limit": 1}, ["1"]),
+    ],
+)
+def test_query(index, kwargs, expected):
+    index.sync(
+        FakeClient(
+            Job("p", "s1", "1", "pending"),
+            Job("p", "s2", "2", "running", 2, naive(2025, 1, 1, 0, 5)),
+            finished("3", spider="s2", minute=0),
+            finished("4", minute=1),
+        ),
+        "p",
+        "t",
+    )
+
+    assert [item.job.id for item in index.query(**kwargs)] == expected
+
+
+@pytest.mark.parametrize("pattern", ["spider", "s*", "S*", "[!s]*", "s[[]*", "s\\*", "s?", "*1"])
+def test_query_patterns(index, pattern):
+    with FakeScrapyd(spiders=5, jobs=5) as server, ScrapydClient(server.url) as client:
+        server.spiders = ["spider", "Spider", "s[1]", "s\\1", "s1"]
+        index.sync(client, "project0", "t")
+
+        assert sorted(item.job.id for item in index.query(spider=pattern)) == sorted(
+            job.id for job in client.iter_jobs("project0", pattern)
+        )
+
+
+def test_query_unknown_state(index):
+    with pytest.raises(ValueError, match="Unknown states: done"):
+        index.query(state="done")
+
+
+def test_persistence(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    with JobIndex(path) as index:
+        index.sync(FakeClient(finished("1")), "p", "t")
+
+    with JobIndex(path) as index:
+        assert index.query() == [IndexedJob("t", finished("1"))]
+
+
+def test_cli(script_runner, project, tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    with FakeScrapyd(spiders=2, jobs=2) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(
+            ["scrapyd-client", "jobs", "--index", path, "--sync", "--spider", "spider1", "--state", "finished"]
+        )
+
+        assert result.success, result.stderr
+        assert result.stderr == "Synced default / project0: 6 added, 0 updated, 0 removed\n"
+        assert result.stdout == (
+            f"2025-01-01 00:00:00  2025-01-01 00:01:00  finished  default project0 / spider1 finished{1:032}\n"
+        )
+
+        result = script_runner.run(["scrapyd-client", "jobs", "--index", path, "--sync", "--json", "--limit", "1"])
+
+        assert result.success, result.stderr
+        assert result.stderr == "Synced default / project0: 0 added, 0 updated, 0 removed\n"
+        assert json.loads(result.stdout) == {
+            "target": "default",
+            "project": "project0",
+            "spider": "spider0",
+            "id": f"pending{0:032}",
+            "state": "pending",
+            "pid": None,
+            "start_time": None,
+            "end_time": None,
+            "log_url": None,
+            "items_url": None,
+        }
+
+
+def test_cli_sync_failure(mocker, script_runner, project, tmp_path):
+    sync = JobIndex.sync
+
+    def fail(self, client, project, *args, **kwargs):
+        if project == "project0":
+            raise ErrorResponse("Boom.")
+        return sync(self, client, project, *args, **kwargs)
+
+    mocker.patch("scrapyd_client.jobindex.JobIndex.sync", autospec=True, side_effect=fail)
+    with FakeScrapyd(projects=2, jobs=1) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "jobs", "--index", str(tmp_path / "jobs.sqlite3"), "--sync"])
+
+    assert result.returncode == 1
+    assert result.stderr == (
+        "Failed to sync default / project0: Boom.\nSynced default / project1: 3 added, 0 updated, 0 removed\n"
+    )
+    assert {line.split()[-4] for line in result.stdout.splitlines()} == {"project1"}
+
+
+def test_cli_since(script_runner, project, tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    with JobIndex(path) as index:
+        index.sync(FakeClient(finished("1"), Job("p", "s1", "2", "running", 2, datetime.now())), "p", "t")  # noqa: DTZ005
+
+    result = script_runner.run(["scrapyd-client", "jobs", "--index", path, "--since", "1d"])
+
+    assert result.success, result.stderr
+    assert result.stdout.split()[-1] == "2"
+
+    result = script_runner.run(["scrapyd-client", "jobs", "--index", path, "--since", "yesterday"])
+
+    assert not result.success
+    assert "invalid time: 'yesterday'" in result.stderr
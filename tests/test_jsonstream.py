@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from scrapyd_client.exceptions import MalformedResponse
+from scrapyd_client.jsonstream import JSONObjectStream
+
+DATA = {
+    "node_name": "néud",
+    "status": "ok",
+    "pending": [],
+    "running": [{"id": "a", "pid": 12345, "spider": "spïder"}],
+    "finished": [{"id": "b", "spider": "s", "nested": {"list": [1, 2.5, None, True]}}, {"id": "c", "spider": "s"}],
+    "count": 1234567,
+}
+
+
+def chunked(data, size):
+    return (data[i : i + size] for i in range(0, len(data), size))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1024])
+@pytest.mark.parametrize("indent", [None, 2])
+def test_stream(size, indent):
+    stream = JSONObjectStream(chunked(json.dumps(DATA, indent=indent, ensure_ascii=False).encode(), size))
+
+    assert list(stream) == [
+        ("running", DATA["running"][0]),
+        ("finished", DATA["finished"][0]),
+        ("finished", DATA["finished"][1]),
+    ]
+    assert stream.fields == {"node_name": "néud", "status": "ok", "count": 1234567}
+
+
+def test_stream_empty_object():
+    stream = JSONObjectStream([b" {} "])
+
+    assert list(stream) == []
+    assert stream.fields == {}
+
+
+def test_stream_is_incremental():
+    body = json.dumps({"status": "ok", "finished": [{"id": str(i)} for i in range(10000)]}).encode()
+    stream = JSONObjectStream(chunked(body, 1024))
+
+    assert next(iter(stream)) == ("finished", {"id": "0"})
+    assert stream.bytes_read < 2048
+
+
+@pytest.mark.parametrize(
+    ("body", "message"),
+    [
+        (b"<html>Not Found</html>", "Expected '{'"),
+        (b'{"status": "ok", "finished": [{"id": 1}', "Unexpected end of response"),
+        (b'{"status": "ok" "finished": []}', "Expected one of ',}'"),
+        (b'{"status": "ok", "finished": [{"id": 1}}', "Expected one of ',]'"),
+        (b'{"status": tru}', "Invalid JSON"),
+        (b"{1: 2}", "Expected a key"),
+    ],
+)
+def test_stream_malformed(body, message):
+    with pytest.raises(MalformedResponse, match=message):
+        list(JSONObjectStream(chunked(body, 4)))
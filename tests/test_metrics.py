@@ -0,0 +1,108 @@
+import socket
+
+import pytest
+import requests
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.metrics import Histogram, MetricsCollector, RequestEvent
+from scrapyd_client.pyclient import ScrapydClient
+from tests.conftest import _write_conf_file
+
+
+def event(endpoint="schedule", status=200, error=None, total=0.02):
+    return RequestEvent("POST", endpoint, f"http://localhost:6800/{endpoint}.json", status, error, 10, 20, 0.001,
+                        total - 0.004, 0.002, 0.001, total)  # fmt: skip
+
+
+def test_histogram():
+    histogram = Histogram((0.1, 1))
+    assert histogram.quantile(0.5) is None
+    assert histogram.mean is None
+
+    for value in (0.05, 0.1, 0.5, 0.5, 2):
+        histogram.observe(value)
+
+    assert histogram.cumulative() == [(0.1, 2), (1, 4), (float("inf"), 5)]
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(0.63)
+    assert histogram.quantile(0) == pytest.approx(0.05)
+    assert histogram.quantile(0.4) == pytest.approx(0.1)
+    assert histogram.quantile(0.6) == pytest.approx(0.55)
+    assert histogram.quantile(1) == pytest.approx(2)
+
+
+def test_collector():
+    collector = MetricsCollector()
+    collector(event())
+    collector(event(status=None, error=requests.ConnectionError(), total=0.5))
+    collector(event("listprojects", status=200, total=0.004))
+
+    schedule = collector.endpoints["schedule"]
+    assert schedule.requests == 2
+    assert schedule.errors == 1
+    assert schedule.statuses == {200: 1, None: 1}
+    assert schedule.request_bytes == 20
+    assert schedule.phases["connect"].sum == pytest.approx(0.002)
+
+    lines = collector.summary().splitlines()
+    assert lines[0].split() == ["endpoint", "requests", "errors", "mean", "p50", "p95", "max", *schedule.phases]
+    assert lines[1].split()[:3] == ["listprojects", "1", "0"]
+    assert lines[2].split()[:3] == ["schedule", "2", "1"]
+
+    text = collector.to_prometheus()
+    assert "# TYPE scrapyd_client_request_duration_seconds histogram\n" in text
+    assert 'scrapyd_client_requests_total{endpoint="schedule",status=""} 1\n' in text
+    assert 'scrapyd_client_requests_total{endpoint="schedule",status="200"} 1\n' in text
+    assert 'scrapyd_client_request_errors_total{endpoint="schedule"} 1\n' in text
+    assert 'scrapyd_client_request_duration_seconds_bucket{endpoint="schedule",le="0.025"} 1\n' in text
+    assert 'scrapyd_client_request_duration_seconds_bucket{endpoint="schedule",le="+Inf"} 2\n' in text
+    assert 'scrapyd_client_request_duration_seconds_count{endpoint="schedule"} 2\n' in text
+    assert 'scrapyd_client_request_phase_seconds_count{endpoint="schedule",phase="decode"} 2\n' in text
+
+
+def test_hooks():
+    events = []
+    with FakeScrapyd() as server, ScrapydClient(server.url, hooks=[events.append]) as client:
+        client.projects()
+        client.schedule("project0", "spider0")
+        with pytest.raises(ErrorResponse):
+            client._get("nonexistent")  # noqa: SLF001
+
+    assert [(e.method, e.endpoint, e.status, type(e.error)) for e in events] == [
+        ("GET", "listprojects", 200, type(None)),
+        ("POST", "schedule", 200, type(None)),
+        ("GET", "nonexistent", 404, ErrorResponse),
+    ]
+    assert events[0].connect > 0
+    assert events[1].connect == 0  # the connection is reused
+    assert events[1].request_bytes == len("project=project0&spider=spider0")
+    assert all(e.response_bytes > 0 for e in events)
+    assert all(e.connect + e.server + e.transfer + e.decode <= e.total for e in events)
+
+
+def test_hooks_connection_error():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    events = []
+
+    with pytest.raises(requests.ConnectionError):
+        ScrapydClient(f"http://127.0.0.1:{port}", hooks=[events.append]).projects()
+
+    assert len(events) == 1
+    assert events[0].status is None
+    assert isinstance(events[0].error, requests.ConnectionError)
+
+
+def test_stats(script_runner, project, tmp_path):
+    with FakeScrapyd() as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+        stats_file = tmp_path / "metrics.prom"
+
+        result = script_runner.run(["scrapyd-client", "projects", "--stats", "--stats-file", str(stats_file)])
+
+    assert result.success, result.stderr
+    assert result.stdout == "project0\n"
+    assert result.stderr.splitlines()[1].split()[:3] == ["listprojects", "1", "0"]
+    assert 'scrapyd_client_requests_total{endpoint="listprojects",status="200"} 1\n' in stats_file.read_text()
@@ -2,10 +2,29 @@ def test_projects(mocker, script_runner, conf_default_target):
     projects = ["foo", "bar"]
     mock_response = mocker.Mock()
     mock_response.json.return_value = {"projects": ["foo", "bar"], "status": "ok"}
-    mock_get = mocker.patch("scrapyd_client.pyclient.requests.get", autospec=True)
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True)
     mock_get.return_value = mock_response
     result = script_runner.run(["scrapyd-client", "projects"])
 
     assert result.success, result.stdout + "\n" + result.stderr
     assert not result.stderr, result.stderr
     assert result.stdout == "\n".join(projects) + "\n"
+
+
+def test_projects_cache(mocker, script_runner, conf_default_target):
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = {"projects": ["foo"], "status": "ok"}
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True)
+    mock_get.return_value = mock_response
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True)
+    mock_post.return_value.json.return_value = {"status": "ok"}
+
+    for _ in range(2):
+        result = script_runner.run(["scrapyd-client", "projects", "--cache"])
+        assert result.stdout == "foo\n"
+    assert mock_get.call_count == 1
+
+    # Deploying invalidates the cache.
+    assert script_runner.run(["scrapyd-deploy", "--builder", "native"]).success
+    script_runner.run(["scrapyd-client", "projects", "--cache"])
+    assert mock_get.call_count == 2
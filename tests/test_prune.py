@@ -0,0 +1,108 @@
+from textwrap import dedent
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.pyclient import ScrapydClient
+from tests.conftest import _write_conf_file
+
+
+def test_prune(script_runner, project):
+    with FakeScrapyd(projects=2, versions=3, jobs=0) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "2"])
+
+        assert server.requests == 7  # listprojects, 2 listversions, 2 listjobs and 2 delversion
+
+    assert result.success, result.stderr
+    assert result.stderr == ""
+    assert result.stdout == dedent(
+        """\
+        project0 / 1 => deleted
+        project1 / 1 => deleted
+        Deleted 2 version(s), 0 failure(s)
+        """
+    )
+
+
+def test_prune_dry_run(script_runner, project):
+    with FakeScrapyd(versions=3, jobs=0) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "project0", "--keep", "1", "--dry-run"])
+
+        assert server.requests == 3  # listprojects, listversions and listjobs
+
+    assert result.success, result.stderr
+    assert result.stdout == dedent(
+        """\
+        project0 / 1 => would delete
+        project0 / 2 => would delete
+        Would delete 2 version(s)
+        """
+    )
+
+
+def test_prune_targets(script_runner, project):
+    with FakeScrapyd(versions=2, jobs=0) as a, FakeScrapyd(versions=2, jobs=0) as b:
+        _write_conf_file(f"[deploy:a]\nurl = {a.url}\n[deploy:b]\nurl = {b.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "--targets", "*", "-p", "*", "--keep", "1"])
+
+    assert result.success, result.stderr
+    assert sorted(result.stdout.splitlines()) == [
+        "Deleted 2 version(s), 0 failure(s)",
+        "project0 / 1 (a) => deleted",
+        "project0 / 1 (b) => deleted",
+    ]
+
+
+def test_prune_running(script_runner, project):
+    with FakeScrapyd(versions=2, jobs=1) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "1"])
+
+        assert result.returncode == 1
+        assert result.stdout == "Deleted 0 version(s), 1 failure(s)\n"
+        assert result.stderr == (
+            "project0 => skipped: 1 running job(s), whose versions Scrapyd doesn't report (use --force to prune)\n"
+        )
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "1", "--force"])
+
+        assert result.success, result.stderr
+        assert result.stdout == "project0 / 1 => deleted\nDeleted 1 version(s), 0 failure(s)\n"
+        assert result.stderr == ""
+
+
+def test_prune_failure(mocker, script_runner, project):
+    mocker.patch.object(ScrapydClient, "delversion", side_effect=ErrorResponse("Boom."))
+
+    with FakeScrapyd(versions=2, jobs=0) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "1"])
+
+    assert result.returncode == 1
+    assert result.stdout == "Deleted 0 version(s), 1 failure(s)\n"
+    assert result.stderr == "project0 / 1 => failed: Boom.\n"
+
+
+def test_prune_keep(script_runner, project):
+    result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "0"])
+
+    assert not result.success
+    assert "argument --keep: must be at least 1" in result.stderr
+
+
+def test_prune_close(mocker, script_runner, project):
+    mock_close = mocker.spy(ScrapydClient, "close")
+
+    with FakeScrapyd(versions=1, jobs=0) as server:
+        _write_conf_file(f"[deploy]\nurl = {server.url}\n")
+
+        result = script_runner.run(["scrapyd-client", "prune", "-p", "*", "--keep", "1"])
+
+    assert result.success, result.stderr
+    mock_close.assert_called_once()
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.exceptions import ErrorResponse
+from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.records import DaemonStatus, Job, JobStatus, SpiderListing
+
+
+def naive(*args):
+    # Scrapyd's times are naive, in the server's time zone.
+    return datetime(*args)  # noqa: DTZ001
+
+
+@pytest.fixture
+def client():
+    with FakeScrapyd(spiders=2, jobs=3) as server, ScrapydClient(server.url) as client:
+        yield client
+
+
+def test_iter_jobs(client):
+    jobs = list(client.iter_jobs("myproject"))
+
+    assert [job.state for job in jobs] == ["pending"] * 3 + ["running"] * 3 + ["finished"] * 3
+    assert jobs[0] == Job("myproject", "spider0", f"pending{0:032}", "pending")
+    assert jobs[-1] == Job(
+        "myproject",
+        "spider0",
+        f"finished{2:032}",
+        "finished",
+        1002,
+        naive(2025, 1, 1),
+        naive(2025, 1, 1, 0, 1),
+        f"/logs/myproject/spider0/finished{2:032}.log",
+        f"/items/myproject/spider0/finished{2:032}.jl",
+    )
+    assert jobs[-1].time == naive(2025, 1, 1, 0, 1)
+    assert jobs[0].time is None
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected"),
+    [
+        ({"state": "running"}, ["running0", "running1", "running2"]),
+        ({"state": ["pending", "finished"], "spider": "*1"}, ["pending1", "finished1"]),
+        ({"since": naive(2025, 1, 1)}, ["running0", "running1", "running2", "finished0", "finished1", "finished2"]),
+        ({"since": naive(2025, 1, 1, 0, 0, 30)}, ["finished0", "finished1", "finished2"]),
+        ({"until": naive(2025, 1, 1, 0, 1), "spider": "spider0"}, ["running0", "running2"]),
+    ],
+)
+def test_iter_jobs_filters(client, kwargs, expected):
+    assert [f"{job.state}{int(job.id[len(job.state) :])}" for job in client.iter_jobs("p", **kwargs)] == expected
+
+
+def test_iter_jobs_error(mocker):
+    response = mocker.MagicMock()
+    response.iter_content.return_value = [b'{"status": "error", ', b'"message": "Boom."}']
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, return_value=response)
+
+    with pytest.raises(ErrorResponse, match="Boom."):
+        list(ScrapydClient().iter_jobs("p"))
+
+    response.__exit__.assert_called_once()
+
+
+def test_job_records(client):
+    assert client.job_records("myproject") == list(client.iter_jobs("myproject"))
+
+
+def test_job_status(client):
+    assert client.job_status("1", "myproject") == JobStatus("finished")
+
+
+def test_spider_listing(client):
+    assert client.spider_listing("myproject") == SpiderListing("myproject", ("spider0", "spider1"), "fake")
+
+
+def test_daemon_status(client):
+    assert client.daemon_status() == DaemonStatus("fake", 3, 3, 3)
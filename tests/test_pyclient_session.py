@@ -0,0 +1,167 @@
+import requests
+
+from scrapyd_client.cache import ResponseCache
+from scrapyd_client.pyclient import ScrapydClient, create_session
+from scrapyd_client.retry import RetryPolicy
+
+
+def test_session_is_reused(mocker, conf_default_target):
+    mock_response = mocker.Mock()
+    mock_response.json.return_value = {"status": "ok", "projects": ["foo"], "versions": []}
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, return_value=mock_response)
+
+    client = ScrapydClient(timeout=5)
+    client.projects()
+    client.versions("foo")
+
+    assert [call.args[0] for call in mock_get.call_args_list] == [client.session, client.session]
+    assert all(call.kwargs["timeout"] == 5 for call in mock_get.call_args_list)
+
+
+def test_close_owned_session(mocker, conf_default_target):
+    with ScrapydClient() as client:
+        mock_close = mocker.patch.object(client.session, "close")
+
+    mock_close.assert_called_once_with()
+
+
+def test_close_owned_session_pool_maxsize(mocker, conf_default_target):
+    with ScrapydClient(pool_maxsize=20) as client:
+        assert client.session.get_adapter("http://localhost:6800")._pool_maxsize == 20  # noqa: SLF001
+        mock_close = mocker.patch.object(client.session, "close")
+
+    mock_close.assert_called_once_with()
+
+
+def test_close_shared_session(mocker, conf_default_target):
+    session = create_session(pool_maxsize=20)
+    mock_close = mocker.patch.object(session, "close")
+
+    with ScrapydClient(session=session) as client:
+        assert client.session is session
+    with ScrapydClient(session=session) as client:
+        assert client.session is session
+
+    mock_close.assert_not_called()
+
+
+def test_create_session():
+    session = create_session(pool_maxsize=20, retries=3, backoff_factor=0.5)
+    adapter = session.get_adapter("http://localhost:6800")
+
+    assert adapter._pool_maxsize == 20  # noqa: SLF001
+    assert adapter.max_retries.total == 3
+    assert adapter.max_retries.backoff_factor == 0.5
+    assert "POST" not in adapter.max_retries.allowed_methods
+
+
+def test_schedule_many(mocker, conf_default_target):
+    def post(session, url, data, **kwargs):
+        data = dict(data)
+        response = mocker.Mock()
+        if data.get("fail"):
+            response.json.return_value = {"status": "error", "message": "Boom."}
+        else:
+            response.json.return_value = {"status": "ok", "jobid": f"{data['spider']}-{data.get('n')}"}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+    acquire = mocker.patch("scrapyd_client.throttle.TokenBucket.acquire", autospec=True)
+    jobs = [
+        {"project": "foo", "spider": "bar", "args": {"n": "1"}},
+        {"project": "foo", "spider": "bar", "args": [["n", "2"]]},
+        {"project": "foo", "spider": "bar", "args": {"fail": "1"}},
+        {"project": "foo"},
+    ]
+
+    results = list(ScrapydClient().schedule_many(iter(jobs), concurrency=2, rate=10))
+
+    assert [result.item for result in results] == jobs
+    assert [result.value for result in results] == ["bar-1", "bar-2", None, None]
+    assert str(results[2].error) == "Boom."
+    assert str(results[3].error) == "A job must have a project and a spider"
+    assert acquire.call_count == 3
+
+
+def test_response_cache(mocker, conf_default_target):
+    def get(session, url, params, **kwargs):
+        response = mocker.Mock()
+        response.json.return_value = {"status": "ok", "projects": ["foo"], "spiders": ["bar"], "versions": ["1"]}
+        return response
+
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True)
+    mock_post.return_value.json.return_value = {"status": "ok"}
+    client = ScrapydClient(cache=ResponseCache())
+
+    for _ in range(2):
+        assert client.projects() == ["foo"]
+        assert client.spiders("foo") == ["bar"]
+        assert client.versions("foo") == ["1"]
+    assert mock_get.call_count == 3
+
+    client.jobs("foo")
+    client.jobs("foo")
+    assert mock_get.call_count == 5
+
+    client.delversion("foo", "1")
+    assert client.projects() == ["foo"]
+    assert client.spiders("foo") == ["bar"]
+    assert mock_get.call_count == 7
+
+
+def test_addversion(mocker, conf_default_target, tmp_path):
+    egg = tmp_path / "project.egg"
+    egg.write_bytes(b"egg")
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True)
+    mock_post.return_value.json.return_value = {"status": "ok", "spiders": 3}
+    cache = ResponseCache()
+    cache.set("http://localhost:6800", "listprojects", {}, {"projects": []})
+
+    assert ScrapydClient(cache=cache).addversion("foo", "1", str(egg)) == {"status": "ok", "spiders": 3}
+
+    body = mock_post.call_args.kwargs["data"]
+    assert mock_post.call_args.args[1] == "http://localhost:6800/addversion.json"
+    assert mock_post.call_args.kwargs["headers"]["Content-Type"] == body.content_type
+    assert b"egg" in body.read(len(body))
+    assert len(cache) == 0
+
+
+def test_addversion_retry(mocker, conf_default_target, tmp_path):
+    egg = tmp_path / "project.egg"
+    egg.write_bytes(b"egg")
+    bodies = []
+
+    def post(session, url, data, **kwargs):
+        bodies.append(data.read(len(data)))
+        if len(bodies) == 1:
+            raise requests.ConnectTimeout
+        response = mocker.Mock()
+        response.json.return_value = {"status": "ok"}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+    progress = []
+    client = ScrapydClient(retry=RetryPolicy(backoff=0))
+
+    assert client.addversion("foo", "1", str(egg), callback=lambda *args: progress.append(args)) == {"status": "ok"}
+    assert len(bodies) == 2
+    assert b"egg" in bodies[1]
+    assert progress[-1] == (len(bodies[1]), len(bodies[1]))
+
+
+def test_schedule_many_max_pending(mocker, conf_default_target):
+    def post(session, url, data, **kwargs):
+        response = mocker.Mock()
+        response.json.return_value = {"status": "ok", "jobid": dict(data)["spider"]}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+    acquire = mocker.patch("scrapyd_client.throttle.Backpressure.acquire", autospec=True)
+    client = ScrapydClient()
+
+    results = list(client.schedule_many([{"project": "foo", "spider": "bar"}] * 3, max_pending=10))
+
+    assert [result.value for result in results] == ["bar"] * 3
+    assert acquire.call_count == 3
+    assert acquire.call_args.args[0].max_pending == 10
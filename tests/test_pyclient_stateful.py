@@ -1,4 +1,8 @@
+import pytest
+
+from scrapyd_client.exceptions import ErrorResponse, RunningJobs
 from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.records import Job
 
 
 def test_delproject(mocker, conf_default_target):
@@ -37,3 +41,72 @@ def test_cancel(mocker, conf_default_target):
 
     assert response["status"] == "ok"
     mock_post.assert_called_once_with("cancel", data={"project": "existing_project", "job": "jobid1"})
+
+
+def test_cancel_signal(mocker, conf_default_target):
+    client = ScrapydClient()
+
+    mock_post = mocker.patch.object(client, "_post", return_value={"status": "ok", "prevstate": "running"})
+
+    client.cancel("existing_project", "jobid1", "KILL")
+
+    mock_post.assert_called_once_with(
+        "cancel", data={"project": "existing_project", "job": "jobid1", "signal": "KILL"}
+    )
+
+
+def test_cancel_many(mocker, conf_default_target):
+    client = ScrapydClient()
+    jobs = [Job("existing_project", "spider", f"jobid{i}", "running") for i in range(3)]
+
+    def post(basename, data):
+        if data["job"] == "jobid1":
+            raise ErrorResponse("Boom.")
+        return {"status": "ok", "prevstate": "running"}
+
+    mock_post = mocker.patch.object(client, "_post", side_effect=post)
+
+    results = list(client.cancel_many(jobs, concurrency=2))
+
+    assert [result.item for result in results] == jobs
+    assert [result.value for result in results] == ["running", None, "running"]
+    assert [str(result.error) for result in results if result.error] == ["Boom."]
+    assert mock_post.call_count == 3
+
+
+def test_versions_to_prune(mocker, conf_default_target):
+    client = ScrapydClient()
+
+    mocker.patch.object(client, "versions", return_value=["1", "2", "3", "4", "5"])
+    mocker.patch.object(
+        client,
+        "jobs",
+        return_value={
+            "pending": [{"id": "a", "version": "1"}],
+            "running": [{"id": "b"}, {"id": "c"}],
+            "finished": [{"id": "d", "version": "2"}],
+        },
+    )
+
+    with pytest.raises(RunningJobs, match="2 running job"):
+        client.versions_to_prune("existing_project", 2)
+    assert client.versions_to_prune("existing_project", 2, force=True) == ["2", "3"]
+    assert client.versions_to_prune("existing_project", 10, force=True) == []
+
+
+def test_versions_to_prune_keep(conf_default_target):
+    with pytest.raises(ValueError, match="keep must be at least 1"):
+        ScrapydClient().versions_to_prune("existing_project", 0)
+
+
+def test_prune_versions(mocker, conf_default_target):
+    client = ScrapydClient()
+
+    mocker.patch.object(client, "versions", return_value=["1", "2", "3"])
+    mocker.patch.object(client, "jobs", return_value={"pending": [], "running": [], "finished": []})
+    mock_post = mocker.patch.object(client, "_post", return_value={"status": "ok"})
+
+    results = list(client.prune_versions("existing_project", 1, concurrency=2))
+
+    assert [result.item for result in results] == ["1", "2"]
+    assert mock_post.call_count == 2
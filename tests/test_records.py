@@ -0,0 +1,97 @@
+import gc
+import json
+import operator
+import tracemalloc
+from datetime import datetime
+
+from scrapyd_client.records import DaemonStatus, Job, JobStatus, SpiderListing
+
+FINISHED = {
+    "project": "myproject",
+    "spider": "myspider",
+    "id": "6487ec79947edab326d6db28a2d86511e8247444",
+    "pid": 12345,
+    "start_time": "2025-01-01 00:00:00",
+    "end_time": "2025-01-01 00:01:00.123456",
+    "log_url": "/logs/myproject/myspider/6487ec79947edab326d6db28a2d86511e8247444.log",
+    "items_url": "/items/myproject/myspider/6487ec79947edab326d6db28a2d86511e8247444.jl",
+}
+
+
+def test_job():
+    job = Job.from_dict(json.loads(json.dumps(FINISHED)), "myproject", "finished")
+
+    assert job.to_dict() == {
+        **FINISHED,
+        "state": "finished",
+        "start_time": datetime(2025, 1, 1),  # noqa: DTZ001
+        "end_time": datetime(2025, 1, 1, 0, 1, 0, 123456),  # noqa: DTZ001
+    }
+    assert job._log_url is job._items_url  # noqa: SLF001 # derived
+    assert not hasattr(job, "__dict__")
+    assert repr(job).startswith("Job(project='myproject', spider='myspider', id='6487ec79")
+    assert len({job, Job.from_dict(FINISHED, "myproject", "finished")}) == 1
+
+
+def test_job_interned():
+    jobs = [Job.from_dict(json.loads(json.dumps(FINISHED)), "myproject", "finished") for _ in range(2)]
+
+    assert jobs[0].spider is jobs[1].spider
+    assert jobs[0].project is jobs[1].project
+
+
+def test_job_custom_urls():
+    job = Job("p", "s", "1", "finished", log_url="/custom/1.log")
+
+    assert job.log_url == "/custom/1.log"
+    assert job.items_url is None
+
+
+def test_job_sort():
+    jobs = [Job("p", "s", str(i), "finished", start_time=datetime(2025, 1, 3 - i)) for i in range(3)]  # noqa: DTZ001
+
+    assert [job.id for job in sorted(jobs, key=operator.attrgetter("start_time"))] == ["2", "1", "0"]
+
+
+def test_job_memory():
+    data = json.dumps(FINISHED)
+    body = "[" + ",".join(data.replace(FINISHED["id"], f"{i:040x}") for i in range(10000)) + "]"
+
+    def measure(func):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            value = func()
+            gc.collect()
+            return value, tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+    def records():
+        return [Job.from_dict(data, "myproject", "finished") for data in json.loads(body)]
+
+    _, dicts_size = measure(lambda: json.loads(body))
+    _, records_size = measure(records)
+    assert records_size * 2 < dicts_size
+
+
+def test_job_status():
+    assert JobStatus.from_dict({"status": "ok", "currstate": "running", "start_time": "2025-01-01 00:00:00"}) == (
+        "running",
+        datetime(2025, 1, 1),  # noqa: DTZ001
+        None,
+    )
+    assert JobStatus.from_dict({"status": "ok", "currstate": "unknown"}) == ("unknown", None, None)
+
+
+def test_spider_listing():
+    assert SpiderListing.from_dict({"status": "ok", "spiders": ["a", "b"], "node_name": "n"}, "p") == (
+        "p",
+        ("a", "b"),
+        "n",
+    )
+
+
+def test_daemon_status():
+    data = {"status": "ok", "node_name": "n", "pending": 1, "running": 2, "finished": 3}
+    assert DaemonStatus.from_dict(data) == ("n", 1, 2, 3)
@@ -0,0 +1,192 @@
+import pytest
+import requests
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from scrapyd_client.cluster import ScrapydCluster
+from scrapyd_client.exceptions import CircuitOpen, ErrorResponse, ServerUnavailable
+from scrapyd_client.pyclient import ScrapydClient
+from scrapyd_client.retry import CircuitBreaker, RetryPolicy, was_sent
+
+REFUSED = requests.ConnectionError(MaxRetryError(None, "/", NewConnectionError(None, "Connection refused")))
+DROPPED = requests.ConnectionError("Connection aborted.")
+
+
+@pytest.fixture
+def clock(mocker):
+    clock = mocker.patch("scrapyd_client.retry.time.monotonic", return_value=100.0)
+    mocker.patch("scrapyd_client.pyclient.time.sleep")
+    return clock
+
+
+def response(mocker, status=200, **data):
+    response = mocker.Mock(status_code=status, reason="Service Unavailable", url="http://localhost:6800/x.json")
+    response.json.return_value = {"status": "ok", **data}
+    return response
+
+
+def test_delay(mocker):
+    uniform = mocker.patch("scrapyd_client.retry.random.uniform", side_effect=lambda _, b: b)
+    policy = RetryPolicy(backoff=0.5, max_backoff=3)
+
+    assert [policy.delay(attempt) for attempt in range(4)] == [0.5, 1, 2, 3]
+    assert uniform.call_args_list[0].args == (0, 0.5)
+
+
+@pytest.mark.parametrize(
+    ("error", "attempt", "idempotent", "expected"),
+    [
+        (DROPPED, 0, True, True),
+        (DROPPED, 0, False, False),
+        (REFUSED, 0, False, True),
+        (requests.ConnectTimeout(), 0, False, True),
+        (requests.ReadTimeout(), 1, True, True),
+        (requests.ReadTimeout(), 2, True, False),
+        (ServerUnavailable(), 0, True, True),
+        (ErrorResponse(), 0, True, False),
+    ],
+)
+def test_should_retry(error, attempt, idempotent, expected):
+    assert RetryPolicy(attempts=3).should_retry(error, attempt, idempotent=idempotent) is expected
+
+
+def test_was_sent():
+    assert was_sent(DROPPED)
+    assert not was_sent(REFUSED)
+
+
+def test_circuit_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+
+    breaker.record(DROPPED)
+    breaker.record(ErrorResponse())  # the node responded
+    breaker.record(DROPPED)
+    breaker.before_request()
+    assert breaker.state == "closed"
+
+    breaker.record(DROPPED)
+    assert breaker.state == "open"
+    assert not breaker.available
+    with pytest.raises(CircuitOpen, match="2 consecutive failures, retrying in 10.0s"):
+        breaker.before_request()
+
+    clock.return_value = 110.0
+    assert breaker.state == "half-open"
+    breaker.before_request()
+    assert breaker.state == "open"  # while the trial request is in flight
+    with pytest.raises(CircuitOpen):
+        breaker.before_request()
+
+    breaker.record(DROPPED)
+    assert breaker.state == "open"
+
+    clock.return_value = 120.0
+    breaker.before_request()
+    breaker.record(None)
+    assert breaker.state == "closed"
+    assert breaker.failures == 0
+
+
+def test_client_retries_get(mocker, clock, conf_default_target):
+    responses = [DROPPED, response(mocker, 503), response(mocker, projects=["foo"])]
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=responses)
+
+    assert ScrapydClient(retry=RetryPolicy(attempts=3)).projects() == ["foo"]
+    assert mock_get.call_count == 3
+
+
+def test_client_retries_exhausted(mocker, clock, conf_default_target):
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, return_value=response(mocker, 503))
+
+    with pytest.raises(ServerUnavailable, match="503 Service Unavailable"):
+        ScrapydClient(retry=RetryPolicy(attempts=2)).projects()
+
+
+def test_client_does_not_retry_sent_post(mocker, clock, conf_default_target):
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=DROPPED)
+
+    with pytest.raises(requests.ConnectionError):
+        ScrapydClient(retry=RetryPolicy()).delproject("foo")
+    assert mock_post.call_count == 1
+
+
+@pytest.mark.parametrize(("currstate", "posts"), [("pending", 1), ("unknown", 2)])
+def test_schedule_dedup(mocker, clock, conf_default_target, currstate, posts):
+    mock_post = mocker.patch(
+        "scrapyd_client.pyclient.requests.Session.post",
+        autospec=True,
+        side_effect=[requests.ReadTimeout(), response(mocker, jobid="generated")],
+    )
+    mock_get = mocker.patch(
+        "scrapyd_client.pyclient.requests.Session.get",
+        autospec=True,
+        return_value=response(mocker, currstate=currstate),
+    )
+    mocker.patch("scrapyd_client.pyclient.uuid.uuid4", return_value=mocker.Mock(hex="generated"))
+
+    assert ScrapydClient(retry=RetryPolicy()).schedule("foo", "bar", [("a", "1")]) == "generated"
+    assert mock_post.call_count == posts
+    assert mock_post.call_args.kwargs["data"] == [
+        ("a", "1"),
+        ("project", "foo"),
+        ("spider", "bar"),
+        ("jobid", "generated"),
+    ]
+    assert mock_get.call_args.kwargs["params"] == {"job": "generated", "project": "foo"}
+
+
+def test_schedule_jobid(mocker, clock, conf_default_target):
+    mock_post = mocker.patch(
+        "scrapyd_client.pyclient.requests.Session.post", autospec=True, return_value=response(mocker, jobid="mine")
+    )
+
+    assert ScrapydClient(retry=RetryPolicy()).schedule("foo", "bar", [("jobid", "mine")]) == "mine"
+    assert mock_post.call_args.kwargs["data"] == [("jobid", "mine"), ("project", "foo"), ("spider", "bar")]
+
+
+def test_client_circuit_breaker(mocker, clock, conf_default_target):
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=REFUSED)
+    client = ScrapydClient(circuit_breaker=CircuitBreaker(failure_threshold=2))
+
+    for _ in range(2):
+        with pytest.raises(requests.ConnectionError):
+            client.projects()
+    with pytest.raises(CircuitOpen):
+        client.projects()
+    assert mock_get.call_count == 2
+
+
+def test_cluster_routes_around_open_circuit(mocker, clock):
+    cluster = ScrapydCluster.from_targets(
+        {"a": {"url": "http://a:6800"}, "b": {"url": "http://b:6800"}}, circuit_breaker=CircuitBreaker
+    )
+    cluster._nodes = {"a": {"load": 0, "projects": {"foo"}}, "b": {"load": 10, "projects": {"foo"}}}  # noqa: SLF001
+    cluster._refreshed = 100.0  # noqa: SLF001
+    for _ in range(5):
+        cluster.clients["a"].circuit_breaker.record(DROPPED)
+    mocker.patch.object(cluster.clients["b"], "schedule", return_value="jobid")
+
+    assert cluster.schedule("foo", "bar") == ("b", "jobid")
+
+
+def test_cli_unavailable_target(mocker, script_runner, conf_named_targets):
+    def get(session, url, **kwargs):
+        if url.endswith("/daemonstatus.json"):
+            return response(mocker, pending=0, running=0)
+        if url.endswith("/listprojects.json"):
+            return response(mocker, projects=["foo"])
+        return response(mocker, spiders=["bar"])
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, return_value=response(mocker, 503))
+
+    result = script_runner.run(["scrapyd-client", "schedule", "--targets", "target1", "-p", "foo", "bar"])
+
+    assert result.returncode == 1
+    assert result.stdout.startswith("Target is unavailable (target1):\n503 Service Unavailable")
+
+
+def test_cli_negative_retries(script_runner, conf_default_target):
+    result = script_runner.run(["scrapyd-client", "projects", "--retries", "-1"])
+
+    assert result.returncode == 2
+    assert result.stderr.endswith("error: argument --retries: must be at least 0\n")
@@ -1,5 +1,8 @@
+import json
 from itertools import chain
 
+from tests import assert_lines
+
 
 def test_schedule(mocker, script_runner, conf_default_target):
     get_responses = [
@@ -13,12 +16,12 @@ def test_schedule(mocker, script_runner, conf_default_target):
 
     mock_get_response = mocker.Mock()
     mock_get_response.json.side_effect = get_responses
-    mock_get = mocker.patch("scrapyd_client.pyclient.requests.get", autospec=True)
+    mock_get = mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True)
     mock_get.return_value = mock_get_response
 
     mock_post_response = mocker.Mock()
     mock_post_response.json.side_effect = post_responses
-    mock_post = mocker.patch("scrapyd_client.pyclient.requests.post", autospec=True)
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True)
     mock_post.return_value = mock_post_response
 
     result = script_runner.run(
@@ -28,3 +31,144 @@ def test_schedule(mocker, script_runner, conf_default_target):
     assert result.success, result.stdout + "\n" + result.stderr
     assert not result.stderr, result.stderr
     assert result.stdout == "foo / bar => 42\n"
+
+
+def test_schedule_concurrency(mocker, script_runner, conf_default_target):
+    def get(session, url, params, **kwargs):
+        response = mocker.Mock()
+        if url.endswith("/listprojects.json"):
+            response.json.return_value = {"status": "ok", "projects": ["baz", "foo", "bar"]}
+        elif params["project"] == "baz":
+            response.json.return_value = {"status": "error", "message": "Not found."}
+        else:
+            response.json.return_value = {"status": "ok", "spiders": [f"{params['project']}_{i}" for i in range(3)]}
+        return response
+
+    def post(session, url, data, **kwargs):
+        data = dict(data)
+        response = mocker.Mock()
+        if data["spider"] == "bar_1":
+            response.json.return_value = {"status": "error", "message": "Boom."}
+        else:
+            response.json.return_value = {"status": "ok", "jobid": data["spider"].upper()}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+
+    result = script_runner.run(["scrapyd-client", "schedule", "-p", "*", "--concurrency", "4", "*"])
+
+    assert not result.success
+    assert not result.stderr, result.stderr
+    assert_lines(
+        result.stdout,
+        [
+            "baz => failed to list spiders: Not found.",
+            "foo / foo_0 => FOO_0",
+            "foo / foo_1 => FOO_1",
+            "foo / foo_2 => FOO_2",
+            "bar / bar_0 => BAR_0",
+            "bar / bar_1 => failed: Boom.",
+            "bar / bar_2 => BAR_2",
+            r"Scheduled 5 job\(s\), 2 failure\(s\); latency min \d+\.\d{3}s, mean \d+\.\d{3}s, max \d+\.\d{3}s",
+        ],
+    )
+
+
+def test_schedule_from_file(mocker, script_runner, conf_default_target, tmp_path):
+    def post(session, url, data, **kwargs):
+        data = dict(data)
+        response = mocker.Mock()
+        if data["spider"] == "fail":
+            response.json.return_value = {"status": "error", "message": "Boom."}
+        else:
+            response.json.return_value = {"status": "ok", "jobid": f"{data['project']}-{data['page']}"}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text(
+        '{"spider": "bar", "args": {"page": "1"}}\n'
+        "\n"
+        '{"project": "baz", "spider": "bar", "args": {"page": "2"}}\n'
+        '{"spider": "fail"}\n'
+    )
+    output = tmp_path / "output.jsonl"
+
+    result = script_runner.run(
+        [
+            "scrapyd-client",
+            "schedule",
+            "-p",
+            "foo",
+            "--from-file",
+            str(manifest),
+            "--output",
+            str(output),
+            "--concurrency",
+            "2",
+        ]
+    )
+
+    assert not result.success
+    assert not result.stdout
+    assert result.stderr == "Scheduled 2 job(s), 1 failure(s)\n"
+    assert [json.loads(line) for line in output.read_text().splitlines()] == [
+        {"project": "foo", "spider": "bar", "args": {"page": "1"}, "jobid": "foo-1"},
+        {"project": "baz", "spider": "bar", "args": {"page": "2"}, "jobid": "baz-2"},
+        {"project": "foo", "spider": "fail", "args": [], "error": "Boom."},
+    ]
+
+
+def test_schedule_from_file_invalid(mocker, script_runner, conf_default_target, tmp_path):
+    response = mocker.Mock()
+    response.json.return_value = {"status": "ok", "jobid": "1"}
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, return_value=response)
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text('{"spider": "bar"}\n{"spider":\n[1, 2]\n')
+
+    result = script_runner.run(["scrapyd-client", "schedule", "-p", "foo", "--from-file", str(manifest)])
+
+    assert result.returncode == 1
+    assert result.stderr == "Scheduled 1 job(s), 2 failure(s)\n"
+    assert [json.loads(line) for line in result.stdout.splitlines()] == [
+        {"project": "foo", "spider": "bar", "args": [], "jobid": "1"},
+        {"line": 2, "error": "Invalid JSON: Expecting value at column 12"},
+        {"line": 3, "error": "A job must be a JSON object"},
+    ]
+
+
+def test_schedule_missing_spider(script_runner, conf_default_target):
+    result = script_runner.run(["scrapyd-client", "schedule", "-p", "foo"])
+
+    assert not result.success
+    assert result.stderr.endswith("error: the following arguments are required: SPIDER\n")
+
+
+def test_schedule_max_pending(mocker, script_runner, conf_default_target):
+    pending = iter([0, 1, 0, 0])
+
+    def get(session, url, params, **kwargs):
+        response = mocker.Mock()
+        if url.endswith("/listprojects.json"):
+            response.json.return_value = {"status": "ok", "projects": ["foo"]}
+        elif url.endswith("/daemonstatus.json"):
+            response.json.return_value = {"status": "ok", "pending": next(pending), "running": 0, "finished": 0}
+        else:
+            response.json.return_value = {"status": "ok", "spiders": ["a", "b", "c"]}
+        return response
+
+    def post(session, url, data, **kwargs):
+        response = mocker.Mock()
+        response.json.return_value = {"status": "ok", "jobid": dict(data)["spider"].upper()}
+        return response
+
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, side_effect=get)
+    mocker.patch("scrapyd_client.pyclient.requests.Session.post", autospec=True, side_effect=post)
+    sleep = mocker.patch("scrapyd_client.throttle.time.sleep")
+
+    result = script_runner.run(["scrapyd-client", "schedule", "-p", "foo", "--max-pending", "1", "*"])
+
+    assert result.success, result.stdout + "\n" + result.stderr
+    assert result.stdout == "foo / a => A\nfoo / b => B\nfoo / c => C\n"
+    assert sleep.call_count == 1  # a is still pending, before scheduling b
@@ -1,10 +1,13 @@
 import json
+import os
+import zipfile
 from textwrap import dedent
 from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
 
+from scrapyd_client import deploy
 from tests import assert_lines
 
 
@@ -25,8 +28,10 @@ def test_too_many_arguments(script_runner, project):
         ret.stderr,
         dedent(
             """\
-            usage: scrapyd-deploy [-h] [-p PROJECT] [-v VERSION] [-a] [-d] [--egg FILE]
-                                  [--build-egg FILE] [--include-dependencies]
+            usage: scrapyd-deploy [-h] [-p PROJECT] [-v VERSION] [-a] [--concurrency N]
+                                  [-d] [--egg FILE] [--build-egg FILE]
+                                  [--include-dependencies] [--builder {setuptools,native}]
+                                  [--no-cache] [--prune-cache] [--incremental]
                                   [TARGET]
             scrapyd-deploy: error: unrecognized arguments: extra
             """
@@ -99,6 +104,93 @@ def test_build_egg(script_runner, project):
     assert ret.success
 
 
+def test_build_egg_native(script_runner, project):
+    ret = script_runner.run(["scrapyd-deploy", "--builder", "native", "--build-egg", "myegg.egg"])
+
+    assert ret.stdout == ""
+    assert_lines(ret.stderr, "Writing egg to myegg.egg")
+    assert ret.success
+    assert not os.path.exists("setup.py")
+    with zipfile.ZipFile("myegg.egg") as egg:
+        assert "scrapyproj/settings.py" in egg.namelist()
+        assert egg.read("EGG-INFO/entry_points.txt") == b"[scrapy]\nsettings = scrapyproj.settings\n"
+
+
+def test_build_egg_native_inc_dependencies(script_runner, project_with_dependencies):
+    ret = script_runner.run(
+        ["scrapyd-deploy", "--builder", "native", "--include-dependencies", "--build-egg", "x.egg"]
+    )
+
+    assert ret.stdout == ""
+    assert_lines(
+        ret.stderr,
+        [
+            "Including dependencies from requirements.txt",
+            "Error: --include-dependencies requires the setuptools builder",
+        ],
+    )
+    assert not ret.success
+
+
+def test_build_egg_cache(script_runner, project):
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "first.egg"])
+
+    assert_lines(ret.stderr, "Writing egg to first.egg")
+    assert ret.success
+
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "second.egg"])
+
+    assert_lines(ret.stderr, [r"Using cached egg: .+\.egg", "Writing egg to second.egg"])
+    assert ret.success
+    with open("first.egg", "rb") as first, open("second.egg", "rb") as second:
+        assert first.read() == second.read()
+
+    with open(os.path.join("scrapyproj", "spiders", "myspider.py"), "w") as f:
+        f.write("")
+
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "third.egg"])
+
+    assert_lines(ret.stderr, "Writing egg to third.egg")
+    assert ret.success
+
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "fourth.egg", "--no-cache"])
+
+    assert_lines(ret.stderr, "Writing egg to fourth.egg")
+    assert ret.success
+
+
+def test_build_egg_cache_custom_setup(script_runner, project):
+    with open("setup.py", "w") as f:
+        f.write(
+            "from setuptools import setup, find_packages\n"
+            "setup(name='project', version='1.0', packages=find_packages(), data_files=[('data', ['data.json'])],"
+            " entry_points={'scrapy': ['settings = scrapyproj.settings']})\n"
+        )
+    with open("data.json", "w") as f:
+        f.write("{}")
+
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "first.egg"])
+
+    assert ret.success, ret.stderr
+    assert_lines(ret.stderr, "Writing egg to first.egg")
+
+    with open("data.json", "w") as f:
+        f.write("[]")
+
+    ret = script_runner.run(["scrapyd-deploy", "--build-egg", "second.egg"])
+
+    assert ret.success, ret.stderr
+    assert_lines(ret.stderr, "Writing egg to second.egg")
+
+
+def test_prune_cache(script_runner):
+    ret = script_runner.run(["scrapyd-deploy", "--prune-cache"])
+
+    assert ret.stdout == ""
+    assert_lines(ret.stderr, "Removed 0 cache entries")
+    assert ret.success
+
+
 def test_build_egg_inc_dependencies_no_dep(script_runner, project):
     ret = script_runner.run(["scrapyd-deploy", "--include-dependencies", "--build-egg", "myegg-deps.egg"])
 
@@ -132,9 +224,8 @@ def test_build_egg_inc_dependencies_with_dep(script_runner, project_with_depende
 
 
 def test_deploy_success(script_runner, conf_default_target):
-    with patch("scrapyd_client.deploy.requests.post") as mocked:
-        mocked.return_value.status_code = 200
-        mocked.return_value.text = '{"status": "ok"}'
+    with patch("scrapyd_client.pyclient.requests.Session.post") as mocked:
+        mocked.return_value.json.return_value = {"status": "ok"}
 
         ret = script_runner.run(["scrapyd-deploy"])
 
@@ -144,31 +235,30 @@ def test_deploy_success(script_runner, conf_default_target):
             [
                 r"Packing version \d+",
                 r'Deploying to project "scrapydproject" in http://localhost:6800/addversion\.json',
-                r"Server response \(200\):",
+                r"Server response:",
             ],
         )
         assert ret.success
+        assert mocked.call_args.kwargs["data"].len > 0
 
 
 @pytest.mark.parametrize(
     ("content", "expected"),
     [
         ("content", "content"),
-        (["content"], '[\n   "content"\n]'),
         (
             {"status": "error", "message": "content"},
             "Status: error\nMessage:\ncontent",
         ),
     ],
 )
-def test_deploy_httperror(content, expected, script_runner, conf_default_target):
-    with patch("scrapyd_client.deploy.requests.post") as mocked:
-        response = MagicMock(status_code=404, text=content)
-        if isinstance(content, (dict, list)):
-            response.json.side_effect = lambda: content
+def test_deploy_error(content, expected, script_runner, conf_default_target):
+    with patch("scrapyd_client.pyclient.requests.Session.post") as mocked:
+        mocked.return_value.text = content
+        if isinstance(content, dict):
+            mocked.return_value.json.return_value = content
         else:
-            response.json.side_effect = json.decoder.JSONDecodeError("", "", 0)
-        mocked.side_effect = requests.HTTPError(response=response)
+            mocked.return_value.json.side_effect = json.decoder.JSONDecodeError("", "", 0)
 
         ret = script_runner.run(["scrapyd-deploy"])
 
@@ -179,13 +269,13 @@ def test_deploy_httperror(content, expected, script_runner, conf_default_target)
             [
                 r"Packing version \d+",
                 r'Deploying to project "scrapydproject" in http://localhost:6800/addversion\.json',
-                r"Deploy failed \(404\):",
+                r"Deploy failed:",
             ],
         )
 
 
 def test_deploy_urlerror(script_runner, conf_default_target):
-    with patch("scrapyd_client.deploy.requests.post") as mocked:
+    with patch("scrapyd_client.pyclient.requests.Session.post") as mocked:
         mocked.side_effect = requests.RequestException("content")
 
         ret = script_runner.run(["scrapyd-deploy"])
@@ -200,3 +290,113 @@ def test_deploy_urlerror(script_runner, conf_default_target):
                 r"Deploy failed: content",
             ],
         )
+
+
+def test_deploy_all_targets(mocker, script_runner, conf_named_targets):
+    def post(url, data, **kwargs):
+        while data.read():
+            pass
+        response = MagicMock()
+        if url.startswith("http://localhost:6802/"):
+            response.json.return_value = {"status": "error", "message": "content"}
+        else:
+            response.json.return_value = {"status": "ok"}
+        return response
+
+    mock_build_egg = mocker.spy(deploy, "_build_egg")
+    with patch("scrapyd_client.pyclient.requests.Session.post", side_effect=post):
+        ret = script_runner.run(["scrapyd-deploy", "-a", "--concurrency", "2", "--version", "1.0"])
+
+    assert ret.returncode == 1
+    mock_build_egg.assert_called_once()
+    assert_lines(
+        ret.stdout,
+        [
+            r"target2              failed +\d+\.\d\ds  content",
+            r'target1              ok +[\d.]+s  [\d.]+ [KMG]?B/s, project "scrapydproject": {"status": "ok"}',
+        ],
+    )
+    assert_lines(ret.stderr, ["Packing version 1.0", "Deploying to 2 targets"])
+
+
+def test_deploy_incremental(mocker, script_runner, conf_default_target):
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post")
+    mock_post.return_value.json.return_value = {"status": "ok"}
+    mock_get = mocker.patch("scrapyd_client.deploy.requests.get")
+    mock_get.return_value.json.return_value = {"versions": ["1"]}
+
+    ret = script_runner.run(["scrapyd-deploy", "--incremental", "--builder", "native", "-v", "1"])
+
+    assert ret.success, ret.stderr
+    assert ret.stderr.startswith("Deploying: no previous deployment with --incremental\nPacking version 1\n")
+    assert mock_post.call_count == 1
+
+    ret = script_runner.run(["scrapyd-deploy", "--incremental", "--builder", "native", "-v", "2"])
+
+    assert ret.success, ret.stderr
+    assert ret.stdout == ""
+    assert ret.stderr == "Skipping upload: no changes since version 1, the latest version on the target\n"
+    assert mock_post.call_count == 1
+    assert mock_get.call_args.kwargs["params"] == {"project": "scrapydproject"}
+
+    with open(os.path.join("scrapyproj", "spiders", "example.py"), "w") as f:
+        f.write("")
+
+    ret = script_runner.run(["scrapyd-deploy", "--incremental", "--builder", "native", "-v", "3"])
+
+    assert ret.success, ret.stderr
+    assert ret.stderr.startswith(
+        "Deploying: 1 file(s) changed since version 1\n  added     scrapyproj/spiders/example.py\nPacking version 3\n"
+    )
+    assert mock_post.call_count == 2
+
+    # Version 3 was deleted from the target.
+    ret = script_runner.run(["scrapyd-deploy", "--incremental", "--builder", "native", "-v", "4"])
+
+    assert ret.success, ret.stderr
+    assert ret.stderr.startswith("Deploying: version 3 isn't the latest version on the target\nPacking version 4\n")
+    assert mock_post.call_count == 3
+
+
+def test_deploy_all_targets_none(mocker, script_runner, conf_empty_section_implicit_target):
+    mock_build_egg = mocker.patch("scrapyd_client.deploy._build_egg")
+
+    ret = script_runner.run(["scrapyd-deploy", "-a"])
+
+    assert ret.returncode == 1
+    assert ret.stderr == "Error: No targets are configured\n"
+    mock_build_egg.assert_not_called()
+
+
+def test_deploy_all_targets_incremental(mocker, script_runner, conf_named_targets):
+    mock_post = mocker.patch("scrapyd_client.pyclient.requests.Session.post")
+    mock_post.return_value.json.return_value = {"status": "ok"}
+    mock_get = mocker.patch("scrapyd_client.deploy.requests.get")
+    mock_get.return_value.json.return_value = {"versions": ["1"]}
+    args = ["scrapyd-deploy", "-a", "--incremental", "--builder", "native", "-v", "1"]
+
+    ret = script_runner.run(args)
+
+    assert ret.success, ret.stderr
+    assert mock_post.call_count == 2
+
+    mock_build_egg = mocker.spy(deploy, "_build_egg")
+    ret = script_runner.run(args)
+
+    assert ret.success, ret.stderr
+    assert_lines(
+        ret.stdout,
+        [
+            r"target2              unchanged +\d+\.\d\ds  version 1",
+            r"target1              unchanged +\d+\.\d\ds  version 1",
+        ],
+    )
+    assert mock_post.call_count == 2
+    mock_build_egg.assert_not_called()
+
+
+def test_deploy_incremental_egg(script_runner, conf_default_target):
+    ret = script_runner.run(["scrapyd-deploy", "--incremental", "--egg", "project.egg"])
+
+    assert not ret.success
+    assert "argument --incremental: not allowed with argument --egg or --build-egg" in ret.stderr
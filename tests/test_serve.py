@@ -0,0 +1,148 @@
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+import scrapyd_client.__main__
+from benchmarks.server import FakeScrapyd
+from scrapyd_client.__main__ import _execute
+from scrapyd_client.pyclient import create_session
+from scrapyd_client.server import CommandServer, ThreadLocalStream, _environment, _expanded_variables
+from scrapyd_client.shim import main as shim
+from tests.conftest import _write_conf_file
+
+
+@pytest.fixture
+def socket_path(tmp_path_factory):
+    # Unix socket paths are limited to about 100 characters.
+    return str(tmp_path_factory.mktemp("s") / "s.sock")
+
+
+@pytest.fixture
+def server(capsys, monkeypatch, project, socket_path):
+    with FakeScrapyd(projects=2, spiders=2) as fake, create_session() as session:
+        _write_conf_file(f"[deploy]\nurl = {fake.url}\n")
+        server = CommandServer(socket_path, _execute, session)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.start()
+        monkeypatch.setenv("SCRAPYD_CLIENT_SOCKET", socket_path)
+        capsys.readouterr()  # the output of the project fixture
+        yield server
+        server.shutdown()
+        thread.join()
+        server.server_close()
+
+
+@pytest.fixture
+def main(mocker):
+    return mocker.patch("scrapyd_client.__main__.main")
+
+
+def run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["scrapyd-client", *argv])
+    try:
+        shim()
+    except SystemExit as e:
+        return e.code
+    return None  # main() is mocked
+
+
+def test_serve(capsys, monkeypatch, main, server):
+    assert run(monkeypatch, "projects") == 0
+    assert run(monkeypatch, "spiders", "-p", "project1", "-v") == 0
+    assert run(monkeypatch, "spiders", "-t", "nonexistent", "-p", "project1") == 3
+
+    captured = capsys.readouterr()
+    assert captured.out.startswith(
+        "project0\nproject1\nproject1 spider0\nproject1 spider1\nCaught unhandled exception, please report at"
+    )
+    assert "KeyError: 'nonexistent'" in captured.err
+    assert not main.called
+
+
+def test_serve_paths(capsys, monkeypatch, main, server, tmp_path):
+    os.mkdir("sub")
+    with open(os.path.join("sub", "jobs.jl"), "w") as f:
+        f.write('{"project": "project0", "spider": "spider0"}\n')
+
+    # The project fixture restores the working directory.
+    os.chdir("sub")
+    assert run(monkeypatch, "schedule", "--from-file", "jobs.jl", "--output", "out.jl") == 0
+
+    with open("out.jl") as f:
+        assert json.loads(f.read())["spider"] == "spider0"
+    assert capsys.readouterr().err == "Scheduled 1 job(s), 0 failure(s)\n"
+
+
+def test_serve_stdin(capsys, monkeypatch, main, server):
+    assert run(monkeypatch, "schedule", "--from-file", "-") == 2
+    assert capsys.readouterr().err == "Error: scrapyd-client serve can't read standard input, use --from-file FILE\n"
+
+
+def test_serve_already_serving(server, socket_path):
+    with pytest.raises(OSError, match="A server is already listening on"):
+        CommandServer(socket_path, _execute)
+
+
+def test_shim_other_project(monkeypatch, main, server, tmp_path):
+    os.chdir(tmp_path)
+    assert run(monkeypatch, "projects") is None
+    main.assert_called_once()
+
+
+def test_shim_other_environment(monkeypatch, main, server):
+    monkeypatch.setenv("NO_PROXY", "other.example.com")
+
+    assert run(monkeypatch, "projects") is None
+    main.assert_called_once()
+
+
+def test_environment(project):
+    _write_conf_file("[deploy]\nurl = http://${HOST}:$PORT/\n")
+
+    assert _environment({"HOST": "a", "PORT": "1", "OTHER": "x", "https_proxy": "p"}, _expanded_variables()) == {
+        "HOST": "a",
+        "PORT": "1",
+        "https_proxy": "p",
+    }
+
+
+@pytest.mark.parametrize(("concurrency", "shared"), [("10", True), ("11", False)])
+def test_serve_concurrency(mocker, monkeypatch, main, server, concurrency, shared):
+    get_client = mocker.spy(scrapyd_client.__main__, "_get_client")
+
+    assert run(monkeypatch, "schedule", "-p", "project0", "*", "--concurrency", concurrency) == 0
+
+    assert (getattr(get_client.call_args.args[0], "session", None) is server.session) is shared
+
+
+@pytest.mark.parametrize("argv", [["projects"], ["deploy"], []])
+def test_shim_local(monkeypatch, main, socket_path, argv):
+    monkeypatch.setattr(sys, "argv", ["scrapyd-client", *argv])
+    monkeypatch.setenv("SCRAPYD_CLIENT_SOCKET", socket_path)  # no server is listening
+
+    shim()
+
+    main.assert_called_once()
+
+
+def test_thread_local_stream(capsys):
+    stream = ThreadLocalStream(sys.stdout)
+    outputs = {}
+
+    def write(name):
+        outputs[name] = []
+        stream.redirect(type("Output", (), {"write": outputs[name].append})())
+        stream.write(name)
+
+    threads = [threading.Thread(target=write, args=(name,)) for name in ("a", "b")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stream.write("main")
+
+    assert outputs == {"a": ["a"], "b": ["b"]}
+    assert capsys.readouterr().out == "main"
@@ -0,0 +1,36 @@
+import re
+import subprocess
+import sys
+
+# The cumulative time to import the command-line interface. It was about 0.5s, when it imported Scrapy and requests.
+BUDGET_US = 200_000
+HEAVY_MODULES = ("scrapy", "twisted", "requests", "urllib3")
+
+
+def import_cli(module="scrapyd_client.__main__", heavy_modules=HEAVY_MODULES):
+    code = f"import sys, {module}; print([m for m in {heavy_modules!r} if m in sys.modules])"
+    return subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_no_heavy_imports():
+    assert import_cli().stdout == "[]\n"
+
+
+def test_shim_imports():
+    # The shim sends commands to scrapyd-client serve, without importing the command-line interface.
+    assert (
+        import_cli("scrapyd_client.shim", (*HEAVY_MODULES, "scrapyd_client.__main__", "scrapyd_client.utils")).stdout
+        == "[]\n"
+    )
+
+
+def test_import_time():
+    # The best of 3 runs, to not fail on a busy machine.
+    times = []
+    for _ in range(3):
+        match = re.search(
+            r"^import time:\s+\d+ \|\s+(\d+) \| scrapyd_client\.__main__$", import_cli().stderr, re.MULTILINE
+        )
+        times.append(int(match.group(1)))
+
+    assert min(times) < BUDGET_US, f"importing scrapyd_client.__main__ took {min(times)}us"
@@ -19,7 +19,9 @@ def test_too_many_arguments(script_runner, project):
         ret.stderr,
         dedent(
             """\
-            usage: scrapyd-client [-h] {deploy,targets,projects,schedule,spiders} ...
+            usage: scrapyd-client [-h]
+                                  {deploy,targets,projects,schedule,cancel,prune,spiders,watch,jobs,serve}
+                                  ...
             scrapyd-client: error: unrecognized arguments: extra
             """
         ),
@@ -0,0 +1,42 @@
+import pytest
+
+from scrapyd_client.throttle import Backpressure, TokenBucket
+
+
+def test_acquire(mocker):
+    monotonic = mocker.patch("scrapyd_client.throttle.time.monotonic", return_value=0)
+    sleep = mocker.patch("scrapyd_client.throttle.time.sleep")
+    bucket = TokenBucket(2, burst=2)
+
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0
+    assert bucket.acquire() == 0.5
+    assert bucket.acquire() == 1
+    sleep.assert_has_calls([mocker.call(0.5), mocker.call(1)])
+
+    monotonic.return_value = 10
+    assert bucket.acquire() == 0
+
+
+def test_invalid_rate():
+    with pytest.raises(ValueError, match="rate must be positive"):
+        TokenBucket(0)
+
+
+def test_backpressure(mocker):
+    sleep = mocker.patch("scrapyd_client.throttle.time.sleep")
+    pending = mocker.Mock(side_effect=[1, 3, 3, 3, 2, 0])
+    backpressure = Backpressure(pending, 3, interval=1, max_interval=3)
+
+    assert backpressure.acquire() == 0  # 1 pending
+    assert backpressure.acquire() == 0  # 2 (estimated)
+    assert backpressure.acquire() == 1 + 2 + 3  # 3 (estimated), 3, 3, 3, then 2
+    assert pending.call_count == 5
+    assert backpressure.acquire() == 0  # 3 (estimated), then 0
+    assert sleep.call_args_list == [mocker.call(1), mocker.call(2), mocker.call(3)]
+    assert pending.call_count == 6
+
+
+def test_backpressure_invalid():
+    with pytest.raises(ValueError, match="max_pending must be at least 1"):
+        Backpressure(lambda: 0, 0)
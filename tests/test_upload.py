@@ -0,0 +1,43 @@
+from urllib3 import encode_multipart_formdata
+
+from scrapyd_client.upload import MultipartEncoder
+
+
+def test_multipart_encoder(tmp_path):
+    content = bytes(range(256)) * 1000
+    path = tmp_path / "project.egg"
+    path.write_bytes(content)
+    progress = []
+
+    body = MultipartEncoder(
+        {"project": "myproject", "version": "1.0"},
+        {"egg": ("project.egg", str(path))},
+        callback=lambda sent, total: progress.append((sent, total)),
+    )
+    expected, content_type = encode_multipart_formdata(
+        [("project", "myproject"), ("version", "1.0"), ("egg", ("project.egg", content))], boundary=body.boundary
+    )
+
+    assert body.content_type == content_type
+    assert len(body) == len(expected)
+
+    chunks = []
+    while chunk := body.read(10000):
+        assert len(chunk) <= 10000
+        chunks.append(chunk)
+
+    assert b"".join(chunks) == expected
+    assert progress[-1] == (len(expected), len(expected))
+    assert len(progress) == len(chunks)
+
+
+def test_multipart_encoder_close(tmp_path):
+    path = tmp_path / "project.egg"
+    path.write_bytes(b"content" * 100)
+
+    with MultipartEncoder({}, {"egg": ("project.egg", str(path))}) as body:
+        body.read(len(body) - 100)  # the request fails before the end of the file
+        assert not body._file.closed  # noqa: SLF001
+        file = body._file  # noqa: SLF001
+
+    assert file.closed
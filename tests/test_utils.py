@@ -1,9 +1,19 @@
 import netrc
+import threading
+import time
+from configparser import ConfigParser
 
 import pytest
 from requests.auth import HTTPBasicAuth
 
-from scrapyd_client.utils import get_auth
+from scrapyd_client.utils import (
+    _get_targets,
+    _run_concurrently,
+    closest_scrapy_cfg,
+    get_auth,
+    get_config,
+    inside_project,
+)
 
 try:
     netrc.netrc()
@@ -30,6 +40,114 @@ def test_get_auth(url, username, password, expected):
 
 
 def test_get_auth_netrc(mocker):
-    n = mocker.patch("scrapyd_client.utils.netrc")  # mock netrc
-    n.netrc.return_value.authenticators.return_value = ("user", "", "pass")
+    n = mocker.patch("scrapyd_client.utils.netrc.netrc")  # mock netrc
+    n.return_value.authenticators.return_value = ("user", "", "pass")
+    assert get_auth("http://localhost:6800", None, None) == HTTPBasicAuth("user", "pass")
+
+
+@pytest.mark.parametrize("concurrency", [1, 3])
+def test_run_concurrently(concurrency):
+    lock = threading.Lock()
+    in_flight = {"current": 0, "peak": 0}
+
+    def func(item):
+        with lock:
+            in_flight["current"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["current"])
+        time.sleep(0.01 * (item % 3))
+        with lock:
+            in_flight["current"] -= 1
+        if item == 4:
+            raise ValueError(item)
+        return item * 2
+
+    results = list(_run_concurrently(func, range(8), concurrency))
+
+    assert [result.item for result in results] == list(range(8))
+    assert [result.value for result in results] == [0, 2, 4, 6, None, 10, 12, 14]
+    assert isinstance(results[4].error, ValueError)
+    assert in_flight["peak"] == concurrency
+
+
+def test_closest_scrapy_cfg(tmp_path, monkeypatch):
+    (tmp_path / "scrapy.cfg").write_text("")
+    (tmp_path / "a" / "b").mkdir(parents=True)
+    monkeypatch.chdir(tmp_path / "a" / "b")
+
+    assert closest_scrapy_cfg() == str(tmp_path / "scrapy.cfg")
+    assert inside_project()
+
+    (tmp_path / "scrapy.cfg").unlink()
+    assert closest_scrapy_cfg() == ""
+    assert not inside_project()
+
+
+def test_inside_project_settings_module(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("SCRAPY_SETTINGS_MODULE", "scrapyd_client.exceptions")
+    assert inside_project()
+
+    monkeypatch.setenv("SCRAPY_SETTINGS_MODULE", "nonexistent")
+    with pytest.warns(UserWarning, match="Cannot import scrapy settings module nonexistent"):
+        assert not inside_project()
+
+
+@pytest.fixture
+def cfg(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    path = tmp_path / "scrapy.cfg"
+    path.write_text("[deploy]\nurl = http://localhost:6800/\nusername = $SCRAPYD_USER\n")
+    return path
+
+
+def test_get_config_cached(mocker, monkeypatch, cfg):
+    read = mocker.spy(ConfigParser, "read")
+    monkeypatch.setenv("SCRAPYD_USER", "alice")
+
+    assert get_config().get("deploy", "username") == "alice"
+    get_config().set("deploy", "url", "http://changed:6800/")
+    monkeypatch.setenv("SCRAPYD_USER", "bob")
+
+    assert get_config().get("deploy", "username") == "bob"
+    assert get_config().get("deploy", "url") == "http://localhost:6800/"
+    assert _get_targets() == {"default": {"url": "http://localhost:6800/", "username": "bob"}}
+    assert read.call_count == 1
+
+    cfg.write_text("[deploy]\nurl = http://otherhost:6800/\n")
+
+    assert get_config().get("deploy", "url") == "http://otherhost:6800/"
+    assert read.call_count == 2
+
+
+def test_get_config_percent(cfg):
+    cfg.write_text("[deploy]\nurl = http://localhost:6800/\npassword = 100%\n")
+
+    assert get_config().get("deploy", "url") == "http://localhost:6800/"
+
+
+def test_get_auth_netrc_cached(mocker, tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    path = tmp_path / ".netrc"
+    path.write_text("machine localhost login user password pass\n")
+    path.chmod(0o600)
+    parse = mocker.spy(netrc.netrc, "_parse")
+
+    assert get_auth("http://localhost:6800", None, None) == HTTPBasicAuth("user", "pass")
     assert get_auth("http://localhost:6800", None, None) == HTTPBasicAuth("user", "pass")
+    assert get_auth("http://otherhost:6800", None, None) is None
+    assert parse.call_count == 1
+
+    path.write_text("machine localhost login other password secret\n")
+
+    assert get_auth("http://localhost:6800", None, None) == HTTPBasicAuth("other", "secret")
+    assert parse.call_count == 2
+
+
+def test_get_auth_netrc_missing(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+
+    assert get_auth("http://localhost:6800", None, None) is None
+
+    (tmp_path / ".netrc").write_text("machine\n")  # invalid
+
+    assert get_auth("http://localhost:6800", None, None) is None
@@ -0,0 +1,121 @@
+import json
+from itertools import islice
+
+import pytest
+
+from scrapyd_client.watch import watch
+from tests import assert_lines
+
+
+def job(jobid, spider="spider"):
+    return {"id": jobid, "spider": spider}
+
+
+@pytest.fixture
+def client(mocker):
+    client = mocker.Mock()
+    client.jobs.side_effect = [
+        {"pending": [job("1"), job("2")], "running": [], "finished": [job("0")]},
+        {"pending": [job("2")], "running": [job("1")], "finished": [job("0")]},
+        {"pending": [job("2")], "running": [job("1")], "finished": [job("0")]},
+        {"pending": [job("2")], "running": [job("1")], "finished": [job("0")]},
+        {"pending": [], "running": [job("2")], "finished": [job("0"), job("1")]},
+        {"pending": [], "running": [], "finished": [job("0"), job("1"), job("2")]},
+    ]
+    return client
+
+
+def transitions(events):
+    return [(event.jobid, event.previous, event.state) for event in events]
+
+
+def test_watch_jobids(mocker, client):
+    mock_sleep = mocker.patch("scrapyd_client.watch.time.sleep")
+
+    events = list(watch(client, ["foo"], ["1", "2", "3"], interval=1, max_interval=3))
+
+    assert transitions(events) == [
+        ("1", None, "pending"),
+        ("2", None, "pending"),
+        ("3", None, "unknown"),
+        ("1", "pending", "running"),
+        ("2", "pending", "running"),
+        ("1", "running", "finished"),
+        ("2", "running", "finished"),
+    ]
+    assert [call.args[0] for call in mock_sleep.call_args_list] == [1, 1, 2, 3, 1]
+    assert client.jobs.call_count == 6
+
+
+def test_watch_all(mocker, client):
+    mocker.patch("scrapyd_client.watch.time.sleep")
+
+    events = list(islice(watch(client, ["foo"]), 6))
+
+    assert transitions(events) == [
+        ("1", None, "pending"),
+        ("2", None, "pending"),
+        ("1", "pending", "running"),
+        ("2", "pending", "running"),
+        ("1", "running", "finished"),
+        ("2", "running", "finished"),
+    ]
+    assert events[0].project == "foo"
+    assert events[0].spider == "spider"
+
+
+def test_watch_all_forget(mocker):
+    mocker.patch("scrapyd_client.watch.time.sleep")
+    client = mocker.Mock()
+    client.jobs.side_effect = [
+        {"pending": [], "running": [job("1")], "finished": [job("0")]},
+        {"pending": [], "running": [], "finished": [job("0"), job("1")]},
+        {"pending": [], "running": [job("2")], "finished": [job("1")]},
+        {"pending": [], "running": [], "finished": [job("2")]},
+    ]
+    events = watch(client, ["foo"])
+
+    assert transitions(islice(events, 4)) == [
+        ("1", None, "running"),
+        ("1", "running", "finished"),
+        ("2", None, "running"),
+        ("2", "running", "finished"),
+    ]
+    # Job 0 left the list of finished jobs in the third poll.
+    assert events.gi_frame.f_locals["states"] == {"1": "finished", "2": "finished"}
+
+
+def test_cli(mocker, script_runner, conf_default_target):
+    responses = [
+        {"status": "ok", "projects": ["foo"]},
+        {"status": "ok", "pending": [job("1")], "running": [], "finished": []},
+        {"status": "ok", "pending": [], "running": [], "finished": [job("1")]},
+    ]
+    mock_response = mocker.Mock()
+    mock_response.json.side_effect = responses
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, return_value=mock_response)
+    mocker.patch("scrapyd_client.watch.time.sleep")
+
+    result = script_runner.run(["scrapyd-client", "watch", "-p", "foo", "1", "--json"])
+
+    assert result.success, result.stdout + "\n" + result.stderr
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [(line["jobid"], line["previous"], line["state"]) for line in lines] == [
+        ("1", None, "pending"),
+        ("1", "pending", "finished"),
+    ]
+
+
+def test_cli_text(mocker, script_runner, conf_default_target):
+    responses = [
+        {"status": "ok", "projects": ["foo"]},
+        {"status": "ok", "pending": [], "running": [], "finished": [job("1")]},
+    ]
+    mock_response = mocker.Mock()
+    mock_response.json.side_effect = responses
+    mocker.patch("scrapyd_client.pyclient.requests.Session.get", autospec=True, return_value=mock_response)
+
+    result = script_runner.run(["scrapyd-client", "watch", "-p", "foo", "1"])
+
+    assert result.success, result.stdout + "\n" + result.stderr
+    assert_lines(result.stdout, [r"\d{4}-\d\d-\d\d \d\d:\d\d:\d\d foo / spider 1: None -> finished"])